@@ -1,17 +1,28 @@
 import pandas as pd
+import numpy as np
 from typing import Dict, List, Any
 import time
 import threading
 from .systems import System
 from .storage import ArchiveManager
-from src.loaders import load_traits, generate_initial_state
+from .handles import HandleRegistry
+from .opinions import OpinionMatrix
+from .genomes import GenomeStore
+from .kinship import KinshipStore
+from .inventory import InventoryStore
+from .needs import NeedsTable
+from .relationships import RelationshipGraph
+from .skills import SkillStore
+from .tribes import TribeStats
+from .mapgrid import MapGrid
+from src.loaders import load_traits, load_item_catalogue, generate_initial_state, ITEMS_PATH, RECIPES_PATH
 
 class WorldState:
     """
     Central Data Retrieval Object (DRO).
     Holds all state for the simulation.
     """
-    def __init__(self):
+    def __init__(self, items_path: str = ITEMS_PATH, recipes_path: str = RECIPES_PATH):
         self.day: int = 0
         
         # Core Data: Population as Vectorized DataFrame
@@ -26,27 +37,46 @@ class WorldState:
             "parents", "children", "partner_id" # Phase 6 Family Tree
         ])
         
-        # Kinship Graph (Many-to-Many)
+        # Kinship Graph (Many-to-Many, typed edges over handles + live partner index)
         # Type: Spouse, Lover, Ex, Child, Parent
-        self.relationships: pd.DataFrame = pd.DataFrame(columns=[
-            "id_a", "id_b", "type", "commitment", "affection", "start_day"
-        ])
+        # 'relationships' is a long DataFrame view of it (see property below)
+        self.relationship_graph = RelationshipGraph()
         
-        # Knowledge Graph (Skills)
-        self.skills: pd.DataFrame = pd.DataFrame(columns=[
-            "agent_id", "skill", "level"
-        ])
+        # Knowledge Graph (Skills): Agent x Skill level matrix
+        # 'skills' is a long DataFrame view of it (see property below)
+        self.skill_store = SkillStore()
+        
+        # Integer Agent Handles (for sparse/dense per-agent stores)
+        self.handles = HandleRegistry()
+        
+        # Opinions: Sparse Observer x Target matrix (indexed by handle)
+        self.opinions = OpinionMatrix()
+        
+        # Genomes: handle x locus base codes (see GeneticsSystem)
+        self.genomes = GenomeStore()
+        
+        # Kinship: sparse pedigree coefficients (see GeneticsSystem / mate choice)
+        self.kinship = KinshipStore()
+        self._kin_deferred = np.empty(0, dtype=np.int64) # Archived fathers of unborn children
         
         # Tribes Metadata
         self.tribes: Dict[str, Any] = {}
         
-        # Terrain Map (20x20 Grid)
-        self.map_data: pd.DataFrame = None 
+        # Settlements (Density Clusters): settlement_id -> {centroid, pop, bbox, history, ...}
+        self.settlements: Dict[str, Any] = {}
         
-        # Phase 5: Inventory (Agent ID, Item, Amount, Durability, MaxDurability, Spoilage)
-        self.inventory: pd.DataFrame = pd.DataFrame(columns=[
-            "agent_id", "item", "amount", "durability", "max_durability", "spoilage_rate"
-        ])
+        # Terrain Map (NumPy layers, size from globals 'grid_size'/'world_size')
+        # 'map_data' is a lazily built DataFrame view of it (see property below)
+        self.map_grid: MapGrid = None
+        self._map_frame: pd.DataFrame = None
+        
+        # Phase 5: Inventory (Agent x Item stacks + Tool table, indexed by handle)
+        # 'inventory' is a long DataFrame view of it (see property below)
+        # Item properties and recipes come from the catalogue (data/items.csv, data/recipes.csv)
+        self.catalogue = load_item_catalogue(items_path, recipes_path)
+        self.inventory_store = InventoryStore(self.catalogue)
+        self._needs: NeedsTable = None
+        self._tribe_stats: TribeStats = None
         
         # Global Resources & Config
         self.globals: Dict[str, Any] = {
@@ -56,7 +86,9 @@ class WorldState:
             "policy_rationing": "Communal", # Communal, Meritocracy, ChildFirst
             "season": "Spring",
             "year": 1,
-            "weather": "Sunny"
+            "weather": "Sunny",
+            "world_size": 100.0, # World units per axis
+            "grid_size": 20      # Map tiles per axis
         }
         
         # Structured Logs (Realism Phase 6)
@@ -98,6 +130,92 @@ class WorldState:
         """Returns logs specific to an agent (by ID match or text mention)."""
         return [l for l in self.logs if l.get('agent_id') == agent_id or (agent_id and agent_id in l.get('message', ''))]
 
+    @property
+    def map_data(self) -> pd.DataFrame:
+        """Tile DataFrame view of the map (built on access, for UI/reporting)."""
+        if self.map_grid is not None:
+            return self.map_grid.to_frame()
+        return self._map_frame
+
+    @map_data.setter
+    def map_data(self, frame: pd.DataFrame):
+        # Tile frames are imported into the grid; anything else (None, mocks) is kept as-is
+        if frame is not None and not frame.empty and {'grid_x', 'grid_y', 'terrain'} <= set(frame.columns):
+            self.map_grid = MapGrid.from_frame(frame)
+            self._map_frame = None
+        else:
+            self.map_grid = None
+            self._map_frame = frame
+
+    @property
+    def relationships(self) -> pd.DataFrame:
+        """Long view (id_a, id_b, type, commitment, affection, start_day), one row per directed edge."""
+        return self.relationship_graph.to_frame(self.handles)
+
+    @relationships.setter
+    def relationships(self, frame: pd.DataFrame):
+        self.relationship_graph = RelationshipGraph.from_frame(frame, self.handles)
+
+    @property
+    def skills(self) -> pd.DataFrame:
+        """Long view (agent_id, skill, level), one row per known skill."""
+        return self.skill_store.to_frame(self.handles)
+
+    @skills.setter
+    def skills(self, frame: pd.DataFrame):
+        self.skill_store = SkillStore.from_frame(frame, self.handles, self.skill_store.names)
+
+    @property
+    def inventory(self) -> pd.DataFrame:
+        """Long view (agent_id, item, amount, durability, max_durability, spoilage_rate)."""
+        return self.inventory_store.to_frame(self.handles)
+
+    @inventory.setter
+    def inventory(self, frame: pd.DataFrame):
+        # Long rows are imported into a fresh store (stacks summed, tools one per instance)
+        self.inventory_store = InventoryStore.from_frame(frame, self.handles, self.catalogue)
+
+    def needs(self) -> NeedsTable:
+        """Needs & surplus of the living population, rebuilt only after inventory mutations, deaths/births or a new day."""
+        store = self.inventory_store
+        living = self.population[self.population['is_alive'] == True]
+        if self._needs is None or not self._needs.is_current(store, self.day, len(self.population), living.index):
+            handles = self.handles.lookup(living['id'].to_numpy())
+            self._needs = NeedsTable(living, handles, store, self.catalogue, self.day)
+        else:
+            self._needs.refresh_hunger(living) # Stamina/Happiness move within a tick
+        return self._needs
+
+    def tribe_stats(self) -> TribeStats:
+        """Per-tribe aggregates of the living population, built once per tick (or after births/deaths)."""
+        alive = (self.population['is_alive'] == True).to_numpy() if 'is_alive' in self.population.columns \
+            else np.zeros(len(self.population), dtype=bool)
+        cached = self._tribe_stats
+        if cached is None or not cached.is_current(self.population, self.day, int(alive.sum())):
+            living = self.population[alive]
+            food = self.needs().food # Same living rows (the needs table tracks deaths too)
+            self._tribe_stats = TribeStats(self.population, living, food, self.day)
+        return self._tribe_stats
+
+    def prune_archived(self, agent_ids) -> None:
+        """Drops per-agent side tables for agents that left the population (archived)."""
+        handles = self.handles.lookup(agent_ids, create=False)
+        handles = handles[handles >= 0]
+        self.opinions.prune(handles)
+        self.inventory_store.prune(handles)
+        self.relationship_graph.prune(handles)
+        self.skill_store.prune(handles)
+        
+        # Kinship: a dead father's row is still needed until his child is born
+        handles = np.concatenate([handles, self._kin_deferred])
+        pending = np.empty(0, dtype=np.int64)
+        if 'pregnancy_father_id' in self.population.columns and 'is_pregnant' in self.population.columns:
+            fathers = self.population.loc[self.population['is_pregnant'] == True, 'pregnancy_father_id'].dropna()
+            pending = self.handles.lookup(fathers.to_numpy(), create=False)
+        deferred = np.isin(handles, pending)
+        self._kin_deferred = handles[deferred]
+        self.kinship.prune(handles[~deferred])
+
     @property
     def current_season(self):
         day_of_year = self.day % 365
@@ -111,8 +229,9 @@ class SimulationEngine:
     Manages the verification loop and system execution.
     Supports running in a background thread.
     """
-    def __init__(self):
-        self.state = WorldState()
+    def __init__(self, items_path: str = ITEMS_PATH, recipes_path: str = RECIPES_PATH):
+        self.items_path, self.recipes_path = items_path, recipes_path
+        self.state = WorldState(items_path, recipes_path)
         self.systems: List[System] = []
         self.running = False
         self.paused = False
@@ -144,7 +263,10 @@ class SimulationEngine:
                 
             # Optimization: Archive Dead
             if self.state.day % 30 == 0:
+                before_ids = self.state.population['id']
                 self.state.population = self.archiver.archive_dead(self.state.population)
+                archived = before_ids[~before_ids.isin(self.state.population['id'])]
+                self.state.prune_archived(archived.to_numpy())
             
     def start(self) -> None:
         """Start background processing"""
@@ -168,11 +290,12 @@ class SimulationEngine:
         """Resets the simulation state to Day 0."""
         self.state.log("♻️ Auto-Restarting Simulation...")
         # Persist Settings
-        restart_pref = self.state.globals.get('auto_restart', True)
+        settings = {k: self.state.globals[k] for k in ('auto_restart', 'world_size', 'grid_size') if k in self.state.globals}
+        settings.setdefault('auto_restart', True)
         
         # New State
-        self.state = WorldState()
-        self.state.globals['auto_restart'] = restart_pref
+        self.state = WorldState(self.items_path, self.recipes_path)
+        self.state.globals.update(settings)
         
         # Reload Data
         traits = load_traits('data/traits.csv')
@@ -0,0 +1,89 @@
+import numpy as np
+
+class GenomeStore:
+    """
+    Dense Genome Matrix (handle x locus, uint8 base codes 0..3 = A, C, G, T).
+    Row h holds the genome of the agent with handle h; 'present' marks rows that
+    have been filled. Rows are kept after death so late births (and the inbreeding
+    check) can still read a parent that has already been archived.
+    All operations work on whole batches, so cost grows with the number of
+    agents and loci, never with Python-level loops over bases.
+    """
+    BASES = np.array(list('ACGT'))
+
+    def __init__(self, length: int = 32):
+        self.length = int(length)
+        self.codes = np.zeros((0, self.length), dtype=np.uint8)
+        self.present = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return int(self.present.sum())
+
+    def _ensure_capacity(self, max_handle: int) -> None:
+        cap = len(self.present)
+        if max_handle < cap: return
+        new_cap = max(cap, 64)
+        while new_cap <= max_handle: new_cap *= 2
+
+        codes = np.zeros((new_cap, self.length), dtype=np.uint8)
+        codes[:cap] = self.codes
+        present = np.zeros(new_cap, dtype=bool)
+        present[:cap] = self.present
+        self.codes, self.present = codes, present
+
+    def has(self, handles) -> np.ndarray:
+        handles = np.asarray(handles, dtype=np.int64)
+        out = np.zeros(len(handles), dtype=bool)
+        valid = (handles >= 0) & (handles < len(self.present))
+        out[valid] = self.present[handles[valid]]
+        return out
+
+    # --- Batch Operations ---
+    def randomize(self, handles, rng=None) -> None:
+        """Fresh random genomes for a batch of handles."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0: return
+        rng = np.random if rng is None else rng # Global or seeded RandomState
+        self._ensure_capacity(int(handles.max()))
+        self.codes[handles] = rng.randint(0, 4, size=(len(handles), self.length)).astype(np.uint8)
+        self.present[handles] = True
+
+    def similarity(self, a, b) -> np.ndarray:
+        """Fraction of identical loci between the genomes of paired handles."""
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        if len(a) == 0: return np.zeros(0)
+        return (self.codes[a] == self.codes[b]).mean(axis=1)
+
+    def inherit(self, children, mothers, fathers, mutation_rate: float = 0.01, rng=None) -> np.ndarray:
+        """
+        Uniform crossover of paired parent genomes into the children, then mutation.
+        All children of the batch at once: gather parent rows, pick with a random mask,
+        overwrite mutated loci with random bases.
+        Returns the parents' similarity (inbreeding measure) per child.
+        """
+        children = np.asarray(children, dtype=np.int64)
+        mothers = np.asarray(mothers, dtype=np.int64)
+        fathers = np.asarray(fathers, dtype=np.int64)
+        if len(children) == 0: return np.zeros(0)
+        rng = np.random if rng is None else rng # Global or seeded RandomState
+        self._ensure_capacity(int(children.max()))
+
+        mom, dad = self.codes[mothers], self.codes[fathers]
+        shape = mom.shape
+
+        # 1. Crossover (50/50 per locus)
+        genome = np.where(rng.random(shape) < 0.5, mom, dad)
+
+        # 2. Mutation (random base at mutation_rate of loci)
+        mutated = rng.random(shape) < mutation_rate
+        genome[mutated] = rng.randint(0, 4, size=int(mutated.sum())).astype(np.uint8)
+
+        self.codes[children] = genome
+        self.present[children] = True
+        return (mom == dad).mean(axis=1)
+
+    def sequence(self, handle: int) -> str:
+        """Genome as a base string (e.g. for the inspector); '' if unknown."""
+        if not self.has([handle])[0]: return ""
+        return "".join(self.BASES[self.codes[handle]])
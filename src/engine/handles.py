@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+class HandleRegistry:
+    """
+    Integer Handles for Agent IDs.
+    Agent IDs are strings ("HMN-1a2b3c4d"); dense stores (opinions, genomes, ...)
+    index by a stable int handle instead. Handles are never recycled, so a stale
+    handle can never alias a newborn.
+    """
+    def __init__(self):
+        self._ids = []          # handle -> id
+        self._index = pd.Index([], dtype=object)
+        self._id_array = np.empty(0, dtype=object)
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _lookup_index(self) -> pd.Index:
+        if self._dirty:
+            self._id_array = np.array(self._ids, dtype=object)
+            self._index = pd.Index(self._id_array)
+            self._dirty = False
+        return self._index
+
+    def lookup(self, ids, create: bool = True) -> np.ndarray:
+        """
+        Handles for a batch of agent IDs.
+        Unknown IDs get fresh handles (create=True) or -1 (create=False).
+        """
+        ids = np.asarray(ids, dtype=object)
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        handles = self._lookup_index().get_indexer(ids).astype(np.int64)
+        if create:
+            missing = handles < 0
+            if missing.any():
+                # Deduplicate while keeping first-seen order
+                new_ids = pd.unique(ids[missing])
+                start = len(self._ids)
+                self._ids.extend(new_ids.tolist())
+                self._dirty = True
+                handles[missing] = start + pd.Index(new_ids).get_indexer(ids[missing])
+        return handles
+
+    def handle(self, agent_id: str, create: bool = True) -> int:
+        return int(self.lookup([agent_id], create=create)[0])
+
+    def ids_of(self, handles) -> np.ndarray:
+        """Agent IDs for a batch of handles."""
+        self._lookup_index()
+        return self._id_array[np.asarray(handles, dtype=np.int64)]
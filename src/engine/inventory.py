@@ -0,0 +1,392 @@
+import numpy as np
+import pandas as pd
+
+class InventoryStore:
+    """
+    Agent x Item Inventory, indexed by agent handle.
+    - Stackable goods (food, materials): dense matrix of stacks [row, item_code].
+      Rows are handed out to handles on first write and reclaimed by prune() (reused
+      by the next newcomer), so the matrix is sized by agents holding goods, not by
+      every agent ever born. row_of maps handle -> row (-1 = none).
+      One stack per agent and item; spoilage is a property of the item.
+      Repeated hauls of an item merge into that one stack: the stack is materialized
+      at the current tick and re-stamped on every write, so older units decay from
+      the merged amount rather than batch by batch.
+    - Tools (durable, not stackable): compact table with one row per instance
+      (owner handle, item code, durability, max durability).
+    "How much Meat does agent h have" is amount([h], 'Meat').
+    Spoilage is lazy: a stack stores its amount when last written (base) and that tick
+    (stamp); the current amount is base - rate * (clock - stamp), derived on read.
+    advance() only moves the clock. Stacks at or below DUST read as empty.
+    The long-form DataFrame (agent_id, item, amount, durability, ...) is a derived
+    view for the UI and legacy code (see to_frame / from_frame).
+    Items of the catalogue are registered first, so their codes are catalogue codes.
+    Every mutation bumps 'version', so derived tables (NeedsTable) know when to rebuild.
+    """
+    FRAME_COLUMNS = ["agent_id", "item", "amount", "durability", "max_durability", "spoilage_rate"]
+    DUST = 0.1 # Stacks at or below this have spoiled away / read as empty
+
+    def __init__(self, catalogue=None):
+        # Item Registry (code -> name / spoilage per tick)
+        self.items = []
+        self.item_codes = {}
+        self.spoilage = np.zeros(0)
+        self.durable = np.zeros(0, dtype=bool) # Item kinds held as tools
+
+        # Stacks (lazy spoilage), one row per agent holding goods
+        self.row_of = np.full(0, -1, dtype=np.int64)       # handle -> row
+        self.row_handle = np.full(0, -1, dtype=np.int64)   # row -> handle (-1 = free)
+        self._free_rows = []
+        self._n_rows = 0 # Rows handed out so far (high-water mark)
+        self.base = np.zeros((0, 0))
+        self.stamp = np.zeros((0, 0), dtype=np.int64)
+        self.clock = 0
+        self.version = 0
+
+        # Tools
+        self.tool_owner = np.empty(0, dtype=np.int64)
+        self.tool_item = np.empty(0, dtype=np.int64)
+        self.tool_durability = np.empty(0)
+        self.tool_max_durability = np.empty(0)
+
+        if catalogue is not None:
+            for name, rate, durability in zip(catalogue.names, catalogue.spoilage, catalogue.durability):
+                code = self.code(name, rate)
+                self.durable[code] = durability > 0
+
+    @property
+    def n_tools(self) -> int:
+        return len(self.tool_owner)
+
+    def is_empty(self) -> bool:
+        return self.n_tools == 0 and not (self.base > self.DUST).any()
+
+    # --- Item Registry ---
+    def code(self, item: str, spoilage: float = None) -> int:
+        """Code of an item type. Unknown items are registered (with the given spoilage)."""
+        code = self.item_codes.get(item)
+        if code is None:
+            code = len(self.items)
+            self.items.append(item)
+            self.item_codes[item] = code
+            self.spoilage = np.append(self.spoilage, float(spoilage or 0.0))
+            self.durable = np.append(self.durable, False)
+            self._ensure_capacity(len(self.base) - 1)
+            self.version += 1
+        return code
+
+    def codes_of(self, items) -> np.ndarray:
+        return np.array([self.code(i) for i in items], dtype=np.int64)
+
+    def _ensure_capacity(self, max_row: int) -> None:
+        cap, width = self.base.shape
+        if max_row < cap and len(self.items) <= width: return
+        new_cap = max(cap, 64)
+        while new_cap <= max_row: new_cap *= 2
+        new_width = max(width, 8)
+        while new_width < len(self.items): new_width *= 2
+
+        base = np.zeros((new_cap, new_width))
+        base[:cap, :width] = self.base
+        stamp = np.full((new_cap, new_width), self.clock, dtype=np.int64)
+        stamp[:cap, :width] = self.stamp
+        self.base, self.stamp = base, stamp
+        row_handle = np.full(new_cap, -1, dtype=np.int64)
+        row_handle[:cap] = self.row_handle
+        self.row_handle = row_handle
+
+    def _rows(self, handles, create: bool = False) -> np.ndarray:
+        """Stack rows of handles; unknown handles get a (reused or new) row if create, else -1."""
+        handles = np.asarray(handles, dtype=np.int64)
+        rows = np.full(len(handles), -1, dtype=np.int64)
+        known = (handles >= 0) & (handles < len(self.row_of))
+        rows[known] = self.row_of[handles[known]]
+        if not create or (rows >= 0).all(): return rows
+
+        new = np.unique(handles[rows < 0])
+        if new.max() >= len(self.row_of):
+            cap = max(len(self.row_of), 64)
+            while cap <= new.max(): cap *= 2
+            row_of = np.full(cap, -1, dtype=np.int64)
+            row_of[:len(self.row_of)] = self.row_of
+            self.row_of = row_of
+
+        # Reclaimed rows first, then fresh ones past the high-water mark
+        reuse = min(len(new), len(self._free_rows))
+        reused = [self._free_rows.pop() for _ in range(reuse)]
+        fresh = np.arange(self._n_rows, self._n_rows + len(new) - reuse, dtype=np.int64)
+        self._n_rows += len(fresh)
+        assigned = np.concatenate([np.array(reused, dtype=np.int64), fresh])
+        self._ensure_capacity(int(assigned.max()))
+        self.row_of[new] = assigned
+        self.row_handle[assigned] = new
+        return self.row_of[handles]
+
+    # --- Stacks ---
+    def _live(self, rows, cols) -> np.ndarray:
+        """Current amounts of the cells (rows, cols) (broadcast index arrays)."""
+        age = self.clock - self.stamp[rows, cols]
+        out = np.maximum(self.base[rows, cols] - self.spoilage[cols] * age, 0.0)
+        out[out <= self.DUST] = 0.0
+        return out
+
+    def _rebase(self, rows, cols) -> None:
+        """Materializes cells at the current tick before they are written."""
+        self.base[rows, cols] = self._live(rows, cols)
+        self.stamp[rows, cols] = self.clock
+
+    def amount(self, handles, item) -> np.ndarray:
+        """Stack sizes of one item for a batch of handles (unknown handles hold nothing)."""
+        handles = np.asarray(handles, dtype=np.int64)
+        out = np.zeros(len(handles))
+        code = self.item_codes.get(item)
+        if code is None: return out
+        rows = self._rows(handles)
+        valid = rows >= 0
+        out[valid] = self._live(rows[valid], np.full(valid.sum(), code))
+        return out
+
+    def stacks(self, handles, items) -> np.ndarray:
+        """(len(handles), len(items)) matrix of stack sizes."""
+        codes = self.codes_of(items)
+        rows = self._rows(handles)
+        out = np.zeros((len(rows), len(codes)))
+        valid = rows >= 0
+        out[valid] = self._live(rows[valid, None], codes[None, :])
+        return out
+
+    def add(self, handles, items, amounts) -> None:
+        """Adds to stacks. items: one name for all, or one name/code per handle."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0: return
+        if isinstance(items, str):
+            codes = np.full(len(handles), self.code(items))
+        else:
+            codes = np.array([self.code(i) if isinstance(i, str) else i for i in items], dtype=np.int64)
+        rows = self._rows(handles, create=True)
+        self._rebase(rows, codes)
+        np.add.at(self.base, (rows, codes), np.broadcast_to(np.asarray(amounts, dtype=float), handles.shape))
+        self.version += 1
+
+    def take(self, handles, item, amounts) -> np.ndarray:
+        """Removes up to the requested amounts (one row per handle); returns what was taken."""
+        handles = np.asarray(handles, dtype=np.int64)
+        want = np.broadcast_to(np.asarray(amounts, dtype=float), handles.shape)
+        taken = np.minimum(self.amount(handles, item), want)
+        if len(handles) and taken.any():
+            hit = taken > 0 # Only agents holding the item have a row
+            rows, taken_hit = self._rows(handles[hit]), taken[hit]
+            codes = np.full(len(rows), self.item_codes[item])
+            self._rebase(rows, codes)
+            np.subtract.at(self.base, (rows, codes), taken_hit)
+            self.base[rows, codes] = np.maximum(self.base[rows, codes], 0.0) # Touched cells only
+            self.version += 1
+        return taken
+
+    def total(self, item) -> float:
+        code = self.item_codes.get(item)
+        if code is None: return 0.0
+        rows = np.arange(self._n_rows)
+        return float(self._live(rows, np.full(len(rows), code)).sum())
+
+    def advance(self, ticks: int = 1) -> None:
+        """Ages every stack by moving the clock (O(1); amounts are derived on read)."""
+        self.clock += ticks
+        if (self.spoilage > 0).any():
+            self.version += 1
+
+    def dead_fraction(self) -> float:
+        """Share of stored stacks that have spoiled away but still hold a base amount."""
+        rows, cols = np.nonzero(self.base)
+        if len(rows) == 0: return 0.0
+        return float((self._live(rows, cols) == 0.0).mean())
+
+    def compact(self) -> None:
+        """Physical cleanup: materializes every stack at the current tick (spoiled -> 0)."""
+        rows, cols = np.nonzero(self.base)
+        self.base[rows, cols] = self._live(rows, cols)
+        self.stamp[:] = self.clock
+
+    def subtract_block(self, handles, codes, block) -> None:
+        """Subtracts a (len(handles), len(codes)) block from the stacks (unique handles)."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0: return
+        rows, cols = self._rows(handles, create=True)[:, None], np.asarray(codes, dtype=np.int64)[None, :]
+        self.base[rows, cols] = np.maximum(self._live(rows, cols) - block, 0.0)
+        self.stamp[rows, cols] = self.clock
+        self.version += 1
+
+    # --- Tools ---
+    def add_tools(self, handles, item: str, durability: float) -> None:
+        """One new tool instance per handle."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0: return
+        code = self.code(item)
+        self.durable[code] = True
+        self.tool_owner = np.concatenate([self.tool_owner, handles])
+        self.tool_item = np.concatenate([self.tool_item, np.full(len(handles), code)])
+        self.tool_durability = np.concatenate([self.tool_durability, np.full(len(handles), float(durability))])
+        self.tool_max_durability = np.concatenate([self.tool_max_durability, np.full(len(handles), float(durability))])
+        self.version += 1
+
+    def tool_counts(self, handles, item: str) -> np.ndarray:
+        """Number of tools of one kind held by each handle."""
+        handles = np.asarray(handles, dtype=np.int64)
+        out = np.zeros(len(handles), dtype=np.int64)
+        code = self.item_codes.get(item)
+        if code is None or self.n_tools == 0 or len(handles) == 0: return out
+        owners, counts = np.unique(self.tool_owner[self.tool_item == code], return_counts=True)
+        if len(owners) == 0: return out
+        pos = np.minimum(np.searchsorted(owners, handles), len(owners) - 1)
+        hit = owners[pos] == handles
+        out[hit] = counts[pos[hit]]
+        return out
+
+    def first_tool(self, handles, item: str) -> np.ndarray:
+        """Tool row of the first tool of a kind held by each handle (-1 if none)."""
+        handles = np.asarray(handles, dtype=np.int64)
+        out = np.full(len(handles), -1, dtype=np.int64)
+        code = self.item_codes.get(item)
+        if code is None or self.n_tools == 0 or len(handles) == 0: return out
+        rows = np.flatnonzero(self.tool_item == code)
+        owners, first = np.unique(self.tool_owner[rows], return_index=True)
+        if len(owners) == 0: return out
+        pos = np.minimum(np.searchsorted(owners, handles), len(owners) - 1)
+        hit = owners[pos] == handles
+        out[hit] = rows[first[pos[hit]]]
+        return out
+
+    def wear(self, tools, damage: float) -> None:
+        """Durability loss for tool rows (repeated rows wear repeatedly); broken tools are removed."""
+        tools = np.asarray(tools, dtype=np.int64)
+        if len(tools) == 0: return
+        np.subtract.at(self.tool_durability, tools, damage)
+        self.version += 1
+        self._drop_tools(self.tool_durability <= 0)
+
+    def holdings(self, handles) -> np.ndarray:
+        """(len(handles), n_items) units held: stack amounts plus tool counts."""
+        handles = np.asarray(handles, dtype=np.int64)
+        self._ensure_capacity(0) # Item columns registered since the last write
+        rows = self._rows(handles)
+        held = np.zeros((len(handles), len(self.items)))
+        valid = rows >= 0
+        held[valid] = self._live(rows[valid, None], np.arange(len(self.items))[None, :])
+        if self.n_tools and len(handles):
+            # Position of each tool owner among the queried handles (sorted lookup)
+            order = np.argsort(handles, kind='stable')
+            pos = np.minimum(np.searchsorted(handles[order], self.tool_owner), len(handles) - 1)
+            owned = handles[order][pos] == self.tool_owner
+            np.add.at(held, (order[pos[owned]], self.tool_item[owned]), 1.0)
+        return held
+
+    def transfer(self, givers, takers, codes) -> None:
+        """
+        Moves one unit of an item per row (giver -> taker). Tool kinds move whole
+        instances (distinct ones when a giver hands over several), the rest move stack
+        amounts. Callers make sure givers hold what they give.
+        """
+        givers = np.asarray(givers, dtype=np.int64)
+        takers = np.asarray(takers, dtype=np.int64)
+        codes = np.asarray(codes, dtype=np.int64)
+        if len(givers) == 0: return
+
+        tool = self.durable[codes]
+        g, t, c = self._rows(givers[~tool], create=True), self._rows(takers[~tool], create=True), codes[~tool]
+        self._rebase(np.concatenate([g, t]), np.concatenate([c, c]))
+        np.subtract.at(self.base, (g, c), 1.0)
+        np.add.at(self.base, (t, c), 1.0)
+        self.base[g, c] = np.maximum(self.base[g, c], 0.0) # Only givers' stacks can go negative
+        self.version += 1
+
+        if not tool.any() or self.n_tools == 0: return
+        # k-th request of a (giver, item) pair takes that pair's k-th tool
+        n_codes = np.int64(max(len(self.items), 1))
+        want = givers[tool] * n_codes + codes[tool]
+        order = np.argsort(want, kind='stable')
+        want = want[order]
+        nth = np.arange(len(want)) - np.searchsorted(want, want)
+        rows = np.argsort(self.tool_owner * n_codes + self.tool_item, kind='stable')
+        have = (self.tool_owner * n_codes + self.tool_item)[rows]
+        pos = np.searchsorted(have, want) + nth
+        ok = pos < len(have)
+        ok[ok] = have[pos[ok]] == want[ok]
+        self.tool_owner[rows[pos[ok]]] = takers[tool][order][ok]
+
+    def give_tools(self, tools, new_owners) -> None:
+        self.tool_owner[np.asarray(tools, dtype=np.int64)] = np.asarray(new_owners, dtype=np.int64)
+        self.version += 1
+
+    def _drop_tools(self, mask) -> None:
+        if not mask.any(): return
+        keep = ~mask
+        self.tool_owner = self.tool_owner[keep]
+        self.tool_item = self.tool_item[keep]
+        self.tool_durability = self.tool_durability[keep]
+        self.tool_max_durability = self.tool_max_durability[keep]
+
+    # --- Maintenance ---
+    def prune(self, handles) -> None:
+        """Forgets the belongings of archived agents."""
+        handles = np.unique(np.asarray(handles, dtype=np.int64))
+        if len(handles) == 0: return
+        rows = self._rows(handles)
+        held = rows >= 0
+        # Reclaim their stack rows for the next newcomers
+        rows = rows[held]
+        self.base[rows] = 0.0
+        self.stamp[rows] = self.clock
+        self.row_handle[rows] = -1
+        self.row_of[handles[held]] = -1
+        self._free_rows.extend(rows.tolist())
+        self.version += 1
+        self._drop_tools(np.isin(self.tool_owner, handles))
+
+    # --- DataFrame View (UI / Legacy) ---
+    def to_frame(self, handles) -> pd.DataFrame:
+        """Long view: one row per non-empty stack, then one row per tool (amount 1)."""
+        r, c = np.nonzero(self.base)
+        amount = self._live(r, c)
+        r, c, amount = r[amount > 0], c[amount > 0], amount[amount > 0]
+        h = self.row_handle[r]
+        names = np.array(self.items, dtype=object)
+        stacks = pd.DataFrame({
+            "agent_id": handles.ids_of(h), "item": names[c] if len(c) else np.empty(0, dtype=object),
+            "amount": amount, "durability": 0.0, "max_durability": 0.0,
+            "spoilage_rate": self.spoilage[c] if len(c) else np.empty(0),
+        })
+        if self.n_tools == 0: return stacks
+        tools = pd.DataFrame({
+            "agent_id": handles.ids_of(self.tool_owner), "item": names[self.tool_item], "amount": 1.0,
+            "durability": self.tool_durability, "max_durability": self.tool_max_durability, "spoilage_rate": 0.0,
+        })
+        return pd.concat([stacks, tools], ignore_index=True)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, handles, catalogue=None) -> 'InventoryStore':
+        """Builds a store from long rows: tools are rows with max_durability > 0, the rest stack."""
+        store = cls(catalogue)
+        if frame is None or frame.empty: return store
+        frame = frame.reset_index(drop=True)
+        owners = handles.lookup(frame['agent_id'].to_numpy(dtype=object))
+        amount = pd.to_numeric(frame['amount'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        max_dur = pd.to_numeric(frame.get('max_durability', 0), errors='coerce')
+        max_dur = np.broadcast_to(np.nan_to_num(np.asarray(max_dur, dtype=float)), len(frame))
+        is_tool = max_dur > 0
+
+        # Spoilage of items missing from the catalogue: the highest rate listed for the item
+        spoil = pd.to_numeric(frame.get('spoilage_rate', 0), errors='coerce')
+        spoil = pd.Series(np.broadcast_to(np.nan_to_num(np.asarray(spoil, dtype=float)), len(frame)))
+        for item, rate in spoil.groupby(frame['item'].to_numpy()).max().items():
+            store.code(item, rate)
+
+        stack = ~is_tool
+        store.add(owners[stack], frame['item'].to_numpy()[stack], amount[stack])
+
+        durability = pd.to_numeric(frame.get('durability', 0), errors='coerce')
+        durability = np.broadcast_to(np.nan_to_num(np.asarray(durability, dtype=float)), len(frame))
+        for row in np.flatnonzero(is_tool):
+            for _ in range(max(1, int(round(amount[row])))):
+                store.add_tools([owners[row]], frame.at[row, 'item'], max_dur[row])
+                store.tool_durability[-1] = durability[row]
+        return store
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+class ItemCatalogue:
+    """
+    Item Properties compiled to arrays indexed by item code (row order of data/items.csv).
+    - Per item: calories, protein, carbs, vitamins, spoilage (per tick), durability (tools).
+    - Recipes (data/recipes.csv, priority order): product code + cost matrix [recipe, item].
+    Economy kernels read these arrays instead of per-item literals.
+    """
+    PROPERTIES = ['calories', 'protein', 'carbs', 'vitamins', 'spoilage', 'durability']
+    NUTRIENTS = ['protein', 'carbs', 'vitamins']
+
+    def __init__(self, items: pd.DataFrame = None, recipes: pd.DataFrame = None):
+        items = items if items is not None else pd.DataFrame(columns=['item', 'category'] + self.PROPERTIES)
+        self.names = items['item'].astype(str).tolist()
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        self.category = items['category'].to_numpy(dtype=object) if 'category' in items.columns \
+            else np.full(len(items), '', dtype=object)
+        for prop in self.PROPERTIES:
+            values = pd.to_numeric(items[prop], errors='coerce') if prop in items.columns else pd.Series(0.0, index=items.index)
+            setattr(self, prop, np.nan_to_num(values.to_numpy(dtype=float)))
+
+        # Food = anything with calories (catalogue order breaks spoilage ties when eating)
+        self.food_codes = np.flatnonzero(self.calories > 0)
+        self.nutrients = np.column_stack([getattr(self, n) for n in self.NUTRIENTS]) if len(self.names) \
+            else np.zeros((0, len(self.NUTRIENTS)))
+
+        # Recipes: inputs are {item: amount} dicts; unknown items are skipped
+        recipes = recipes if recipes is not None else pd.DataFrame(columns=['item', 'inputs'])
+        known = recipes[recipes['item'].isin(self.codes)]
+        self.recipe_item = np.array([self.codes[i] for i in known['item']], dtype=np.int64)
+        self.recipe_cost = np.zeros((len(known), len(self.names)))
+        for r, inputs in enumerate(known['inputs']):
+            for item, amount in inputs.items():
+                if item in self.codes:
+                    self.recipe_cost[r, self.codes[item]] = float(amount)
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, item: str) -> int:
+        return self.codes[item]
+
+    def names_of(self, codes) -> list:
+        return [self.names[c] for c in codes]
+
+    @property
+    def food_items(self) -> list:
+        return self.names_of(self.food_codes)
+
+    @property
+    def recipe_inputs(self) -> np.ndarray:
+        """Codes of every item used by some recipe."""
+        return np.flatnonzero(self.recipe_cost.any(axis=0))
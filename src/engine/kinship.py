@@ -0,0 +1,149 @@
+import numpy as np
+
+class KinshipStore:
+    """
+    Sparse Pedigree Kinship Coefficients (tabular method), indexed by agent handle.
+    f(a, b) is the probability that a random allele of a and one of b are identical by
+    descent. Founders are unrelated (f = 0) and non-inbred (f(a, a) = 1/2).
+    When a child c of mother m and father d is born:
+        f(c, x) = (f(m, x) + f(d, x)) / 2        for every existing x
+        f(c, c) = (1 + f(m, d)) / 2              -> inbreeding F(c) = f(m, d)
+    Pairs are stored in both directions in a sorted int64 key array ((a << 32) | b),
+    so every agent's relatives are one contiguous slice. Coefficients below
+    MIN_COEFF (beyond ~third cousins) are dropped to keep the rows short.
+    """
+    _SHIFT = np.int64(32)
+    _MASK = np.int64(0xFFFFFFFF)
+    MIN_COEFF = 1.0 / 256
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.float32)
+        self.self_kin = np.empty(0, dtype=np.float32) # f(a, a), by handle
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def _pack(cls, a, b) -> np.ndarray:
+        return (np.asarray(a, dtype=np.int64) << cls._SHIFT) | np.asarray(b, dtype=np.int64)
+
+    def _ensure_capacity(self, max_handle: int) -> None:
+        cap = len(self.self_kin)
+        if max_handle < cap: return
+        new_cap = max(cap, 64)
+        while new_cap <= max_handle: new_cap *= 2
+        out = np.full(new_cap, 0.5, dtype=np.float32)
+        out[:cap] = self.self_kin
+        self.self_kin = out
+
+    def _rows(self, handles):
+        """(owner position, relative, coefficient) of the rows of many handles at once."""
+        handles = np.asarray(handles, dtype=np.int64)
+        lo = np.searchsorted(self.keys, handles << self._SHIFT)
+        hi = np.searchsorted(self.keys, (handles + 1) << self._SHIFT)
+        lengths = hi - lo
+        owner = np.repeat(np.arange(len(handles)), lengths)
+        # Ragged gather: positions lo[i] .. hi[i] for each handle, concatenated
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pos = np.repeat(lo, lengths) + offsets
+        return owner, self.keys[pos] & self._MASK, self.values[pos]
+
+    # --- Queries ---
+    def kinship(self, a, b) -> np.ndarray:
+        """Kinship coefficients of paired handles (unknown handles count as founders)."""
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        out = np.zeros(len(a), dtype=np.float64)
+        same = (a == b) & (a >= 0)
+        known_self = same & (a < len(self.self_kin))
+        out[same] = 0.5
+        out[known_self] = self.self_kin[a[known_self]]
+
+        pair = ~same & (a >= 0) & (b >= 0)
+        if pair.any() and len(self.keys):
+            keys = self._pack(a[pair], b[pair])
+            pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+            hit = self.keys[pos] == keys
+            vals = np.zeros(len(keys))
+            vals[hit] = self.values[pos[hit]]
+            out[pair] = vals
+        return out
+
+    def kinship_of(self, a: int, b: int) -> float:
+        return float(self.kinship([a], [b])[0])
+
+    def inbreeding(self, handles) -> np.ndarray:
+        """Inbreeding coefficient F = 2 f(a, a) - 1."""
+        return 2.0 * self.kinship(handles, handles) - 1.0
+
+    def relatives(self, handle: int):
+        """(handles, coefficients) of everyone related to one agent."""
+        _, rel, vals = self._rows([handle])
+        return rel, vals
+
+    # --- Updates ---
+    def add_births(self, children, mothers, fathers) -> None:
+        """
+        Adds a batch of newborns. Parents may be -1 (unknown founder line).
+        Children of the same batch are related through their parents as well.
+        """
+        children = np.asarray(children, dtype=np.int64)
+        mothers = np.asarray(mothers, dtype=np.int64)
+        fathers = np.asarray(fathers, dtype=np.int64)
+        if len(children) == 0: return
+        self._ensure_capacity(int(max(children.max(), mothers.max(), fathers.max())))
+
+        # 1. Self kinship from the parents' kinship
+        self.self_kin[children] = 0.5 * (1.0 + self.kinship(mothers, fathers))
+
+        # 2. Child x existing agents: half of each parent's row, plus the parents themselves
+        owner_parts, rel_parts, val_parts = [], [], []
+        for parents in (mothers, fathers):
+            known = np.flatnonzero(parents >= 0)
+            owner, rel, vals = self._rows(parents[known])
+            owner_parts += [known[owner], known]
+            rel_parts += [rel, parents[known]]
+            val_parts += [0.5 * vals, 0.5 * self.self_kin[parents[known]]]
+
+        # 3. Child x child (same batch): f(ci, cj) = mean over their parent pairs
+        if len(children) > 1:
+            i, j = np.triu_indices(len(children), k=1)
+            coeff = 0.25 * (self.kinship(mothers[i], mothers[j]) + self.kinship(mothers[i], fathers[j])
+                            + self.kinship(fathers[i], mothers[j]) + self.kinship(fathers[i], fathers[j]))
+            for p, q in ((i, j), (j, i)):
+                owner_parts.append(p)
+                rel_parts.append(children[q])
+                val_parts.append(coeff)
+
+        owner = np.concatenate(owner_parts)
+        keys = self._pack(children[owner], np.concatenate(rel_parts))
+        vals = np.concatenate(val_parts).astype(np.float64)
+
+        # Sum contributions per pair (a relative may appear in both parents' rows)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        vals = np.bincount(inverse, weights=vals)
+        strong = vals >= self.MIN_COEFF
+        keys, vals = keys[strong], vals[strong]
+
+        # 4. Merge both directions into the sorted store
+        a, b = keys >> self._SHIFT, keys & self._MASK
+        mirror = ~np.isin(b, children) # Child x child pairs are already symmetric
+        new_keys = np.concatenate([keys, self._pack(b[mirror], a[mirror])])
+        new_vals = np.concatenate([vals, vals[mirror]]).astype(np.float32)
+        order = np.argsort(new_keys, kind='stable')
+        new_keys, new_vals = new_keys[order], new_vals[order]
+
+        pos = np.searchsorted(self.keys, new_keys)
+        self.keys = np.insert(self.keys, pos, new_keys)
+        self.values = np.insert(self.values, pos, new_vals)
+
+    def prune(self, handles) -> int:
+        """Removes archived agents from the store (their rows and their column entries)."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0 or len(self.keys) == 0: return 0
+        drop = np.isin(self.keys >> self._SHIFT, handles) | np.isin(self.keys & self._MASK, handles)
+        if drop.any():
+            self.keys = self.keys[~drop]
+            self.values = self.values[~drop]
+        return int(drop.sum())
@@ -0,0 +1,316 @@
+import numpy as np
+import pandas as pd
+from .worldgen import generate_tiles, TERRAIN_TYPES, TERRAIN_CODE
+from .regrowth import RegrowthModel
+
+TERRAIN_COLORS = ['#C2B280', '#228B22', '#8B8B8B', '#4169E1'] # Sand, Green, Grey, Blue
+
+class MapChunk:
+    """One chunk_size x chunk_size block of tiles, regrown up to last_tick."""
+    __slots__ = ('layers', 'last_tick')
+
+    def __init__(self, layers: dict, tick: int):
+        self.layers = layers
+        self.last_tick = tick
+
+class MapGrid:
+    """
+    World Map as 2-D NumPy layers, all indexed [gx, gy], stored in lazily activated chunks.
+    Layers:
+    - terrain: int8 terrain code (see TERRAIN_TYPES)
+    - res_wood/res_stone/res_food: current resources
+    - max_wood/max_stone/max_food: capacity (for regeneration)
+    - resource_bonus, elevation/moisture/river (generator layers)
+    The world spans [0, world_size) on both axes, split into grid_size x grid_size tiles.
+
+    Chunks nobody has read are not stored: they are regenerated from the world seed
+    (pristine, resources at capacity) on first access. Regrowth is only recorded in
+    the RegrowthModel history; a chunk catches up in closed form when next read.
+    """
+    RESOURCES = ['wood', 'stone', 'food']
+    LAYERS = [f"res_{r}" for r in RESOURCES] + [f"max_{r}" for r in RESOURCES]
+    _DTYPES = {'terrain': np.int8, 'river': bool, 'elevation': np.float32, 'moisture': np.float32}
+    _ALL_LAYERS = ['terrain', 'resource_bonus', 'elevation', 'moisture', 'river'] + LAYERS
+
+    def __init__(self, grid_size: int = 20, world_size: float = 100.0, seed: int = None, chunk_size: int = 32):
+        self.grid_size = int(grid_size)
+        self.world_size = float(world_size)
+        self.scale = self.world_size / self.grid_size # World units per tile
+        self.seed = seed # None -> blank (Plains, no resources)
+        self.chunk_size = int(chunk_size)
+        self.n_chunks = -(-self.grid_size // self.chunk_size)
+
+        self.chunks = {}  # (cx, cy) -> MapChunk (only activated ones)
+        self._pristine_cache = {} # (cx, cy) -> {layer: array} of halo chunks read by the flow field
+        self.regrowth = RegrowthModel()
+        
+        # Flow Field over its window only (see compute_flow_field)
+        self.flow_dx = None
+        self.flow_dy = None
+        self.flow_x0, self.flow_y0 = 0, 0
+        self.flow_tick = -1
+
+    @property
+    def tick(self) -> int:
+        """Regrowth ticks recorded so far."""
+        return self.regrowth.tick
+
+    @property
+    def shape(self):
+        return (self.grid_size, self.grid_size)
+
+    # --- Chunk Management ---
+    def _chunk_bounds(self, cx: int, cy: int):
+        x0, y0 = cx * self.chunk_size, cy * self.chunk_size
+        return x0, min(x0 + self.chunk_size, self.grid_size), y0, min(y0 + self.chunk_size, self.grid_size)
+
+    def _pristine_layers(self, cx: int, cy: int) -> dict:
+        """Layers of a never-touched chunk, straight from the generator (or blank)."""
+        x0, x1, y0, y1 = self._chunk_bounds(cx, cy)
+        shape = (x1 - x0, y1 - y0)
+        layers = {name: np.zeros(shape, dtype=self._DTYPES.get(name, float)) for name in self._ALL_LAYERS}
+        layers['resource_bonus'][:] = 1.0
+        if self.seed is not None:
+            tiles = generate_tiles(self.seed, np.arange(x0, x1), np.arange(y0, y1), self.grid_size)
+            for name, values in tiles.items():
+                layers[name][:] = values
+            for res in self.RESOURCES:
+                layers[f'res_{res}'][:] = layers[f'max_{res}']
+        return layers
+
+    def chunk(self, cx: int, cy: int) -> MapChunk:
+        """Activated, caught-up chunk (generated on first access)."""
+        key = (int(cx), int(cy))
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            # Pristine resources are at capacity, so pending regrowth is a no-op
+            chunk = MapChunk(self._pristine_layers(*key), self.tick)
+            self.chunks[key] = chunk
+        elif chunk.last_tick != self.tick:
+            self._catch_up(chunk)
+        return chunk
+
+    def _catch_up(self, chunk: MapChunk) -> None:
+        """Closed-form regrowth from the chunk's last update to now."""
+        for res in self.regrowth.RESOURCES:
+            self.regrowth.advance(chunk.layers[f'res_{res}'], chunk.layers[f'max_{res}'], res, chunk.last_tick)
+        chunk.last_tick = self.tick
+
+    def regrow(self, rates: dict) -> None:
+        """Advances regrowth by one tick (rates: resource -> fraction of capacity). O(1)."""
+        self.regrowth.record(rates)
+
+    # --- Tile Access ---
+    def cell_of(self, x, y):
+        """Tile indices (gx, gy) for world coordinates, clamped to the map."""
+        top = self.grid_size - 1
+        gx = np.clip(np.floor_divide(np.asarray(x, dtype=float), self.scale), 0, top).astype(np.int64)
+        gy = np.clip(np.floor_divide(np.asarray(y, dtype=float), self.scale), 0, top).astype(np.int64)
+        return gx, gy
+
+    def tile(self, gx: int, gy: int):
+        """(layers, lx, ly) of one tile, for scalar reads/writes: layers['res_food'][lx, ly]."""
+        cs = self.chunk_size
+        return self.chunk(gx // cs, gy // cs).layers, gx % cs, gy % cs
+
+    def _by_chunk(self, gx, gy):
+        """Groups tile indices by chunk: yields (chunk, positions, lx, ly)."""
+        gx = np.asarray(gx, dtype=np.int64)
+        gy = np.asarray(gy, dtype=np.int64)
+        cs = self.chunk_size
+        keys = (gx // cs) * self.n_chunks + (gy // cs)
+        for key in np.unique(keys):
+            pos = np.flatnonzero(keys == key)
+            chunk = self.chunk(key // self.n_chunks, key % self.n_chunks)
+            yield chunk, pos, gx[pos] % cs, gy[pos] % cs
+
+    def read(self, layer: str, gx, gy) -> np.ndarray:
+        """Layer values at tile indices (activates the chunks touched)."""
+        gx = np.asarray(gx, dtype=np.int64)
+        out = np.zeros(gx.shape, dtype=self._DTYPES.get(layer, float))
+        for chunk, pos, lx, ly in self._by_chunk(gx, gy):
+            out[pos] = chunk.layers[layer][lx, ly]
+        return out
+
+    def write(self, layer: str, gx, gy, values) -> None:
+        values = np.broadcast_to(np.asarray(values), np.shape(gx))
+        for chunk, pos, lx, ly in self._by_chunk(gx, gy):
+            chunk.layers[layer][lx, ly] = values[pos]
+
+    def add(self, layer: str, gx, gy, delta) -> None:
+        """Unbuffered add (repeated tiles accumulate)."""
+        delta = np.broadcast_to(np.asarray(delta, dtype=float), np.shape(gx))
+        for chunk, pos, lx, ly in self._by_chunk(gx, gy):
+            np.add.at(chunk.layers[layer], (lx, ly), delta[pos])
+
+    def terrain_at(self, x, y) -> np.ndarray:
+        """Terrain codes under world coordinates."""
+        gx, gy = self.cell_of(x, y)
+        return self.read('terrain', gx, gy)
+
+    def dense(self, layer: str) -> np.ndarray:
+        """
+        Whole-world copy of one layer. Untouched chunks are generated on the fly but not
+        activated, so viewing the map does not grow memory.
+        """
+        return self.dense_layers([layer])[layer]
+
+    def dense_layers(self, names) -> dict:
+        """Whole-world copies of several layers; each untouched chunk is generated once for all of them."""
+        out = {name: np.zeros(self.shape, dtype=self._DTYPES.get(name, float)) for name in names}
+        for cx in range(self.n_chunks):
+            for cy in range(self.n_chunks):
+                x0, x1, y0, y1 = self._chunk_bounds(cx, cy)
+                if (cx, cy) in self.chunks:
+                    layers = self.chunk(cx, cy).layers
+                else:
+                    layers = self._pristine_layers(cx, cy)
+                for name in names:
+                    out[name][x0:x1, y0:y1] = layers[name]
+        return out
+
+    def __getitem__(self, layer: str) -> np.ndarray:
+        return self.dense(layer)
+
+    @property
+    def terrain(self) -> np.ndarray:
+        return self.dense('terrain')
+
+    # --- Flow Field (Gatherer Targeting) ---
+    # 8-neighbourhood offsets and their unit directions
+    _NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+    FLOW_HALO = 1 # Chunks around the activated ones covered by the flow field (~ diffusion reach)
+
+    def _pristine_layer(self, cx: int, cy: int, layer: str) -> np.ndarray:
+        """One pristine layer of an untouched chunk, generated once and cached (the seed never changes)."""
+        cached = self._pristine_cache.setdefault((cx, cy), {})
+        if layer not in cached:
+            cached.update({k: v for k, v in self._pristine_layers(cx, cy).items() if k in ('terrain', layer)})
+        return cached[layer]
+
+    def _flow_window(self, layer: str):
+        """
+        (x0, y0, supply, passable) over the bounding box of the activated chunks plus FLOW_HALO.
+        Halo chunks use cached pristine layers; box tiles outside activated + halo are walls.
+        """
+        if not self.chunks: return None
+        active = np.array(list(self.chunks.keys()))
+        h, top = self.FLOW_HALO, self.n_chunks - 1
+        c0 = np.clip(active.min(axis=0) - h, 0, top)
+        c1 = np.clip(active.max(axis=0) + h, 0, top)
+        x0, _, y0, _ = self._chunk_bounds(c0[0], c0[1])
+        _, x1, _, y1 = self._chunk_bounds(c1[0], c1[1])
+
+        supply = np.zeros((x1 - x0, y1 - y0))
+        passable = np.zeros((x1 - x0, y1 - y0), dtype=bool)
+        # Chunks of the box within FLOW_HALO (Chebyshev) of an activated one
+        box = np.array([(cx, cy) for cx in range(c0[0], c1[0] + 1) for cy in range(c0[1], c1[1] + 1)])
+        near = (np.abs(box[:, None, :] - active[None]).max(axis=2) <= h).any(axis=1)
+        for cx, cy in box[near].tolist():
+            bx0, bx1, by0, by1 = self._chunk_bounds(cx, cy)
+            window = (slice(bx0 - x0, bx1 - x0), slice(by0 - y0, by1 - y0))
+            if (cx, cy) in self.chunks:
+                self._pristine_cache.pop((cx, cy), None)
+                layers = self.chunk(cx, cy).layers
+                supply[window], terrain = layers[layer], layers['terrain']
+            else:
+                supply[window], terrain = self._pristine_layer(cx, cy, layer), self._pristine_layer(cx, cy, 'terrain')
+            passable[window] = terrain != TERRAIN_CODE['Water']
+        return x0, y0, supply, passable
+
+    def compute_flow_field(self, layer: str = 'res_food', iterations: int = 30, decay: float = 0.9) -> None:
+        """
+        Diffuses a resource layer into a smooth potential and stores, per tile, the unit
+        direction towards the best neighbour (flow_dx/flow_dy, 0 at local peaks).
+        Water blocks the flow. Pure array stencils; no per-agent pathfinding.
+        Only the activated chunks (plus a FLOW_HALO ring) are covered, so the world is
+        never regenerated: flow_dx/flow_dy hold that window, whose first tile is
+        (flow_x0, flow_y0). Tiles outside read as no flow (see flow_of).
+        """
+        self.flow_tick = self.tick
+        window = self._flow_window(layer)
+        if window is None:
+            self.flow_dx = np.zeros((0, 0), dtype=np.float32)
+            self.flow_dy = np.zeros((0, 0), dtype=np.float32)
+            self.flow_x0, self.flow_y0 = 0, 0
+            return
+        x0, y0, supply, passable = window
+
+        peak = supply[passable].max() if passable.any() else 0.0
+        supply = np.where(passable, supply / peak if peak > 0 else 0.0, 0.0)
+
+        # 1. Diffusion: P = supply + decay * mean(4-neighbours of P), walls at 0
+        potential = supply.copy()
+        for _ in range(iterations):
+            p = np.pad(potential, 1)
+            neighbours = (p[:-2, 1:-1] + p[2:, 1:-1] + p[1:-1, :-2] + p[1:-1, 2:]) * 0.25
+            potential = (supply + decay * neighbours) * passable
+
+        # 2. Steepest ascent over the 8 neighbours
+        p = np.pad(potential, 1, constant_values=-1.0)
+        nx, ny = potential.shape
+        stacked = np.stack([p[1 + dx:1 + dx + nx, 1 + dy:1 + dy + ny] for dx, dy in self._NEIGHBOURS])
+        best = stacked.argmax(axis=0)
+        uphill = stacked.max(axis=0) > potential
+
+        offsets = np.array(self._NEIGHBOURS, dtype=np.float32)
+        unit = offsets / np.linalg.norm(offsets, axis=1, keepdims=True)
+        self.flow_dx = np.where(uphill, unit[best, 0], 0.0).astype(np.float32)
+        self.flow_dy = np.where(uphill, unit[best, 1], 0.0).astype(np.float32)
+        self.flow_x0, self.flow_y0 = x0, y0
+
+    def flow_of(self, gx, gy):
+        """(dx, dy) flow direction of grid tiles (zeros outside the window / before the first compute)."""
+        gx = np.asarray(gx, dtype=np.int64) - self.flow_x0
+        gy = np.asarray(gy, dtype=np.int64) - self.flow_y0
+        fx, fy = np.zeros(gx.shape), np.zeros(gy.shape)
+        if self.flow_dx is None: return fx, fy
+        inside = (gx >= 0) & (gx < self.flow_dx.shape[0]) & (gy >= 0) & (gy < self.flow_dx.shape[1])
+        fx[inside] = self.flow_dx[gx[inside], gy[inside]]
+        fy[inside] = self.flow_dy[gx[inside], gy[inside]]
+        return fx, fy
+
+    def flow_at(self, x, y):
+        """(dx, dy) flow direction under world coordinates (see flow_of)."""
+        return self.flow_of(*self.cell_of(x, y))
+
+    # --- DataFrame View (UI / Legacy) ---
+    def to_frame(self) -> pd.DataFrame:
+        """One row per tile (row = gx * grid_size + gy), with tile bounds for plotting."""
+        gx, gy = np.meshgrid(np.arange(self.grid_size), np.arange(self.grid_size), indexing='ij')
+        gx, gy = gx.ravel(), gy.ravel()
+        layers = self.dense_layers(['terrain', 'resource_bonus'] + self.LAYERS) # One generator pass
+        codes = layers['terrain'].ravel()
+        frame = pd.DataFrame({
+            'grid_x': gx,
+            'grid_y': gy,
+            'real_x': gx * self.scale + self.scale / 2,
+            'real_y': gy * self.scale + self.scale / 2,
+            'x': gx * self.scale,
+            'y': gy * self.scale,
+            'x2': (gx + 1) * self.scale,
+            'y2': (gy + 1) * self.scale,
+            'terrain': np.array(TERRAIN_TYPES, dtype=object)[codes],
+            'color': np.array(TERRAIN_COLORS, dtype=object)[codes],
+            'resource_bonus': layers['resource_bonus'].ravel(),
+        })
+        for name in self.LAYERS:
+            frame[name] = layers[name].ravel()
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, world_size: float = None) -> 'MapGrid':
+        """Builds a (fully activated, unseeded) grid from a tile DataFrame."""
+        grid_size = int(max(frame['grid_x'].max(), frame['grid_y'].max())) + 1
+        if world_size is None:
+            world_size = float(frame['x2'].max()) if 'x2' in frame.columns else grid_size * 5.0
+        grid = cls(grid_size, world_size)
+
+        gx = frame['grid_x'].to_numpy(dtype=np.int64)
+        gy = frame['grid_y'].to_numpy(dtype=np.int64)
+        grid.write('terrain', gx, gy, frame['terrain'].map(TERRAIN_CODE).fillna(0).to_numpy(dtype=np.int8))
+        for name in ['resource_bonus'] + cls.LAYERS:
+            if name in frame.columns:
+                grid.write(name, gx, gy, frame[name].to_numpy(dtype=float))
+        return grid
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+class NeedsTable:
+    """
+    Per-Tick Needs & Surplus of the living population (row i = i-th living agent).
+    - held: (N, n_items) units held (stacks + tool counts), by store item code
+    - food: total food units / tools: number of tools of any kind
+    - hungry (Stamina or Happiness < 50), needs_food (food < FOOD_RESERVE), needs_tool (no tools)
+    - surplus: whole units an agent can part with (no food surplus below the reserve)
+    Built by WorldState.needs() and reused until the inventory store mutates (its
+    version moves), the day changes or the living rows change (births, deaths);
+    hunger is re-read on every call. Systems that mutate a few inventories can
+    re-derive just those rows with update_rows().
+    """
+    HUNGRY = 50.0
+    FOOD_RESERVE = 2.0 # Food units an agent keeps for itself (one day's meal)
+
+    def __init__(self, living: pd.DataFrame, handles, store, catalogue, day: int = 0):
+        self.index = living.index
+        self.ids = living['id'].to_numpy()
+        self.handles = np.asarray(handles, dtype=np.int64)
+        self.store, self.day, self.size = store, day, len(living)
+        self._food_codes = store.codes_of(catalogue.food_items)
+        n = len(self.handles)
+
+        self.refresh_hunger(living)
+
+        self.held = store.holdings(self.handles)
+        self._allocate()
+        self._derive(np.arange(n))
+        self.version = store.version
+
+    def __len__(self):
+        return len(self.handles)
+
+    def is_current(self, store, day: int, population_size: int, living_index: pd.Index) -> bool:
+        """Inventory-derived columns are still valid (same store version, day and living rows)."""
+        return (self.store is store and self.version == store.version and self.day == day
+                and self.size == population_size and self.held.shape[1] == len(store.items)
+                and self.index.equals(living_index))
+
+    def refresh_hunger(self, living: pd.DataFrame) -> None:
+        """Re-reads hunger (Stamina or Happiness < 50) of the same living rows."""
+        n = len(living)
+        stamina = living['stamina'].to_numpy(dtype=float) if 'stamina' in living.columns else np.full(n, 100.0)
+        happiness = living['happiness'].to_numpy(dtype=float) if 'happiness' in living.columns else np.full(n, 100.0)
+        self.hungry = (stamina < self.HUNGRY) | (happiness < self.HUNGRY)
+
+    def update_rows(self, rows) -> None:
+        """Re-reads the inventories of some rows and adopts the store's current version."""
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if self.held.shape[1] < len(self.store.items):
+            self.held = self.store.holdings(self.handles) # New item kinds: full rebuild
+            self._allocate()
+            rows = np.arange(len(self.handles))
+        elif len(rows):
+            self.held[rows] = self.store.holdings(self.handles[rows])
+        self._derive(rows)
+        self.version = self.store.version
+
+    def _allocate(self) -> None:
+        n = len(self.handles)
+        self.food, self.tools = np.zeros(n), np.zeros(n)
+        self.needs_food, self.needs_tool = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        self.surplus = np.zeros_like(self.held)
+
+    def _derive(self, rows) -> None:
+        held = self.held[rows]
+        tool_kinds = np.flatnonzero(self.store.durable[:held.shape[1]])
+        self.food[rows] = held[:, self._food_codes].sum(axis=1)
+        self.tools[rows] = held[:, tool_kinds].sum(axis=1)
+        self.needs_food[rows] = self.food[rows] < self.FOOD_RESERVE
+        self.needs_tool[rows] = self.tools[rows] < 1.0
+
+        surplus = np.floor(held)
+        surplus[np.ix_(self.needs_food[rows], self._food_codes)] = 0.0
+        self.surplus[rows] = surplus
@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+
+class OpinionMatrix:
+    """
+    Sparse Observer x Target Opinion Matrix (COO, row-major sorted).
+    Each entry is keyed by (observer_handle << 32 | target_handle) and stored in a
+    sorted int64 array next to a float32 score array, so all rows of one observer
+    form a contiguous slice (CSR without the row pointer array).
+    Scores are clamped to [-100, 100]; missing entries read as neutral (0).
+    
+    Reputation Tallies: per-target score sums/counts, globally and per observer
+    group (tribe), are kept in step with every write so reputation is an O(1) read.
+    """
+    _SHIFT = np.int64(32)
+    _MASK = np.int64(0xFFFFFFFF)
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.float32)
+        
+        # Observer Groups (handle -> group code, -1 = none)
+        self.group_codes = {}                       # group name -> code
+        self.observer_group = np.empty(0, dtype=np.int32)
+        
+        # Reputation Tallies (indexed by target handle)
+        self.rep_sum = np.empty(0, dtype=np.float64)
+        self.rep_count = np.empty(0, dtype=np.int64)
+        self.group_sum = np.empty((0, 0), dtype=np.float64)   # [group, target]
+        self.group_count = np.empty((0, 0), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __bool__(self):
+        return len(self.keys) > 0
+
+    @classmethod
+    def _pack(cls, observers, targets) -> np.ndarray:
+        return (np.asarray(observers, dtype=np.int64) << cls._SHIFT) | np.asarray(targets, dtype=np.int64)
+
+    @property
+    def observers(self) -> np.ndarray:
+        return self.keys >> self._SHIFT
+
+    @property
+    def targets(self) -> np.ndarray:
+        return self.keys & self._MASK
+
+    # --- Tally Bookkeeping ---
+    def _ensure_capacity(self, max_handle: int, n_groups: int = None) -> None:
+        n_groups = self.group_sum.shape[0] if n_groups is None else n_groups
+        cap = len(self.rep_sum)
+        if max_handle < cap and n_groups <= self.group_sum.shape[0]: return
+        
+        new_cap = max(cap, 64)
+        while new_cap <= max_handle: new_cap *= 2
+        
+        def grow(arr, fill, dtype):
+            out = np.full(new_cap, fill, dtype=dtype)
+            out[:len(arr)] = arr
+            return out
+        self.rep_sum = grow(self.rep_sum, 0.0, np.float64)
+        self.rep_count = grow(self.rep_count, 0, np.int64)
+        self.observer_group = grow(self.observer_group, -1, np.int32)
+        
+        g_sum = np.zeros((n_groups, new_cap), dtype=np.float64)
+        g_count = np.zeros((n_groups, new_cap), dtype=np.int64)
+        old_g, old_cap = self.group_sum.shape
+        g_sum[:old_g, :old_cap] = self.group_sum
+        g_count[:old_g, :old_cap] = self.group_count
+        self.group_sum, self.group_count = g_sum, g_count
+
+    def _tally(self, observers, targets, d_sum, d_count) -> None:
+        """Applies score/count deltas of entries to the reputation tallies."""
+        if len(targets) == 0: return
+        np.add.at(self.rep_sum, targets, d_sum)
+        np.add.at(self.rep_count, targets, d_count)
+        
+        groups = self.observer_group[observers]
+        grouped = groups >= 0
+        if grouped.any():
+            np.add.at(self.group_sum, (groups[grouped], targets[grouped]), np.broadcast_to(d_sum, targets.shape)[grouped])
+            np.add.at(self.group_count, (groups[grouped], targets[grouped]), np.broadcast_to(d_count, targets.shape)[grouped])
+
+    def _rebuild_tallies(self) -> None:
+        """Recomputes all tallies from the entries (used after O(nnz) passes)."""
+        self.rep_sum[:] = 0.0
+        self.rep_count[:] = 0
+        self.group_sum[:] = 0.0
+        self.group_count[:] = 0
+        self._tally(self.observers, self.targets, self.values.astype(np.float64), 1)
+
+    def assign_groups(self, handles, groups) -> None:
+        """
+        Sets the observer group (e.g. tribe_id) of each handle.
+        Rows of observers that switch group are moved between group tallies.
+        """
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0: return
+        
+        # Factorize once, then map the (few) distinct names to group codes
+        local, names = pd.factorize(np.asarray(groups, dtype=object), use_na_sentinel=False)
+        for name in names:
+            if name not in self.group_codes:
+                self.group_codes[name] = len(self.group_codes)
+        codes = np.array([self.group_codes[name] for name in names], dtype=np.int32)[local]
+        self._ensure_capacity(int(handles.max()), len(self.group_codes))
+        
+        changed = self.observer_group[handles] != codes
+        if not changed.any(): return
+        
+        for h, code in zip(handles[changed], codes[changed]):
+            lo, hi = self._row_bounds(h)
+            tgt = self.keys[lo:hi] & self._MASK
+            vals = self.values[lo:hi].astype(np.float64)
+            prev = self.observer_group[h]
+            if prev >= 0:
+                np.subtract.at(self.group_sum[prev], tgt, vals)
+                np.subtract.at(self.group_count[prev], tgt, 1)
+            np.add.at(self.group_sum[code], tgt, vals)
+            np.add.at(self.group_count[code], tgt, 1)
+            self.observer_group[h] = code
+
+    def _row_bounds(self, observer: int):
+        lo = np.searchsorted(self.keys, np.int64(observer) << self._SHIFT)
+        hi = np.searchsorted(self.keys, (np.int64(observer) + 1) << self._SHIFT)
+        return lo, hi
+
+    def _find(self, keys):
+        """Positions of keys in the store and whether they exist."""
+        pos = np.searchsorted(self.keys, keys)
+        found = pos < len(self.keys)
+        found[found] = self.keys[pos[found]] == keys[found]
+        return pos, found
+
+    # --- Bulk Access ---
+    def get(self, observers, targets, default: float = 0.0) -> np.ndarray:
+        """Scores for parallel arrays of observer/target handles."""
+        keys = self._pack(observers, targets)
+        pos, found = self._find(keys)
+        out = np.full(len(keys), default, dtype=np.float32)
+        out[found] = self.values[pos[found]]
+        return out
+
+    def set(self, observers, targets, scores) -> None:
+        """
+        Upserts scores for parallel arrays of handles.
+        Existing entries are overwritten in place, new ones are merged in one pass.
+        Duplicate pairs in one batch: the last write wins.
+        """
+        keys = self._pack(observers, targets)
+        if len(keys) == 0: return
+        scores = np.clip(np.broadcast_to(np.asarray(scores, dtype=np.float32), keys.shape), -100, 100)
+
+        # Last write wins: keep the final occurrence of each key
+        rev_keys, rev_first = np.unique(keys[::-1], return_index=True)
+        keys = rev_keys
+        scores = scores[::-1][rev_first]
+
+        pos, found = self._find(keys)
+        obs, tgt = keys >> self._SHIFT, keys & self._MASK
+        self._ensure_capacity(int(max(obs.max(), tgt.max())))
+        
+        # Tallies: overwritten entries contribute their delta, new ones a fresh count
+        old = np.zeros(len(keys), dtype=np.float64)
+        old[found] = self.values[pos[found]]
+        self._tally(obs, tgt, scores.astype(np.float64) - old, (~found).astype(np.int64))
+        
+        self.values[pos[found]] = scores[found]
+
+        new = ~found
+        if new.any():
+            self.keys = np.insert(self.keys, pos[new], keys[new])
+            self.values = np.insert(self.values, pos[new], scores[new])
+
+    # --- Maintenance ---
+    def decay(self, factor: float, min_abs: float = 0.5) -> None:
+        """Opinions fade towards neutral; entries weaker than min_abs are dropped."""
+        self.values *= np.float32(factor)
+        keep = np.abs(self.values) >= min_abs
+        if not keep.all():
+            self.keys = self.keys[keep]
+            self.values = self.values[keep]
+        self._rebuild_tallies()
+
+    def prune(self, handles) -> int:
+        """Removes every entry held by or about the given handles. Returns the number removed."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0 or len(self.keys) == 0: return 0
+
+        drop = np.isin(self.observers, handles) | np.isin(self.targets, handles)
+        if drop.any():
+            self.keys = self.keys[~drop]
+            self.values = self.values[~drop]
+            self._rebuild_tallies()
+        return int(drop.sum())
+
+    # --- Queries ---
+    def row(self, observer: int):
+        """(targets, scores) of everything one observer thinks."""
+        lo, hi = self._row_bounds(observer)
+        return self.keys[lo:hi] & self._MASK, self.values[lo:hi]
+
+    def top_opinions_of(self, observer: int, k: int = 5):
+        """The observer's k strongest opinions (by magnitude), strongest first."""
+        targets, scores = self.row(observer)
+        order = np.argsort(-np.abs(scores), kind='stable')[:k]
+        return targets[order], scores[order]
+
+    def reputation(self, targets, group=None):
+        """
+        O(1)-per-target reputation: (mean score, number of observers) arrays.
+        group restricts to observers of one group (e.g. a tribe_id); unknown handles read 0.
+        """
+        targets = np.asarray(targets, dtype=np.int64)
+        valid = (targets >= 0) & (targets < len(self.rep_sum))
+        sums = np.zeros(len(targets))
+        counts = np.zeros(len(targets), dtype=np.int64)
+        
+        if group is None:
+            sums[valid] = self.rep_sum[targets[valid]]
+            counts[valid] = self.rep_count[targets[valid]]
+        elif group in self.group_codes and self.group_codes[group] < self.group_sum.shape[0]:
+            code = self.group_codes[group]
+            sums[valid] = self.group_sum[code, targets[valid]]
+            counts[valid] = self.group_count[code, targets[valid]]
+            
+        means = np.divide(sums, counts, out=np.zeros(len(targets)), where=counts > 0)
+        return means, counts
+
+    def reputation_of(self, target: int, group=None):
+        """(mean score, number of observers) for one target."""
+        means, counts = self.reputation([target], group)
+        return float(means[0]), int(counts[0])
+
+    def to_frame(self, handles=None) -> pd.DataFrame:
+        """Long view (Observer, Target, Score); IDs are resolved if a HandleRegistry is given."""
+        obs, tgt = self.observers, self.targets
+        if handles is not None:
+            obs, tgt = handles.ids_of(obs), handles.ids_of(tgt)
+        return pd.DataFrame({"Observer": obs, "Target": tgt, "Score": self.values.astype(float)})
@@ -0,0 +1,52 @@
+import numpy as np
+
+class RegrowthModel:
+    """
+    Closed-Form Resource Regrowth.
+    Each tick a tile regrows a fraction k(t) of its capacity, clamped at capacity:
+        res(t+1) = min(res(t) + cap * k(t), cap)
+    k(t) >= 0, so the clamps compose and any span of ticks collapses into one step:
+        res(t1) = min(res(t0) + cap * (K(t1) - K(t0)), cap)
+    where K is the running sum of k. K is kept per tick, so a tile can be advanced
+    from whenever it was last updated, through whatever weather and seasons passed.
+    """
+    RESOURCES = ['wood', 'food']           # Stone does not regrow
+    BASE_RATE = 0.05                        # 5% per tick base
+    RESOURCE_FACTOR = {'wood': 0.01, 'food': 0.05}
+    WEATHER_FACTOR = {'Rain': 1.5, 'Storm': 1.2}
+
+    def __init__(self):
+        self.tick = 0
+        self._cumulative = {res: np.zeros(64) for res in self.RESOURCES} # K(t), t = 0..tick
+
+    @classmethod
+    def rates(cls, weather: str = 'Sunny', season: str = 'Spring') -> dict:
+        """Per-tick regrowth fraction k for each resource."""
+        rate = cls.BASE_RATE
+        # Weather effects on Regrow
+        if weather in cls.WEATHER_FACTOR: rate *= cls.WEATHER_FACTOR[weather]
+        elif season == 'Winter': rate = 0.0
+        return {res: rate * cls.RESOURCE_FACTOR[res] for res in cls.RESOURCES}
+
+    def record(self, rates: dict) -> None:
+        """Appends one tick of regrowth to the history."""
+        self.tick += 1
+        for res in self.RESOURCES:
+            hist = self._cumulative[res]
+            if self.tick >= len(hist):
+                hist = np.concatenate([hist, np.zeros(len(hist))])
+                self._cumulative[res] = hist
+            hist[self.tick] = hist[self.tick - 1] + max(0.0, float(rates.get(res, 0.0)))
+
+    def total(self, res: str, t0: int, t1: int = None) -> float:
+        """Summed k over ticks (t0, t1]."""
+        t1 = self.tick if t1 is None else t1
+        hist = self._cumulative[res]
+        return float(hist[t1] - hist[t0])
+
+    def advance(self, current: np.ndarray, cap: np.ndarray, res: str, t0: int, t1: int = None) -> None:
+        """Advances a resource layer from tick t0 to t1 in place (one add, one minimum)."""
+        k = self.total(res, t0, t1)
+        if k <= 0: return
+        np.add(current, cap * k, out=current)
+        np.minimum(current, cap, out=current)
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+class RelationshipGraph:
+    """
+    Typed Relationship Graph over agent handles.
+    An edge (a, b, type) reads "b is a's <type>"; couples are stored in both directions.
+    - Adjacency: CSR (indptr / indices, sorted by source) plus a small append buffer,
+      merged into the CSR when it grows past BUFFER_LIMIT or before a full read.
+    - Live partner index: partner[h] = current Spouse/Lover/Partner of h (-1 if none),
+      updated on every new bond (the latest wins), so lookups never rebuild a map.
+    Archived agents are pruned in bulk (prune). 'relationships' on WorldState is a
+    long DataFrame view of this graph for the UI.
+    """
+    TYPES = ['Spouse', 'Lover', 'Partner', 'Ex', 'Child', 'Parent']
+    PARTNER_TYPES = ['Spouse', 'Lover', 'Partner']
+    KIN_TYPES = ['Child', 'Parent']
+    FRAME_COLUMNS = ["id_a", "id_b", "type", "commitment", "affection", "start_day"]
+    BUFFER_LIMIT = 256
+    _EDGE_FIELDS = ('src', 'dst', 'etype', 'commitment', 'affection', 'start_day')
+
+    def __init__(self):
+        self.type_codes = {t: i for i, t in enumerate(self.TYPES)}
+        # CSR (edges sorted by source)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.edges = self._empty_edges()
+        # Append Buffer (list of edge batches)
+        self._buffer = []
+        self._buffered = 0
+        # Live Partner Index
+        self.partner = np.full(0, -1, dtype=np.int64)
+
+    @staticmethod
+    def _empty_edges() -> dict:
+        return {'src': np.empty(0, dtype=np.int64), 'dst': np.empty(0, dtype=np.int64),
+                'etype': np.empty(0, dtype=np.int8), 'commitment': np.empty(0),
+                'affection': np.empty(0), 'start_day': np.empty(0, dtype=np.int64)}
+
+    def __len__(self):
+        return len(self.edges['src']) + self._buffered
+
+    def codes_of(self, types) -> np.ndarray:
+        return np.array([self.type_codes[t] for t in types], dtype=np.int8)
+
+    def _ensure_capacity(self, max_handle: int) -> None:
+        cap = len(self.partner)
+        if max_handle < cap: return
+        new_cap = max(cap, 64)
+        while new_cap <= max_handle: new_cap *= 2
+        partner = np.full(new_cap, -1, dtype=np.int64)
+        partner[:cap] = self.partner
+        self.partner = partner
+
+    # --- Updates ---
+    def add(self, src, dst, etype: str, commitment=0.0, affection=0.0, start_day=0, mutual: bool = False) -> None:
+        """Adds typed edges src -> dst (and dst -> src if mutual). Partner types update the index."""
+        src = np.atleast_1d(np.asarray(src, dtype=np.int64))
+        dst = np.atleast_1d(np.asarray(dst, dtype=np.int64))
+        if len(src) == 0: return
+        commitment = np.broadcast_to(np.asarray(commitment, dtype=float), src.shape)
+        affection = np.broadcast_to(np.asarray(affection, dtype=float), src.shape)
+        if mutual:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            commitment, affection = np.tile(commitment, 2), np.tile(affection, 2)
+        n = len(src)
+        batch = {'src': src, 'dst': dst, 'etype': np.full(n, self.type_codes[etype], dtype=np.int8),
+                 'commitment': np.array(commitment), 'affection': np.array(affection),
+                 'start_day': np.full(n, int(start_day), dtype=np.int64)}
+        self._buffer.append(batch)
+        self._buffered += n
+
+        if etype in self.PARTNER_TYPES:
+            self._ensure_capacity(int(src.max()))
+            self.partner[src] = dst # Later rows win
+        if self._buffered > self.BUFFER_LIMIT:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Merges the append buffer into the CSR arrays (stable: older edges first)."""
+        if not self._buffer: return
+        merged = {f: np.concatenate([self.edges[f]] + [b[f] for b in self._buffer]) for f in self._EDGE_FIELDS}
+        order = np.argsort(merged['src'], kind='stable')
+        self.edges = {f: v[order] for f, v in merged.items()}
+        self._buffer, self._buffered = [], 0
+        n_nodes = int(self.edges['src'].max()) + 1 if len(order) else 0
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.edges['src'], minlength=n_nodes))]).astype(np.int64)
+
+    def prune(self, handles) -> int:
+        """Drops every edge touching archived agents; their partners become single."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0: return 0
+        self._flush()
+        drop = np.isin(self.edges['src'], handles) | np.isin(self.edges['dst'], handles)
+        if drop.any():
+            self.edges = {f: v[~drop] for f, v in self.edges.items()}
+            n_nodes = len(self.indptr) - 1
+            self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.edges['src'], minlength=n_nodes))]).astype(np.int64)
+
+        known = handles[handles < len(self.partner)]
+        self.partner[known] = -1
+        self.partner[np.isin(self.partner, handles)] = -1
+        return int(drop.sum())
+
+    # --- Queries ---
+    def partner_of(self, handles) -> np.ndarray:
+        """Current partner handle of each handle (-1 if none / unknown)."""
+        handles = np.asarray(handles, dtype=np.int64)
+        out = np.full(len(handles), -1, dtype=np.int64)
+        known = (handles >= 0) & (handles < len(self.partner))
+        out[known] = self.partner[handles[known]]
+        return out
+
+    def neighbors(self, handle: int, types=None) -> np.ndarray:
+        """Handles linked from one agent (optionally only some edge types)."""
+        self._flush()
+        if handle < 0 or handle + 1 >= len(self.indptr): return np.empty(0, dtype=np.int64)
+        lo, hi = self.indptr[handle], self.indptr[handle + 1]
+        dst = self.edges['dst'][lo:hi]
+        if types is None: return dst
+        return dst[np.isin(self.edges['etype'][lo:hi], self.codes_of(types))]
+
+    def kin_of(self, handle: int) -> np.ndarray:
+        return self.neighbors(handle, self.KIN_TYPES)
+
+    def edge_list(self, types=None):
+        """(src, dst) arrays of all edges (optionally only some types), e.g. for sparse products."""
+        self._flush()
+        src, dst = self.edges['src'], self.edges['dst']
+        if types is None: return src, dst
+        keep = np.isin(self.edges['etype'], self.codes_of(types))
+        return src[keep], dst[keep]
+
+    # --- DataFrame View (UI / Legacy) ---
+    def to_frame(self, handles) -> pd.DataFrame:
+        self._flush()
+        e = self.edges
+        if len(e['src']) == 0: return pd.DataFrame(columns=self.FRAME_COLUMNS)
+        return pd.DataFrame({
+            "id_a": handles.ids_of(e['src']), "id_b": handles.ids_of(e['dst']),
+            "type": np.array(self.TYPES, dtype=object)[e['etype']],
+            "commitment": e['commitment'], "affection": e['affection'], "start_day": e['start_day'],
+        })
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, handles) -> 'RelationshipGraph':
+        """Builds a graph from long rows (one directed edge per row, in row order)."""
+        graph = cls()
+        if frame is None or frame.empty: return graph
+        frame = frame[frame['type'].isin(cls.TYPES)]
+        src = handles.lookup(frame['id_a'].to_numpy(dtype=object))
+        dst = handles.lookup(frame['id_b'].to_numpy(dtype=object))
+        commitment = pd.to_numeric(frame.get('commitment', 0.0), errors='coerce')
+        affection = pd.to_numeric(frame.get('affection', 0.0), errors='coerce')
+        start_day = pd.to_numeric(frame.get('start_day', 0), errors='coerce')
+        n = len(frame)
+        graph._buffer.append({
+            'src': src, 'dst': dst, 'etype': graph.codes_of(frame['type']),
+            'commitment': np.nan_to_num(np.broadcast_to(np.asarray(commitment, dtype=float), n)),
+            'affection': np.nan_to_num(np.broadcast_to(np.asarray(affection, dtype=float), n)),
+            'start_day': np.nan_to_num(np.broadcast_to(np.asarray(start_day, dtype=float), n)).astype(np.int64),
+        })
+        graph._buffered = n
+        graph._flush()
+
+        # Partner index: the last partner-type row of each agent
+        bonds = np.flatnonzero(frame['type'].isin(cls.PARTNER_TYPES).to_numpy())
+        if len(bonds):
+            graph._ensure_capacity(int(src[bonds].max()))
+            graph.partner[src[bonds]] = dst[bonds]
+        return graph
@@ -31,12 +31,10 @@ def save_simulation_report(state, ai=None, cause="Manual Reset"):
     # Tribe Stats
     tribe_summary = "--- Tribal Governance ---\n"
     if hasattr(state, 'tribes') and state.tribes:
+        stats = state.tribe_stats() if 'tribe_id' in state.population.columns else None
         for tid, tdata in state.tribes.items():
             leader_id = tdata.get('chief_id', 'None')
-            if 'tribe_id' in state.population.columns:
-                 pop_count = len(state.population[(state.population['tribe_id'] == tid) & (state.population['is_alive'])])
-            else:
-                 pop_count = "?"
+            pop_count = int(stats.get(tid, 'count', 0)) if stats is not None else "?"
             policies = tdata.get('policies', {})
             
             tribe_summary += f"[{tid}]\n"
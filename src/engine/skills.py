@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+class SkillStore:
+    """
+    Agent x Skill Level Matrix, indexed by agent handle (float levels in (0, 1], 0 = unknown).
+    Learning follows one rule for every source (discovery, teaching):
+    - unknown skill: the agent starts at the taught amount (best teacher of the batch)
+    - known skill: diminishing returns, +10% of each taught amount (capped at 1.0)
+    Teaching is batched over (teacher, learner) edge lists, so a whole tick of
+    transmission is one masked gather plus one scatter-add over the edges.
+    The long-form DataFrame (agent_id, skill, level) is a derived view (to_frame / from_frame).
+    """
+    FRAME_COLUMNS = ["agent_id", "skill", "level"]
+    REINFORCE = 0.1 # Share of a taught amount added to a skill already known
+
+    def __init__(self, skills=()):
+        self.names = []
+        self.codes = {}
+        self.levels = np.zeros((0, 0))
+        for skill in skills:
+            self.code(skill)
+
+    def __len__(self):
+        """Number of (agent, skill) pairs known."""
+        return int(np.count_nonzero(self.levels))
+
+    # --- Skill Registry ---
+    def code(self, skill: str) -> int:
+        code = self.codes.get(skill)
+        if code is None:
+            code = len(self.names)
+            self.names.append(skill)
+            self.codes[skill] = code
+            self._ensure_capacity(len(self.levels) - 1)
+        return code
+
+    def codes_of(self, skills) -> np.ndarray:
+        return np.array([self.code(s) for s in skills], dtype=np.int64)
+
+    def _ensure_capacity(self, max_handle: int) -> None:
+        cap, width = self.levels.shape
+        if max_handle < cap and len(self.names) <= width: return
+        new_cap = max(cap, 64)
+        while new_cap <= max_handle: new_cap *= 2
+        new_width = max(width, 8)
+        while new_width < len(self.names): new_width *= 2
+
+        levels = np.zeros((new_cap, new_width))
+        levels[:cap, :width] = self.levels
+        self.levels = levels
+
+    def level(self, handles, skill: str) -> np.ndarray:
+        handles = np.asarray(handles, dtype=np.int64)
+        out = np.zeros(len(handles))
+        code = self.codes.get(skill)
+        if code is None: return out
+        known = (handles >= 0) & (handles < len(self.levels))
+        out[known] = self.levels[handles[known], code]
+        return out
+
+    # --- Learning ---
+    def learn(self, handles, codes, amounts) -> None:
+        """Applies a batch of (agent, skill, amount) lessons; repeated pairs are combined."""
+        handles = np.asarray(handles, dtype=np.int64)
+        if len(handles) == 0: return
+        codes = np.broadcast_to(np.asarray(codes, dtype=np.int64), handles.shape)
+        amounts = np.broadcast_to(np.asarray(amounts, dtype=float), handles.shape)
+        self._ensure_capacity(int(handles.max()))
+
+        # Combine lessons per (agent, skill): sum and best amount
+        width = self.levels.shape[1]
+        cells, inverse = np.unique(handles * width + codes, return_inverse=True)
+        total = np.bincount(inverse, weights=amounts)
+        best = np.zeros(len(cells))
+        np.maximum.at(best, inverse, amounts)
+
+        rows, cols = cells // width, cells % width
+        current = self.levels[rows, cols]
+        learned = np.where(current > 0, current + self.REINFORCE * total,
+                           best + self.REINFORCE * (total - best))
+        self.levels[rows, cols] = np.minimum(1.0, learned)
+
+    def teach(self, teachers, learners, chance, share: float = 0.5, rng=None) -> int:
+        """
+        Every (teacher, learner) edge passes each known skill on with probability 'chance'
+        (scalar or per edge), as 'share' x the teacher's level. Reads levels before the
+        batch is applied, so the order of edges doesn't matter. Returns lessons given.
+        """
+        teachers = np.asarray(teachers, dtype=np.int64)
+        learners = np.asarray(learners, dtype=np.int64)
+        if len(teachers) == 0 or len(self.names) == 0: return 0
+        rng = np.random if rng is None else rng
+        self._ensure_capacity(int(max(teachers.max(), learners.max())))
+
+        # Teaching Mask: known skills x random success (edges x skills)
+        n_skills = len(self.names)
+        known = self.levels[teachers, :n_skills]
+        chance = np.broadcast_to(np.asarray(chance, dtype=float), teachers.shape)
+        taught = (known > 0) & (rng.random_sample((len(teachers), n_skills)) < chance[:, None])
+        edge, skill = np.nonzero(taught)
+        self.learn(learners[edge], skill, known[edge, skill] * share)
+        return len(edge)
+
+    # --- Maintenance ---
+    def prune(self, handles) -> None:
+        """Forgets the skills of archived agents."""
+        handles = np.asarray(handles, dtype=np.int64)
+        handles = handles[(handles >= 0) & (handles < len(self.levels))]
+        self.levels[handles] = 0.0
+
+    # --- DataFrame View (UI / Legacy) ---
+    def to_frame(self, handles) -> pd.DataFrame:
+        h, c = np.nonzero(self.levels)
+        if len(h) == 0: return pd.DataFrame(columns=self.FRAME_COLUMNS)
+        return pd.DataFrame({
+            "agent_id": handles.ids_of(h), "skill": np.array(self.names, dtype=object)[c],
+            "level": self.levels[h, c],
+        })
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, handles, skills=()) -> 'SkillStore':
+        """Builds a store from long rows (a repeated agent/skill row keeps the last level)."""
+        store = cls(skills)
+        if frame is None or frame.empty: return store
+        owners = handles.lookup(frame['agent_id'].to_numpy(dtype=object))
+        codes = store.codes_of(frame['skill'].astype(str))
+        level = np.nan_to_num(pd.to_numeric(frame['level'], errors='coerce').to_numpy(dtype=float))
+        store._ensure_capacity(int(owners.max()))
+        store.levels[owners, codes] = np.clip(level, 0.0, 1.0)
+        return store
@@ -0,0 +1,157 @@
+import numpy as np
+
+class SpatialGrid:
+    """
+    Uniform-Grid Spatial Index.
+    Points are bucketed by cell with a single argsort, so building is O(N log N)
+    and neighbour queries only touch the 3x3 block of cells around each point.
+    Choose cell_size >= the query radius.
+    """
+    # 3x3 neighbourhood offsets (including own cell)
+    _OFFSETS = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+
+    def __init__(self, x, y, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+        self.cx = np.floor(self.x / self.cell_size).astype(np.int64)
+        self.cy = np.floor(self.y / self.cell_size).astype(np.int64)
+
+        # Cell Keys (row-major over a padded bounding box so neighbour keys never collide)
+        if len(self.x) > 0:
+            self._cx0 = self.cx.min() - 1
+            self._cy0 = self.cy.min() - 1
+            self._height = int(self.cy.max() - self._cy0) + 2
+        else:
+            self._cx0, self._cy0, self._height = 0, 0, 1
+
+        keys = self.cell_keys(self.cx, self.cy)
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.x)
+
+    def cell_keys(self, cx, cy) -> np.ndarray:
+        """Flattened cell key for integer cell coordinates."""
+        return (np.asarray(cx) - self._cx0) * self._height + (np.asarray(cy) - self._cy0)
+
+    def cell_members(self, key: int) -> np.ndarray:
+        """Point indices stored in one cell."""
+        lo = np.searchsorted(self.sorted_keys, key, side='left')
+        hi = np.searchsorted(self.sorted_keys, key, side='right')
+        return self.order[lo:hi]
+
+    def random_neighbor(self, query_idx, radius: float, rng=None, attempts: int = 8) -> np.ndarray:
+        """
+        Picks one random neighbour (distance < radius, not itself) for each query point.
+        Candidates are drawn uniformly from the 3x3 cell block and rejected if too far,
+        so accepted picks are uniform over the true neighbours. Queries still unresolved
+        after 'attempts' rounds (sparse blocks) enumerate their block and pick exactly.
+        Returns point indices, or -1 where no neighbour exists.
+        """
+        rng = rng if rng is not None else np.random
+        query_idx = np.asarray(query_idx, dtype=np.int64)
+        result = np.full(len(query_idx), -1, dtype=np.int64)
+        if len(query_idx) == 0 or len(self.x) < 2:
+            return result
+
+        # 1. Candidate ranges of the 9 surrounding cells: shape (Q, 9)
+        ncx = self.cx[query_idx, None] + self._OFFSETS[:, 0]
+        ncy = self.cy[query_idx, None] + self._OFFSETS[:, 1]
+        keys = self.cell_keys(ncx, ncy)
+        starts = np.searchsorted(self.sorted_keys, keys, side='left')
+        counts = np.searchsorted(self.sorted_keys, keys, side='right') - starts
+        cum = np.cumsum(counts, axis=1)
+        total = cum[:, -1]
+
+        r2 = radius * radius
+        pending = np.flatnonzero(total > 1) # Only self in the block -> no neighbour
+
+        # 2. Rejection sampling rounds (vectorized over all unresolved queries)
+        for _ in range(attempts):
+            if len(pending) == 0: break
+
+            pick = (rng.random(len(pending)) * total[pending]).astype(np.int64)
+            cell = (cum[pending] > pick[:, None]).argmax(axis=1)
+            offset = pick - (cum[pending, cell] - counts[pending, cell])
+            cand = self.order[starts[pending, cell] + offset]
+
+            q = query_idx[pending]
+            dx = self.x[cand] - self.x[q]
+            dy = self.y[cand] - self.y[q]
+            ok = (dx * dx + dy * dy < r2) & (cand != q)
+
+            result[pending[ok]] = cand[ok]
+            pending = pending[~ok]
+
+        # 3. Exact fallback: every candidate of the remaining blocks, one uniform pick each
+        if len(pending):
+            cell_counts = counts[pending].ravel()
+            owner = np.repeat(np.repeat(pending, counts.shape[1]), cell_counts)
+            within = np.arange(cell_counts.sum()) - np.repeat(np.cumsum(cell_counts) - cell_counts, cell_counts)
+            cand = self.order[np.repeat(starts[pending].ravel(), cell_counts) + within]
+
+            q = query_idx[owner]
+            dx = self.x[cand] - self.x[q]
+            dy = self.y[cand] - self.y[q]
+            ok = (dx * dx + dy * dy < r2) & (cand != q)
+            owner, cand = owner[ok], cand[ok]
+
+            shuffled = np.lexsort((rng.random(len(cand)), owner))
+            first = np.unique(owner[shuffled], return_index=True)[1]
+            result[owner[shuffled][first]] = cand[shuffled][first]
+
+        return result
+
+    def cluster_cells(self, min_members: int = 3) -> np.ndarray:
+        """
+        DBSCAN-like clustering over occupied cells (eps = cell_size).
+        Core cells hold >= min_members points and join their 8-connected core neighbours;
+        sparse cells touching a core cell join it as border, the rest are noise.
+        Returns a dense cluster label per point (-1 = noise). Near-linear: O(C log C) per pass.
+        """
+        labels = np.full(len(self.x), -1, dtype=np.int64)
+        if len(self.x) == 0:
+            return labels
+
+        # 1. Occupied cells and their counts
+        cells, first, counts = np.unique(self.sorted_keys, return_index=True, return_counts=True)
+        n_cells = len(cells)
+        cell_of_point = np.empty(len(self.x), dtype=np.int64)
+        cell_of_point[self.order] = np.repeat(np.arange(n_cells), counts)
+        core = counts >= min_members
+
+        # 2. Neighbour table: (C, 9) cell positions, valid where occupied
+        rep = self.order[first]
+        nkeys = self.cell_keys(self.cx[rep, None] + self._OFFSETS[:, 0], self.cy[rep, None] + self._OFFSETS[:, 1])
+        npos = np.minimum(np.searchsorted(cells, nkeys), n_cells - 1)
+        occupied = cells[npos] == nkeys
+        core_link = occupied & core[npos]
+
+        # 3. Connected components of core cells (min-label hooking + pointer jumping)
+        src, off = np.nonzero(core_link & core[:, None])
+        dst = npos[src, off]
+        comp = np.arange(n_cells)
+        while True:
+            prev = comp.copy()
+            np.minimum.at(comp, src, comp[dst])
+            while True:
+                jumped = comp[comp]
+                if (jumped == comp).all(): break
+                comp = jumped
+            if (comp == prev).all(): break
+
+        # 4. Border cells adopt the smallest adjacent core component
+        cell_label = np.where(core, comp, -1)
+        nb = np.where(core_link, comp[npos], n_cells).min(axis=1)
+        border = ~core & (nb < n_cells)
+        cell_label[border] = nb[border]
+
+        # 5. Dense labels per point
+        valid = cell_label >= 0
+        if valid.any():
+            _, dense = np.unique(cell_label[valid], return_inverse=True)
+            cell_label[valid] = dense
+        return cell_label[cell_of_point]
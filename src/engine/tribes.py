@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+class TribeStats:
+    """
+    Per-Tick Tribe Aggregates of the living population (one row per tribe).
+    - table: count, mean traits, mean hp, mean genetic_vulnerability, centroid (x, y)
+      and food units held, indexed by tribe_id
+    - codes: tribe code of each living row (-1 = no tribe), rows in living order
+    All means come from one bincount over (tribe, column) cells.
+    Built by WorldState.tribe_stats() and reused until the day, the population
+    frame or its number of living agents changes. Movement within a tick is
+    folded in with refresh_centroids.
+    """
+    MEAN_COLUMNS = ['trait_openness', 'trait_conscientiousness', 'trait_extraversion',
+                    'trait_agreeableness', 'trait_neuroticism', 'hp', 'genetic_vulnerability', 'x', 'y']
+
+    def __init__(self, population: pd.DataFrame, living: pd.DataFrame, food=None, day: int = 0):
+        self.population, self.day = population, day
+        self.living_count = len(living)
+        self.index = living.index
+        tribes = living['tribe_id'].to_numpy(dtype=object) if 'tribe_id' in living.columns \
+            else np.full(len(living), None, dtype=object)
+        self.codes, names = pd.factorize(tribes)
+        self.names = pd.Index(names, name='tribe_id')
+        n_tribes = len(self.names)
+
+        # One pass: sums of every (tribe, column) cell
+        has = self.codes >= 0
+        columns = [c for c in self.MEAN_COLUMNS if c in living.columns]
+        values = np.column_stack([pd.to_numeric(living[c], errors='coerce').to_numpy(dtype=float) for c in columns]
+                                 + [np.asarray(food, dtype=float) if food is not None else np.zeros(len(living))])
+        values = np.nan_to_num(values[has])
+        width = values.shape[1]
+        cells = (self.codes[has, None] * width + np.arange(width)).ravel()
+        sums = np.bincount(cells, weights=values.ravel(), minlength=n_tribes * width).reshape(n_tribes, width)
+        self.count = np.bincount(self.codes[has], minlength=n_tribes)
+
+        self.table = pd.DataFrame(sums[:, :-1] / np.maximum(self.count, 1)[:, None], index=self.names, columns=columns)
+        self.table.insert(0, 'count', self.count)
+        self.table['food'] = sums[:, -1]
+
+    def __len__(self):
+        return len(self.names)
+
+    def is_current(self, population: pd.DataFrame, day: int, living_count: int) -> bool:
+        return self.population is population and self.day == day and self.living_count == living_count
+
+    def refresh_centroids(self, x, y) -> None:
+        """Re-derives the centroid (x, y) from moved positions of the living rows (same order as codes)."""
+        if 'x' not in self.table.columns or len(x) != len(self.codes): return
+        has = self.codes >= 0
+        count = np.maximum(self.count, 1)
+        for column, values in (('x', x), ('y', y)):
+            self.table[column] = np.bincount(self.codes[has], weights=np.asarray(values, dtype=float)[has],
+                                             minlength=len(self.names)) / count
+
+    def code_of(self, tribe_ids) -> np.ndarray:
+        """Tribe codes of arbitrary rows (-1 = unknown / no tribe)."""
+        return self.names.get_indexer(np.asarray(tribe_ids, dtype=object))
+
+    def members(self, tribe_id) -> pd.Index:
+        """Population index labels of a tribe's living members."""
+        code = self.names.get_indexer([tribe_id])[0]
+        return self.index[self.codes == code] if code >= 0 else self.index[:0]
+
+    def get(self, tribe_id, column: str, default=0.0):
+        if tribe_id not in self.table.index or column not in self.table.columns: return default
+        return self.table.at[tribe_id, column]
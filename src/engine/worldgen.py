@@ -0,0 +1,121 @@
+"""
+Procedural World Generation (Vectorized).
+Hash-based value noise: every lattice value is a pure function of (seed, ix, iy),
+so any window of the world can be generated on its own and always comes out the same.
+Noise over an axis-aligned tile window is evaluated separably:
+    field = Wu @ Lattice @ Wv.T
+where Wu/Wv hold the (smoothstep) interpolation weights of each tile row/column.
+"""
+import numpy as np
+
+# Terrain Codes for grid arrays (index = code)
+TERRAIN_TYPES = ['Plains', 'Forest', 'Mountain', 'Water']
+TERRAIN_CODE = {name: code for code, name in enumerate(TERRAIN_TYPES)}
+
+_M1 = np.uint64(0x9E3779B97F4A7C15)
+_M2 = np.uint64(0xC2B2AE3D27D4EB4F)
+_M3 = np.uint64(0xBF58476D1CE4E5B9)
+_M4 = np.uint64(0x94D049BB133111EB)
+
+# Resource Capacity ranges per terrain: (wood, food, stone)
+RESOURCE_RANGES = {
+    'Forest':   ((500.0, 1000.0), (200.0, 400.0), (50.0, 100.0)),
+    'Mountain': ((0.0, 50.0), (0.0, 50.0), (800.0, 1500.0)),
+    'Plains':   ((10.0, 50.0), (100.0, 300.0), (10.0, 30.0)),
+    'Water':    ((0.0, 0.0), (500.0, 1000.0), (0.0, 0.0)), # Fish
+}
+
+def hash_uniform(seed: int, ix, iy) -> np.ndarray:
+    """Deterministic uniform [0, 1) per integer lattice point (splitmix-style mixing)."""
+    with np.errstate(over='ignore'):
+        h = (np.asarray(ix).astype(np.int64).astype(np.uint64) * _M1) \
+            ^ (np.asarray(iy).astype(np.int64).astype(np.uint64) * _M2) \
+            ^ (np.uint64(seed & 0xFFFFFFFF) * _M3)
+        h ^= h >> np.uint64(30)
+        h *= _M3
+        h ^= h >> np.uint64(27)
+        h *= _M4
+        h ^= h >> np.uint64(31)
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+def _interp_weights(coords: np.ndarray):
+    """Interpolation matrix (len(coords) x lattice span) and the first lattice index."""
+    i0 = np.floor(coords).astype(np.int64)
+    f = coords - i0
+    s = f * f * (3.0 - 2.0 * f) # Smoothstep
+    lo = i0.min()
+    w = np.zeros((len(coords), int(i0.max() - lo) + 2))
+    rows = np.arange(len(coords))
+    w[rows, i0 - lo] = 1.0 - s
+    w[rows, i0 - lo + 1] = s
+    return w, lo
+
+def value_noise_grid(seed: int, u, v) -> np.ndarray:
+    """Value noise on the grid u x v (1-D lattice-unit coordinates) -> array [len(u), len(v)] in [0, 1)."""
+    u = np.asarray(u, dtype=float)
+    v = np.asarray(v, dtype=float)
+    wu, u0 = _interp_weights(u)
+    wv, v0 = _interp_weights(v)
+    lattice = hash_uniform(seed, np.arange(u0, u0 + wu.shape[1])[:, None], np.arange(v0, v0 + wv.shape[1])[None, :])
+    return wu @ lattice @ wv.T
+
+def fbm_grid(seed: int, u, v, octaves: int = 4, base_freq: float = 4.0, gain: float = 0.5) -> np.ndarray:
+    """Fractal (fBm) value noise over normalized world coordinates, in [0, 1)."""
+    u = np.asarray(u, dtype=float)
+    v = np.asarray(v, dtype=float)
+    total = np.zeros((len(u), len(v)))
+    amp, norm, freq = 1.0, 0.0, base_freq
+    for octave in range(octaves):
+        total += amp * value_noise_grid(seed * 31 + octave, u * freq, v * freq)
+        norm += amp
+        amp *= gain
+        freq *= 2.0
+    return total / norm
+
+def generate_tiles(seed: int, gx, gy, grid_size: int) -> dict:
+    """
+    Generates terrain for the tile window gx (rows) x gy (cols), both 1-D index arrays.
+    Layout (normalized world coordinates, y = 0 is North):
+    - Elevation: fBm + northern highlands - south-eastern basin -> Mountains / Lake
+    - Moisture: fBm + western woodland belt -> Forest
+    - River: a noise-wiggled channel from the highlands down to the lake
+    Returns 2-D layers: terrain, elevation, moisture, river, max_wood/max_food/max_stone.
+    """
+    gx = np.asarray(gx, dtype=np.int64)
+    gy = np.asarray(gy, dtype=np.int64)
+    tile = 1.0 / grid_size
+    u = (gx + 0.5) * tile # Tile centers in [0, 1)
+    v = (gy + 0.5) * tile
+    U, V = u[:, None], v[None, :]
+
+    # 1. Elevation
+    north = np.clip(1.0 - V / 0.2, 0.0, 1.0) * 0.5
+    basin = np.clip(1.0 - np.hypot(U - 0.9, V - 0.9) / 0.3, 0.0, 1.0) * 0.6
+    elevation = 0.15 + 0.6 * fbm_grid(seed, u, v) + north - basin
+
+    # 2. Moisture
+    woodland = np.clip(1.0 - np.abs(V - 0.5) / 0.25, 0.0, 1.0) * np.clip(1.0 - U / 0.4, 0.0, 1.0) * 0.35
+    moisture = fbm_grid(seed + 1, u, v) + woodland
+
+    # 3. River (meanders around x = 0.72, from the highlands to the lake)
+    wiggle = value_noise_grid(seed + 2, v * 3.0, [0.0])[:, 0] * 2.0 - 1.0
+    center = 0.72 + 0.08 * wiggle
+    river = (np.abs(U - center[None, :]) < max(0.5 * tile, 0.012)) & (V < 0.75)
+
+    # 4. Terrain from layers
+    terrain = np.full(elevation.shape, TERRAIN_CODE['Plains'], dtype=np.int8)
+    terrain[moisture > 0.62] = TERRAIN_CODE['Forest']
+    terrain[elevation > 0.62] = TERRAIN_CODE['Mountain']
+    terrain[(elevation < 0.22) | river] = TERRAIN_CODE['Water']
+
+    # 5. Resource Capacity (per-tile hashed draw within the terrain's range)
+    layers = {'terrain': terrain, 'elevation': elevation.astype(np.float32),
+              'moisture': moisture.astype(np.float32), 'river': river}
+    GX, GY = gx[:, None], gy[None, :]
+    names = sorted(TERRAIN_CODE, key=TERRAIN_CODE.get)
+    for k, res in enumerate(('wood', 'food', 'stone')):
+        lo = np.array([RESOURCE_RANGES[name][k][0] for name in names])
+        span = np.array([RESOURCE_RANGES[name][k][1] for name in names]) - lo
+        roll = hash_uniform(seed + 101 + k, GX, GY)
+        layers[f'max_{res}'] = lo[terrain] + span[terrain] * roll
+    return layers
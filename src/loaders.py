@@ -59,6 +59,39 @@ def load_traits(filepath: str) -> pd.DataFrame:
         print(f"❌ [Loaders] Error: Failed to parse traits CSV - {e}")
         return pd.DataFrame()
 
+# Bundled data files (resolved against the repository, not the working directory)
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+ITEMS_PATH = os.path.join(DATA_DIR, 'items.csv')
+RECIPES_PATH = os.path.join(DATA_DIR, 'recipes.csv')
+
+def load_item_catalogue(items_path: str = ITEMS_PATH, recipes_path: str = RECIPES_PATH) -> 'ItemCatalogue':
+    """
+    Loads the item catalogue and recipes from CSV files and compiles them to arrays.
+    The economy can't run without them, so missing or malformed files raise.
+    """
+    from src.engine.items import ItemCatalogue
+    for path in (items_path, recipes_path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Item catalogue file not found at {path}")
+    
+    items = pd.read_csv(items_path)
+    
+    # Validate schema
+    required_columns = ['item'] + ItemCatalogue.PROPERTIES
+    missing_cols = set(required_columns) - set(items.columns)
+    if missing_cols:
+        raise ValueError(f"Missing required columns in {items_path}: {missing_cols}")
+    
+    recipes = pd.read_csv(recipes_path)
+    missing_cols = {'item', 'inputs'} - set(recipes.columns)
+    if missing_cols:
+        raise ValueError(f"Missing required columns in {recipes_path}: {missing_cols}")
+    import ast
+    recipes['inputs'] = recipes['inputs'].apply(
+        lambda x: ast.literal_eval(x) if isinstance(x, str) else {}
+    )
+    return ItemCatalogue(items, recipes)
+
 def generate_initial_state(count: int, traits_df: pd.DataFrame) -> pd.DataFrame:
     """
     Generates the initial population DataFrame with validation.
@@ -11,6 +11,8 @@ class BiologySystem(System):
     - Health Checks (Starvation damage)
     - Natural Death (Old age)
     """
+    KINSHIP_LIMIT = 0.125 # Mating: half-siblings / uncle-niece and closer are off-limits
+
     def update(self, state):
         df = state.population
         
@@ -218,6 +220,7 @@ class BiologySystem(System):
                     "is_pregnant": False, "pregnancy_days": 0,
                     "partner_id": None,
                     "mother_id": mothers['id'].values,
+                    "father_id": mothers['pregnancy_father_id'].values if 'pregnancy_father_id' in mothers.columns else None,
                     "family_id": mothers['family_id'].values, 
                     "cause_of_death": None,
                     # Realism Phase 6
@@ -258,16 +261,10 @@ class BiologySystem(System):
         # Apply Policy Modifiers to Libido (Interest Chance)
         # Open Policy -> Higher interest
         # Strict Policy -> Lower interest (controlled)
-        libido_mod = pd.Series(1.0, index=df.index)
-        if hasattr(state, 'tribes'):
-             for tid, tdata in state.tribes.items():
-                 # Default Strict if missing
-                 pol = tdata.get('policies', {}).get('mating_label', 'Strict')
-                 t_mask = df['tribe_id'] == tid
-                 if pol == 'Open':
-                     libido_mod[t_mask] = 2.0 # Double interest
-                 else:
-                     libido_mod[t_mask] = 0.8 # Slightly less random mating
+        # Tribe -> multiplier map (Default Strict if missing), applied in one lookup
+        mod_of = {tid: 2.0 if tdata.get('policies', {}).get('mating_label', 'Strict') == 'Open' else 0.8
+                  for tid, tdata in getattr(state, 'tribes', {}).items()} # Open: Double interest / Strict: Slightly less random mating
+        libido_mod = df['tribe_id'].map(mod_of).fillna(1.0) if 'tribe_id' in df.columns else pd.Series(1.0, index=df.index)
         
         # Update DF temporary (or just use in calculation)
         # We can't update DF directly if we don't want to persist.
@@ -410,18 +407,13 @@ class BiologySystem(System):
                 # This prevents O(N) scan inside the loop
                 men_data = df.loc[df['id'].isin(eligible_men_ids)].copy().set_index('id')
                 
-            # Optimization: Pre-calculate partner map for O(1) lookup
-            # Map woman_id -> partner_id (Spouse/Lover only)
-            # This avoids filtering dataframe inside the loop
-            rel_df = state.relationships
-            if not rel_df.empty:
-                 # Filter relevant types
-                 active_rels = rel_df[rel_df['type'].isin(['Spouse', 'Lover'])]
-                 # Create dictionary for fast lookups
-                 # Assuming one active partner for simplicity in lookup (take last)
-                 partner_map = active_rels.set_index('id_a')['id_b'].to_dict()
-            else:
-                 partner_map = {}
+            # Optimization: Partner map from the graph's live partner index
+            # Map woman_id -> current partner_id (latest bond), interested women only
+            graph = state.relationship_graph
+            w_ids = df.loc[women_indices, 'id'].to_numpy()
+            partner = graph.partner_of(state.handles.lookup(w_ids, create=False))
+            has_partner = partner >= 0
+            partner_map = dict(zip(w_ids[has_partner], state.handles.ids_of(partner[has_partner])))
 
             # Iterate interested women
             # We can still loop, but make the inner logic O(1) mostly
@@ -431,6 +423,9 @@ class BiologySystem(System):
             
             # Policy Strictness
             strictness = state.globals.get('policy_mating_strictness', 0.5)
+            
+            # Kinship (pedigree): handles for O(log n) coefficient lookups in the loop
+            men_handles = dict(zip(men_data.index, state.handles.lookup(men_data.index.to_numpy())))
 
             for w_idx in women_indices:
                 woman = df.loc[w_idx]
@@ -513,6 +508,9 @@ class BiologySystem(System):
                         if w_mom == best_partner_id or w_dad == best_partner_id or \
                            p_mom == w_id or p_dad == w_id:
                             approved = False
+                        
+                        if state.kinship.kinship_of(state.handles.handle(w_id), men_handles[best_partner_id]) >= self.KINSHIP_LIMIT:
+                            approved = False
 
                         # Policy Check
                         if approved:
@@ -552,14 +550,9 @@ class BiologySystem(System):
                      state.log(f"💕 Conception: {wid[-4:]} & {pid[-4:]} are expecting! ({bonus})", agent_id=wid, category="Biology")
                      state.log(f"💕 Conception: Partnering with {wid[-4:]} ({bonus})", agent_id=pid, category="Biology")
             
-            # Batch Update Relationships
+            # Batch Update Relationships (double directional Lover edges)
             if new_relationships:
-                init_affection = 0.8
-                rows = []
-                for p1, p2 in new_relationships:
-                    # Double directional
-                    rows.append({'id_a': p1, 'id_b': p2, 'type': 'Lover', 'commitment': 0.1, 'affection': init_affection, 'start_day': state.day})
-                    rows.append({'id_a': p2, 'id_b': p1, 'type': 'Lover', 'commitment': 0.1, 'affection': init_affection, 'start_day': state.day})
-                
-                if rows:
-                    state.relationships = pd.concat([state.relationships, pd.DataFrame(rows)], ignore_index=True)
+                p1, p2 = zip(*new_relationships)
+                state.relationship_graph.add(state.handles.lookup(np.array(p1, dtype=object)),
+                                             state.handles.lookup(np.array(p2, dtype=object)),
+                                             'Lover', commitment=0.1, affection=0.8, start_day=state.day, mutual=True)
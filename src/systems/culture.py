@@ -84,19 +84,16 @@ class CultureSystem(System):
         self.last_actions[tid] = action_idx
 
     def _get_state_key(self, state, tid):
-        # Filter population for this tribe
-        tribe_mask = (state.population['tribe_id'] == tid) & (state.population['is_alive'] == True)
-        pop_count = tribe_mask.sum()
+        # Tribe aggregates (shared per-tick table)
+        stats = state.tribe_stats()
+        pop_count = stats.get(tid, 'count', 0)
         
         if pop_count < 10: pop_s = "CRITICAL"
         elif pop_count < 50: pop_s = "LOW"
         else: pop_s = "HEALTHY"
         
         # Genetic Health of Tribe
-        if 'genetic_vulnerability' in state.population.columns and pop_count > 0:
-            avg_vul = state.population.loc[tribe_mask, 'genetic_vulnerability'].mean()
-        else:
-            avg_vul = 0.0
+        avg_vul = stats.get(tid, 'genetic_vulnerability', 0.0)
         
         if avg_vul < 0.2: gen_s = "PURE"
         elif avg_vul < 0.5: gen_s = "MIXED"
@@ -107,7 +104,7 @@ class CultureSystem(System):
         total_food = res.get('food', 0) if isinstance(res, dict) else res
             
         # Per capita relative to global pop (Simulated competition)
-        total_alive = len(state.population[state.population['is_alive']])
+        total_alive = stats.living_count
         food_per_capita = total_food / max(1, total_alive)
         
         if food_per_capita < 5: res_s = "FAMINE"
@@ -118,8 +115,8 @@ class CultureSystem(System):
 
     def _calculate_reward(self, state, tid):
         # Reward based on TRIBE survival
-        tribe_mask = (state.population['tribe_id'] == tid) & (state.population['is_alive'] == True)
-        pop_count = tribe_mask.sum()
+        stats = state.tribe_stats()
+        pop_count = stats.get(tid, 'count', 0)
         
         reward = 1.0
         
@@ -127,16 +124,15 @@ class CultureSystem(System):
         if pop_count == 0: return -100.0
         
         # Genetics
-        if 'genetic_vulnerability' in state.population.columns and pop_count > 0:
-            avg_vul = state.population.loc[tribe_mask, 'genetic_vulnerability'].mean()
-            if avg_vul > 0.5: reward -= 5.0
-            elif avg_vul > 0.3: reward -= 1.0
+        avg_vul = stats.get(tid, 'genetic_vulnerability', 0.0)
+        if avg_vul > 0.5: reward -= 5.0
+        elif avg_vul > 0.3: reward -= 1.0
                 
         # Hunger status of tribe members
         # Count starving members
         # Assuming malnutrition check logic exists elsewhere, we check logs or nutrients?
         # Let's check average hp as proxy for health
-        avg_hp = state.population.loc[tribe_mask, 'hp'].mean()
+        avg_hp = stats.get(tid, 'hp', np.nan)
         if avg_hp < 50: reward -= 2.0
             
         return reward
@@ -17,15 +17,138 @@ class Disease:
     is_chronic: bool # If true, never fully cures, just goes dormant
     immunity_type: str # 'sterilizing', 'waning', 'sensitizing'
 
+class DiseaseRegistry:
+    """
+    Struct-of-Arrays table of circulating strains.
+    Each strain occupies a slot in flat NumPy columns so the progression
+    kernels can gather parameters by index instead of per-disease dict lookups.
+    Slots of retired (extinct) strains are recycled.
+    """
+    EFFECTS = ['hp', 'stamina'] # Columns of the effect matrix
+    IMMUNITY_TYPES = ['sterilizing', 'waning', 'sensitizing']
+
+    def __init__(self, capacity: int = 16):
+        self.ids = np.empty(capacity, dtype=object)
+        self.names = np.empty(capacity, dtype=object)
+        self.transmission = np.zeros(capacity)
+        self.lethality = np.zeros(capacity)
+        self.duration = np.zeros(capacity)
+        self.effects = np.zeros((capacity, len(self.EFFECTS)))
+        self.is_chronic = np.zeros(capacity, dtype=bool)
+        self.immunity_type = np.zeros(capacity, dtype=np.int8)
+        self.in_use = np.zeros(capacity, dtype=bool)
+        
+        self._slots: Dict[str, int] = {} # disease_id -> slot
+        self._index = None # Cached (pd.Index of ids, slot array) for vectorized lookups
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, disease_id):
+        return disease_id in self._slots
+
+    def add(self, disease: Disease) -> int:
+        """Registers a strain and returns its slot."""
+        if disease.id in self._slots:
+            slot = self._slots[disease.id]
+        else:
+            free = np.flatnonzero(~self.in_use)
+            slot = int(free[0]) if len(free) > 0 else self._grow()
+        
+        self.ids[slot] = disease.id
+        self.names[slot] = disease.name
+        self.transmission[slot] = disease.transmission
+        self.lethality[slot] = disease.lethality
+        self.duration[slot] = disease.duration
+        self.effects[slot] = [disease.effects.get(e, 0.0) for e in self.EFFECTS]
+        self.is_chronic[slot] = disease.is_chronic
+        self.immunity_type[slot] = self.IMMUNITY_TYPES.index(disease.immunity_type)
+        self.in_use[slot] = True
+        
+        self._slots[disease.id] = slot
+        self._index = None
+        return slot
+
+    def retire(self, disease_ids) -> None:
+        """Frees the slots of extinct strains."""
+        for d_id in disease_ids:
+            slot = self._slots.pop(d_id, None)
+            if slot is None: continue
+            self.in_use[slot] = False
+            self.ids[slot] = None
+            self.names[slot] = None
+        self._index = None
+
+    def live_ids(self) -> List[str]:
+        return list(self._slots.keys())
+
+    def slot(self, disease_id) -> int:
+        return self._slots[disease_id]
+
+    def slots_for(self, disease_ids) -> np.ndarray:
+        """Vectorized disease_id -> slot mapping (-1 for unknown strains)."""
+        if self._index is None:
+            self._index = (
+                pd.Index(list(self._slots.keys())),
+                np.fromiter(self._slots.values(), dtype=np.int64, count=len(self._slots))
+            )
+        ids, slots = self._index
+        pos = ids.get_indexer(disease_ids)
+        if len(slots) == 0:
+            return np.full(len(pos), -1, dtype=np.int64)
+        return np.where(pos >= 0, slots[pos], -1)
+
+    def get(self, disease_id) -> Disease:
+        """Materializes a Disease record (UI / logging)."""
+        slot = self._slots[disease_id]
+        effects = {e: float(v) for e, v in zip(self.EFFECTS, self.effects[slot]) if v != 0.0}
+        return Disease(
+            id=disease_id,
+            name=self.names[slot],
+            transmission=float(self.transmission[slot]),
+            lethality=float(self.lethality[slot]),
+            duration=int(self.duration[slot]),
+            effects=effects,
+            is_chronic=bool(self.is_chronic[slot]),
+            immunity_type=self.IMMUNITY_TYPES[self.immunity_type[slot]]
+        )
+
+    def items(self):
+        return [(d_id, self.get(d_id)) for d_id in self._slots]
+
+    def _grow(self) -> int:
+        old = len(self.ids)
+        new = old * 2
+        for name in ['ids', 'names', 'transmission', 'lethality', 'duration',
+                     'effects', 'is_chronic', 'immunity_type', 'in_use']:
+            arr = getattr(self, name)
+            grown = np.zeros((new,) + arr.shape[1:], dtype=arr.dtype)
+            if arr.dtype == object:
+                grown[:] = None
+            grown[:old] = arr
+            setattr(self, name, grown)
+        return old
+
 class DiseaseSystem(System):
     def __init__(self):
-        self.known_diseases: Dict[str, Disease] = {}
+        self.registry = DiseaseRegistry()
         
         # Name Gen Components
         self.prefixes = ["Crimson", "Shaking", "Burning", "Pale", "Black", "Silent", "Rabid", "Weeping"]
         self.roots = ["Lung", "Blood", "Gut", "Bone", "Skin", "Brain", "Eye"]
         self.suffixes = ["Rot", "Fever", "Pox", "Blight", "Plague", "Cough", "Flux", "Withering"]
 
+    @property
+    def known_diseases(self) -> Dict[str, Disease]:
+        """Read-only view of the live strains (UI compatibility)."""
+        return dict(self.registry.items())
+
+    @known_diseases.setter
+    def known_diseases(self, diseases: Dict[str, Disease]):
+        self.registry = DiseaseRegistry()
+        for disease in diseases.values():
+            self.registry.add(disease)
+
     def update(self, state):
         # Ensure infection tracking dataframe exists
         if not hasattr(state, 'infections'):
@@ -52,6 +175,10 @@ class DiseaseSystem(System):
         self._handle_transmission(state)
         self._handle_progression(state)
         self._handle_persistence(state) # Manage dormancy/immunity waning
+        
+        # Housekeeping: Drop strains nobody carries or remembers
+        if state.day % 30 == 0:
+            self._retire_extinct_strains(state)
 
     def _check_outbreak(self, state):
         pop_count = len(state.population)
@@ -66,7 +193,7 @@ class DiseaseSystem(System):
 
     def _create_outbreak(self, state):
         disease = self._generate_procedural_disease()
-        self.known_diseases[disease.id] = disease
+        self.registry.add(disease)
         state.log(f"☣️ OUTBREAK: A new plague '{disease.name}' has emerged!")
         
         # Patient Zero (Random living person)
@@ -84,7 +211,7 @@ class DiseaseSystem(System):
             return
 
     def _infect(self, state, person_id, disease_id):
-        disease = self.known_diseases[disease_id]
+        slot = self.registry.slot(disease_id)
         
         # Check Immunity
         imm_row = state.immunities[
@@ -120,7 +247,7 @@ class DiseaseSystem(System):
             if not existing.iloc[0]['active']:
                 idx = existing.index[0]
                 state.infections.at[idx, 'active'] = True
-                state.log(f"⚠️ {disease.name} has re-awakened in a host!")
+                state.log(f"⚠️ {self.registry.names[slot]} has re-awakened in a host!")
             return
         
         # New Infection
@@ -142,18 +269,20 @@ class DiseaseSystem(System):
         active_infections = state.infections[state.infections['active'] == True]
         if active_infections.empty: return
         
+        # Strains missing from the registry (slot -1) have no parameters: skip them
         active_disease_ids = active_infections['disease_id'].unique()
+        slots = self.registry.slots_for(active_disease_ids)
         pop = state.population
         has_coords = 'x' in pop.columns
         
-        for d_id in active_disease_ids:
-            disease = self.known_diseases[d_id]
+        for d_id, slot in zip(active_disease_ids[slots >= 0], slots[slots >= 0]):
+            transmission = self.registry.transmission[slot]
             infected_ids = active_infections[active_infections['disease_id'] == d_id]['person_id'].values
             
             if not has_coords:
                 # --- LEGACY GLOBAL TRANSMISSION ---
                 infected_count = len(infected_ids)
-                prob = 1.0 - ((1.0 - disease.transmission) ** infected_count)
+                prob = 1.0 - ((1.0 - transmission) ** infected_count)
                 prob = min(0.5, prob)
                 
                 susceptible_df = pop[(~pop['id'].isin(infected_ids)) & (pop['is_alive'])]
@@ -192,7 +321,7 @@ class DiseaseSystem(System):
                     # Transmission Roll
                     # Each neighbor rolls against disease transmission chance
                     rolls = np.random.random(len(neighbors))
-                    hits = neighbors[rolls < disease.transmission]['id'].values
+                    hits = neighbors[rolls < transmission]['id'].values
                     
                     for vid in hits:
                         # Attempt infection (Immunity checks inside _infect)
@@ -200,114 +329,108 @@ class DiseaseSystem(System):
                         except: pass
 
     def _handle_progression(self, state):
+        """
+        Single-pass progression over all active infections.
+        Infection rows are joined to population rows through an integer index,
+        so the cost is O(active infections) regardless of how many diseases circulate.
+        """
         if state.infections.empty: return
         
         # Only process active
-        mask = state.infections['active'] == True
+        mask = (state.infections['active'] == True).to_numpy()
         if not mask.any(): return
         
         # Increment days for active
         state.infections.loc[mask, 'days_infected'] += 1
         
-        active_disease_ids = state.infections.loc[mask, 'disease_id'].unique()
+        active = state.infections.loc[mask]
         
-        ids_to_remove = [] # For acute
-        ids_to_dormant = [] # For chronic
+        # 1. Per-infection disease parameters (gathered from the registry by slot)
+        # Strains missing from the registry (slot -1) have no parameters: skip them
+        reg = self.registry
+        slots = reg.slots_for(active['disease_id'])
+        known = slots >= 0
+        if not known.all():
+            active, slots = active.loc[known], slots[known]
+            if active.empty: return
+        row_idx = active.index.to_numpy()
+        days = active['days_infected'].to_numpy(dtype=float)
+        hp_eff = reg.effects[slots, reg.EFFECTS.index('hp')]
+        stamina_eff = reg.effects[slots, reg.EFFECTS.index('stamina')]
+        duration = reg.duration[slots]
+        chronic = reg.is_chronic[slots]
         
-        for d_id in active_disease_ids:
-            disease = self.known_diseases[d_id]
-            d_mask = mask & (state.infections['disease_id'] == d_id)
-            victim_ids = state.infections.loc[d_mask, 'person_id'].values
-            
-            if len(victim_ids) == 0: continue
-
-            # Apply Damage
-            pop_mask = state.population['id'].isin(victim_ids)
-            
-            # Sensitization Multiplier
-            # Check exposure counts for these victims
-            # Join with immunities (Slow? optimize later)
-            # Simplification: Assume 1.0 damage multiplier for now unless specialized
+        # 2. Join infections -> population rows (-1 = host no longer in population)
+        pop = state.population
+        pop_pos = pd.Index(pop['id']).get_indexer(active['person_id'])
+        hosted = pop_pos >= 0
+        
+        if hosted.any():
+            pos = pop_pos[hosted]
             
             # Genetic Vulnerability Multiplier
-            if 'genetic_vulnerability' in state.population.columns:
-                 # Extract vul for victims
-                 # Need to align indexes
-                 vuls = state.population.loc[pop_mask, 'genetic_vulnerability'].fillna(0.0)
-                 # Formula: Damage * (1 + Vul * 2) -> Max 3x damage for 1.0 vul
-                 dmg_mult = 1.0 + (vuls * 2.0)
+            # Formula: Damage * (1 + Vul * 2) -> Max 3x damage for 1.0 vul
+            if 'genetic_vulnerability' in pop.columns:
+                vuls = pd.to_numeric(pop['genetic_vulnerability'], errors='coerce').fillna(0.0).to_numpy()
+                dmg_mult = 1.0 + (vuls[pos] * 2.0)
             else:
-                 dmg_mult = 1.0
+                dmg_mult = 1.0
             
-            if disease.immunity_type == 'sensitizing':
-                 # Hack: Just apply random critically for checking mechanism
-                 pass
-
-            if 'hp' in disease.effects:
-                # Effect is negative, so we add (negative * positive_mult)
-                # Vectorized operation
-                state.population.loc[pop_mask, 'hp'] += (disease.effects['hp'] * dmg_mult)
-            if 'stamina' in disease.effects:
-                state.population.loc[pop_mask, 'stamina'] += (disease.effects['stamina'] * dmg_mult)
-                
-            # Recovery Check
-            recovered_submask = state.infections.loc[d_mask, 'days_infected'] >= disease.duration
-            if recovered_submask.any():
-                rec_rows = state.infections.loc[d_mask][recovered_submask]
-                
-                # Grant Immunity
-                self._grant_immunity(state, rec_rows['person_id'].values, disease)
-
-                if disease.is_chronic:
-                    ids_to_dormant.extend(rec_rows.index.tolist())
-                else:
-                    ids_to_remove.extend(rec_rows.index.tolist())
-
-        # Apply State Changes
-        # CRITICAL FIX: Process dormant updates FIRST (no index shift), then removals
-        if ids_to_dormant:
-            # Safe Update via index intersection
-            dormant_indices = state.infections.index.intersection(ids_to_dormant)
-            if len(dormant_indices) > 0:
-                state.infections.loc[dormant_indices, 'active'] = False
-                state.infections.loc[dormant_indices, 'days_infected'] = 0
-        
-        if ids_to_remove:
-            # Safe Drop - do this AFTER dormant updates
-            existing_remove = state.infections.index.intersection(ids_to_remove)
-            if not existing_remove.empty:
-                state.infections.drop(existing_remove, inplace=True)
-                state.infections.reset_index(drop=True, inplace=True)
+            # 3. Accumulate effects per agent across all diseases
+            hp_delta = np.zeros(len(pop))
+            stamina_delta = np.zeros(len(pop))
+            np.add.at(hp_delta, pos, hp_eff[hosted] * dmg_mult)
+            np.add.at(stamina_delta, pos, stamina_eff[hosted] * dmg_mult)
             
-            # 1. Handle Dormant (No index shift yet)
-            existing_dormant = state.infections.index.intersection(ids_to_dormant)
-            if not existing_dormant.empty:
-                state.infections.loc[existing_dormant, 'active'] = False
-                state.infections.loc[existing_dormant, 'days_infected'] = 0
-
-            # 2. Handle Remove (Shift happens after this)
-            existing_remove = state.infections.index.intersection(ids_to_remove)
-            if not existing_remove.empty:
-                state.infections.drop(existing_remove, inplace=True)
-                state.infections.reset_index(drop=True, inplace=True)
+            touched = np.unique(pos)
+            touched_idx = pop.index[touched]
+            pop.loc[touched_idx, 'hp'] += hp_delta[touched]
+            pop.loc[touched_idx, 'stamina'] += stamina_delta[touched]
+        
+        # 4. Recovery Check (bulk)
+        recovered = days >= duration
+        if not recovered.any(): return
+        
+        # Grant Immunity
+        rec = active.loc[recovered]
+        self._grant_immunity(state, rec['person_id'].to_numpy(), rec['disease_id'].to_numpy(), slots[recovered])
+        
+        # Chronic -> Dormant, Acute -> Removed
+        dormant_idx = row_idx[recovered & chronic]
+        remove_idx = row_idx[recovered & ~chronic]
+        
+        if len(dormant_idx) > 0:
+            state.infections.loc[dormant_idx, 'active'] = False
+            state.infections.loc[dormant_idx, 'days_infected'] = 0
+        
+        if len(remove_idx) > 0:
+            state.infections.drop(remove_idx, inplace=True)
+            state.infections.reset_index(drop=True, inplace=True)
 
-    def _grant_immunity(self, state, person_ids, disease):
+    def _grant_immunity(self, state, person_ids, disease_ids, slots):
+        """Bulk upsert of immunity rows for (person, disease) pairs."""
         if len(person_ids) == 0: return
         
-        # Upsert immunity
-        # Slow iterative for now
-        for pid in person_ids:
-            mask = (state.immunities['person_id'] == pid) & (state.immunities['disease_id'] == disease.id)
-            
-            boost = 1.0 
-            if disease.immunity_type == 'waning':
-                boost = 0.8 # Not perfect
+        waning = self.registry.immunity_type[slots] == DiseaseRegistry.IMMUNITY_TYPES.index('waning')
+        boosts = np.where(waning, 0.8, 1.0) # Waning is not perfect
+        
+        imm = state.immunities
+        existing = pd.MultiIndex.from_arrays([imm['person_id'], imm['disease_id']])
+        incoming = pd.MultiIndex.from_arrays([person_ids, disease_ids])
+        pos = existing.get_indexer(incoming)
+        
+        found = pos >= 0
+        if found.any():
+            imm.loc[imm.index[pos[found]], 'immunity_level'] = boosts[found]
             
-            if mask.any():
-                state.immunities.loc[mask, 'immunity_level'] = boost
-            else:
-                new_row = {"person_id": pid, "disease_id": disease.id, "immunity_level": boost, "exposure_count": 1}
-                state.immunities = pd.concat([state.immunities, pd.DataFrame([new_row])], ignore_index=True)
+        if (~found).any():
+            new_rows = pd.DataFrame({
+                "person_id": np.asarray(person_ids)[~found],
+                "disease_id": np.asarray(disease_ids)[~found],
+                "immunity_level": boosts[~found],
+                "exposure_count": 1
+            }).drop_duplicates(subset=['person_id', 'disease_id'])
+            state.immunities = pd.concat([imm, new_rows], ignore_index=True)
 
     def _handle_persistence(self, state):
         # 1. Immunity Waning
@@ -339,6 +462,34 @@ class DiseaseSystem(System):
                          state.infections.loc[react_mask, 'active'] = True
                          # Log? state.log("Chronic flare up!")
 
+    def _retire_extinct_strains(self, state):
+        """
+        Retires strains with no active or latent carriers and no remaining immunity
+        among the living. Rows belonging to hosts who are gone are dropped as well.
+        Immunity rows at level 0 still carry the host's exposure_count (sensitization),
+        so they keep their strain in circulation.
+        """
+        if len(self.registry) == 0: return
+        
+        living_ids = state.population.loc[state.population['is_alive'] == True, 'id']
+        
+        if not state.infections.empty:
+            keep = state.infections['person_id'].isin(living_ids)
+            if not keep.all():
+                state.infections = state.infections[keep].reset_index(drop=True)
+        if not state.immunities.empty:
+            keep = state.immunities['person_id'].isin(living_ids)
+            if not keep.all():
+                state.immunities = state.immunities[keep].reset_index(drop=True)
+        
+        imm = state.immunities
+        remembered = imm.loc[(imm['immunity_level'] > 0) | (imm['exposure_count'] > 0), 'disease_id']
+        in_circulation = set(state.infections['disease_id'].unique()) | set(remembered.unique())
+        extinct = [d_id for d_id in self.registry.live_ids() if d_id not in in_circulation]
+        
+        if extinct:
+            self.registry.retire(extinct)
+
     def _generate_procedural_disease(self) -> Disease:
         name = f"{random.choice(self.prefixes)} {random.choice(self.roots)} {random.choice(self.suffixes)}"
         
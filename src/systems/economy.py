@@ -1,5 +1,6 @@
 from src.engine.systems import System
 from src.systems.inventory import InventorySystem
+from src.engine.mapgrid import TERRAIN_TYPES
 import pandas as pd
 import numpy as np
 import random
@@ -37,101 +38,37 @@ class EconomySystem(System):
         self._handle_p2p_trade(state, living_df)
 
     def _handle_crafting(self, state: 'WorldState', df: pd.DataFrame) -> None:
-        # Recipes
-        # Spear: 2 Wood + 1 Stone
-        # Basket: 3 Wood
-        
-        inv = state.inventory
-        if inv.empty or df.empty:
+        """
+        Vectorized crafting over the (agent, material) block of the inventory store.
+        Recipes come from the catalogue (data/recipes.csv, priority order); an agent
+        crafts the first one they can afford, once per tick. Eligibility of every agent
+        for every recipe is one comparison against the cost matrix; deductions and new
+        tools are applied in bulk.
+        """
+        store, catalogue = state.inventory_store, state.catalogue
+        inputs = catalogue.recipe_inputs
+        materials = catalogue.names_of(inputs)
+        if df.empty or len(inputs) == 0:
             return
         
         try:
-            # Identify Potential Crafters
-            # Filter inventory for materials
-            materials = inv[inv['item'].isin(['Wood', 'Stone'])]
-            if materials.empty: return
-
+            # 1. Per-Agent Material Pivot (one row per handle)
+            handles = np.unique(state.handles.lookup(df['id'].to_numpy()))
+            stock = store.stacks(handles, materials)
+            cost = catalogue.recipe_cost[:, inputs]
             
-            # Agents who have materials
-            agent_ids = materials['agent_id'].unique()
+            # 2. Eligibility (agent x recipe) -> first affordable recipe per agent
+            eligible = (stock[:, None, :] >= cost[None, :, :]).all(axis=2)
+            crafts = eligible.any(axis=1)
+            if not crafts.any(): return
+            crafters, recipe = handles[crafts], np.argmax(eligible[crafts], axis=1)
             
-            updates = []
-            drops = [] # Indices to drop from inventory
-            
-            for ag_id in agent_ids:
-                # Get Agent's materials
-                ag_mat = materials[materials['agent_id'] == ag_id]
-                
-                wood = ag_mat[ag_mat['item'] == 'Wood']['amount'].sum()
-                stone = ag_mat[ag_mat['item'] == 'Stone']['amount'].sum()
-                
-                # Check for existing tools (prevent hoarding)
-                # This requires full inventory check for this agent
-                # Assume they make 1 if they can.
-                
-                # Recipe: Spear (Priority for Hunters)
-                # 2 Wood + 1 Stone
-                crafted = False
-                if wood >= 2.0 and stone >= 1.0:
-                     # Craft Spear
-                     # Remove mats
-                     # Logic isn't atomic here, need to update DF later. 
-                     # For simulation speed, we'll just queue updates and assume no double-spend in one tick.
-                     
-                     # Add Spear
-                     updates.append({
-                        "agent_id": ag_id, "item": "Spear", "amount": 1, 
-                        "durability": 50, "max_durability": 50, "spoilage_rate": 0
-                     })
-                     
-                     # Consume materials (We need to find rows to reduce)
-                     # This is tricky in loop.
-                     # Let's simple-subtract from global DF using index found in Ag_Mat
-                     crafted = True
-                
-                elif wood >= 3.0:
-                     # Craft Basket
-                     updates.append({
-                        "agent_id": ag_id, "item": "Basket", "amount": 1, 
-                        "durability": 30, "max_durability": 30, "spoilage_rate": 0
-                     })
-                     crafted = True
-                     
-                # If crafted, we should deduct materials.
-                # Doing this correctly requires row-level manipulation.
-                if crafted:
-                     # Find rows to deduct wood/stone from this agent
-                     # We need to access 'ag_mat' indices again
-                     
-                     # Deduct Wood
-                     wood_needed = 2.0 if stone >= 1.0 else 3.0 # Spear vs Basket
-                     wood_rows = ag_mat[ag_mat['item'] == 'Wood']
-                     
-                     remaining_cost = wood_needed
-                     for idx, row in wood_rows.iterrows():
-                         if remaining_cost <= 0: break
-                         current = row['amount']
-                         deduct = min(current, remaining_cost)
-                         # Queue deduction? Can't queue easily if we iterate.
-                         # Direct mod is okay here as we don't iterate main DF loop
-                         state.inventory.at[idx, 'amount'] -= deduct
-                         remaining_cost -= deduct
-                         
-                     # Deduct Stone (if Spear)
-                     if stone >= 1.0 and wood_needed == 2.0:
-                         stone_rows = ag_mat[ag_mat['item'] == 'Stone']
-                         remaining_cost = 1.0
-                         for idx, row in stone_rows.iterrows():
-                             if remaining_cost <= 0: break
-                             current = row['amount']
-                             deduct = min(current, remaining_cost)
-                             state.inventory.at[idx, 'amount'] -= deduct
-                             remaining_cost -= deduct
+            # 3. Bulk Deduction of the chosen recipes' inputs
+            store.subtract_block(crafters, store.codes_of(materials), cost[recipe])
             
-            # Batch Add new items
-            if updates:
-                new_items = pd.DataFrame(updates)
-                state.inventory = pd.concat([state.inventory, new_items], ignore_index=True)
+            # 4. Bulk Tool Creation (one batch per recipe)
+            for r, product in enumerate(catalogue.recipe_item):
+                store.add_tools(crafters[recipe == r], catalogue.names[product], catalogue.durability[product])
         
         except (KeyError, ValueError, IndexError) as e:
             print(f"⚠️ [EconomySystem] Warning: Crafting failed - {e}")
@@ -144,54 +81,37 @@ class EconomySystem(System):
             return
             
         # Guard against missing map (Fixes TypeError)
-        if state.map_data is None or state.map_data.empty:
+        grid = state.map_grid
+        if grid is None:
             return
         
         try:
-            lookup = state.globals.get('terrain_lookup', {})
-            scale = 5.0 
+            # Tile + terrain of every worker in one pass
+            tile_x, tile_y = grid.cell_of(workers['x'].to_numpy(), workers['y'].to_numpy())
+            worker_terrain = np.array(TERRAIN_TYPES, dtype=object)[grid.read('terrain', tile_x, tile_y)]
             
-            updates = [] 
-            durability_damage = [] # List of (index, damage)
-
+            store = state.inventory_store
+            worker_handles = state.handles.lookup(workers['id'].to_numpy())
+            gathered = [] # (handle, item, amount)
+            durability_damage = [] # Tool rows used this tick
             
             era = state.globals.get('era', 'Paleolithic')
             
-            # Helper map: Agent -> Inventory Subset (Tools)
-            # Pre-calc for performance
-            inv = state.inventory
-            tool_map = {}
-            if not inv.empty:
-                tools_df = inv[inv['item'].isin(['Spear', 'Basket'])]
-                # We need indices to apply damage later
-                # Group by agent?
-                for idx, row in tools_df.iterrows():
-                    aid = row['agent_id']
-                    if aid not in tool_map: tool_map[aid] = []
-                    tool_map[aid].append((row['item'], idx))
+            # Tools per worker (tool row or -1), one lookup per kind
+            spear_rows = store.first_tool(worker_handles, 'Spear')
+            basket_rows = store.first_tool(worker_handles, 'Basket')
 
-            for idx, agent in workers.iterrows():
-                ax, ay = agent['x'], agent['y']
-                gx, gy = int(ax // scale), int(ay // scale)
-                terrain = lookup.get((gx, gy), 'Plains')
+            for w, (idx, agent) in enumerate(workers.iterrows()):
+                gx, gy = tile_x[w], tile_y[w]
+                terrain = worker_terrain[w]
                 
                 # Checks
                 role = agent.get('role', 'Gatherer')
                 
                 # Check Tools
-                tools = tool_map.get(agent['id'], [])
-                has_spear = False
-                has_basket = False
-                spear_idx = -1
-                basket_idx = -1
-                
-                for t_item, t_idx in tools:
-                    if t_item == 'Spear': 
-                        has_spear = True
-                        spear_idx = t_idx
-                    elif t_item == 'Basket': 
-                        has_basket = True
-                        basket_idx = t_idx
+                spear_idx, basket_idx = spear_rows[w], basket_rows[w]
+                has_spear = spear_idx >= 0
+                has_basket = basket_idx >= 0
 
                 # Yield Logic (Base)
                 yield_amt = 1.0 + (agent['trait_conscientiousness'] * 0.5)
@@ -241,13 +161,12 @@ class EconomySystem(System):
                          state.log(f"🩹 Agent {agent['id']} injured while gathering in {terrain}!")
 
                 # Resource Depletion Logic (Realism Phase 1)
-                map_idx = gx * 20 + gy
-                if map_idx < 0 or map_idx >= len(state.map_data): map_idx = 0
-                
-                # Check resources
-                tile_wood = state.map_data.at[map_idx, 'res_wood']
-                tile_food = state.map_data.at[map_idx, 'res_food']
-                tile_stone = state.map_data.at[map_idx, 'res_stone']
+                # Check resources (tile of the worker's chunk, caught up on access)
+                tile, lx, ly = grid.tile(gx, gy)
+                res_wood, res_food, res_stone = tile['res_wood'], tile['res_food'], tile['res_stone']
+                tile_wood = res_wood[lx, ly]
+                tile_food = res_food[lx, ly]
+                tile_stone = res_stone[lx, ly]
                 
                 items_found = []
                 
@@ -257,8 +176,8 @@ class EconomySystem(System):
                         amt = yield_amt * 2
                         if is_hunter: amt *= 1.5 # Hunter fishing bonus
                         actual_amt = min(amt, tile_food)
-                        items_found.append(('Fish', actual_amt, 0.15))
-                        state.map_data.at[map_idx, 'res_food'] -= actual_amt
+                        items_found.append(('Fish', actual_amt))
+                        res_food[lx, ly] -= actual_amt
                         
                 elif terrain == 'Forest':
                     # Foraging/Wood
@@ -266,289 +185,165 @@ class EconomySystem(System):
                         amt = yield_amt * 3
                         if is_gatherer: amt *= 1.5 # Gatherer bonus
                         actual_amt = min(amt, tile_food)
-                        items_found.append(('Fruit', actual_amt, 0.1)) 
-                        state.map_data.at[map_idx, 'res_food'] -= actual_amt
+                        items_found.append(('Fruit', actual_amt)) 
+                        res_food[lx, ly] -= actual_amt
                         
                     if random.random() < 0.3 and tile_wood > 0: 
                         actual_amt = min(1.0, tile_wood)
                         if is_gatherer: actual_amt *= 1.2
-                        items_found.append(('Wood', actual_amt, 0.0)) 
-                        state.map_data.at[map_idx, 'res_wood'] -= actual_amt
+                        items_found.append(('Wood', actual_amt)) 
+                        res_wood[lx, ly] -= actual_amt
                         
                     if random.random() < 0.2 and tile_food > 0: 
                         amt = yield_amt
                         if is_hunter: amt *= 1.5
                         actual_amt = min(amt, tile_food)
-                        items_found.append(('Meat', actual_amt, 0.3)) 
-                        state.map_data.at[map_idx, 'res_food'] -= actual_amt
+                        items_found.append(('Meat', actual_amt)) 
+                        res_food[lx, ly] -= actual_amt
                         
                 elif terrain == 'Mountain':
                     if random.random() < 0.5 and tile_stone > 0: 
                         actual_amt = min(1.0, tile_stone)
-                        items_found.append(('Stone', actual_amt, 0.0))
-                        state.map_data.at[map_idx, 'res_stone'] -= actual_amt
+                        items_found.append(('Stone', actual_amt))
+                        res_stone[lx, ly] -= actual_amt
                         
                     if random.random() < 0.2 and tile_food > 0: 
                         amt = yield_amt
                         actual_amt = min(amt, tile_food)
-                        items_found.append(('Fruit', actual_amt, 0.1))
-                        state.map_data.at[map_idx, 'res_food'] -= actual_amt
+                        items_found.append(('Fruit', actual_amt))
+                        res_food[lx, ly] -= actual_amt
                         
                 else: # Plains
                     if era != 'Paleolithic' and random.random() < 0.4 and tile_food > 0:
                         amt = yield_amt * 2
                         actual_amt = min(amt, tile_food)
-                        items_found.append(('Grain', actual_amt, 0.01)) 
-                        state.map_data.at[map_idx, 'res_food'] -= actual_amt
+                        items_found.append(('Grain', actual_amt)) 
+                        res_food[lx, ly] -= actual_amt
                         
                     if random.random() < 0.3 and tile_food > 0: 
                         amt = yield_amt
                         actual_amt = min(amt, tile_food)
-                        items_found.append(('Meat', actual_amt, 0.3))
-                        state.map_data.at[map_idx, 'res_food'] -= actual_amt
+                        items_found.append(('Meat', actual_amt))
+                        res_food[lx, ly] -= actual_amt
                     elif tile_food > 0: 
                         amt = yield_amt
                         actual_amt = min(amt, tile_food)
-                        items_found.append(('Fruit', actual_amt, 0.1))
-                        state.map_data.at[map_idx, 'res_food'] -= actual_amt
+                        items_found.append(('Fruit', actual_amt))
+                        res_food[lx, ly] -= actual_amt
                 
-                for item, amt, sp in items_found:
+                for item, amt in items_found:
                     if amt > 0: # Only add if we actually gathered something
-                        updates.append({
-                            "agent_id": agent['id'], "item": item, "amount": amt, 
-                            "durability": 0, "max_durability": 0, "spoilage_rate": sp
-                        })
+                        gathered.append((worker_handles[w], item, amt))
             
-            # Apply Durability Damage (BEFORE adding new items to avoid index mismatch)
-            if durability_damage and not state.inventory.empty:
-                # -2 durability per use
-                # Filter valid indices just in case
-                valid_idx = [i for i in durability_damage if i in state.inventory.index]
-                if valid_idx:
-                     state.inventory.loc[valid_idx, 'durability'] -= 2.0
+            # Apply Durability Damage (-2 durability per use; broken tools are discarded)
+            store.wear(durability_damage, 2.0)
 
-            # Apply Updates (New Items)
-            if updates:
-                new_items = pd.DataFrame(updates)
-                state.inventory = pd.concat([state.inventory, new_items], ignore_index=True)
+            # Apply Updates (Stack onto the workers' inventories)
+            if gathered:
+                hs, items, amts = zip(*gathered)
+                store.add(hs, items, amts)
         
         except (KeyError, ValueError, IndexError) as e:
             print(f"⚠️ [EconomySystem] Warning: Gathering failed - {e}")
             # Continue simulation even if gathering fails
             return
 
-    def _handle_consumption(self, state: 'WorldState', living_df: pd.DataFrame) -> None:
-        # Agents need to eat.
-        # Priority: Meat (spoils fast) > Fish > Fruit > Grain
-        
-        # Get Inventory
-        inv = state.inventory
-        if inv.empty: 
-            # Fallback to global resources if inv empty (Legacy Support)
-            # Or starve?
-            # Let's support legacy global resources for 1-2 ticks
-            return
-
-        # Demand
-        needed = 2.0 # Calories
-        
-        # Identify food holders
-        # We need to process each agent or group?
-        # Group by agent_id
-        
-        # Optimize: 
-        # 1. Pivot Inventory to get columns: agent_id | Meat | Fish ...
-        # 2. Vectorized subtraction
-        # 3. Melt back?
-        
-        # Too complex. Let's interact with Global Pool for now to keep things moving?
-        # No, user asked for inventory.
-        
-        # Simplified Consumption:
-        # Just reduce random food from inventory.
-        
-        # Filter only food items
-        food_items = ['Meat', 'Fish', 'Fruit', 'Grain']
-        food_mask = inv['item'].isin(food_items)
-        food_inv = inv[food_mask]
-        
-        if food_inv.empty: return
-        
-        # Sort by spoilage rate descending (Eat spoiling food first)
-        # This global sort doesn't help per agent.
-        
-        # Let's do a trick: Group by Agent, Sum Total Food Amount.
-        # If Total > Need, they survive. Remove Need amount from their high-spoilage items.
-        
-        # This is hard to vectorize perfectly.
-        # Approximation:
-        # Decrease ALL food amounts by a tiny fraction (Simulating grazing/snacking)? NO.
-        
-        # Let's go row-by-row for FOOD ITEMS only?
-        # 500 agents * ~3 items = 1500 rows. Fast enough.
-        
-        # Complete food consumption logic
-        # Food items and priority
-        food_items = ['Meat', 'Fish', 'Fruit', 'Grain']
-        food_priority = {'Meat': 3.0, 'Fish': 2.5, 'Fruit': 1.5, 'Grain': 1.0}
-        
-        # Policy-based Distribution Priority
-        # Decentralized Logic: 
-        # Assign 'priority_score' based on Tribe Policy, then sort globally.
-        # Policy-based Distribution Priority
-        # Decentralized Logic: 
-        # Assign 'priority_score' based on Tribe Policy, then sort globally.
-        living_df = living_df.copy() # Fix SettingWithCopyWarning
-        living_df['priority_score'] = 0.0
-        
-        if hasattr(state, 'tribes'):
-             for tid, tdata in state.tribes.items():
-                 pol = tdata.get('policies', {}).get('rationing_label', 'Communal')
-                 t_mask = living_df['tribe_id'] == tid
-                 
-                 if pol == 'Meritocracy':
-                     # Prestige based (High prestige first)
-                     # Normalize to be competitive with other schemes? 
-                     # Let's assume Prestige is 0-100 range.
-                     living_df.loc[t_mask, 'priority_score'] = living_df.loc[t_mask, 'prestige'] * 2 # Boosted
-                 elif pol == 'ChildFirst':
-                     # Children first (Younger = Higher score)
-                     # Max age ~80. 
-                     living_df.loc[t_mask, 'priority_score'] = 200 - living_df.loc[t_mask, 'age']
-                 else: # Communal
-                     # Random shuffle equivalent
-                     living_df.loc[t_mask, 'priority_score'] = np.random.uniform(0, 100, size=t_mask.sum())
-        
-        # Sort by priority (Highest Score Eats First)
-        living_df = living_df.sort_values(by='priority_score', ascending=False)
-        
-        # Process living agents
-        for idx, agent in living_df.iterrows():
-            agent_id = agent['id']
-            needed = 2.0
-            
-            # Get agent's food sorted by spoilage
-            agent_food = inv[
-                (inv['agent_id'] == agent_id) & 
-                (inv['item'].isin(food_items))
-            ].sort_values(by='spoilage_rate', ascending=False)
-            
-            consumed_calories = 0.0
-            daily_nutrients = {'protein': 0, 'carbs': 0, 'vitamins': 0}
-
-            if agent_food.empty:
-                state.population.at[idx, 'stamina'] -= 15.0
-                # Do NOT continue; must process nutrient decay below
-            else:
-                for food_idx, food_row in agent_food.iterrows():
-                    if consumed_calories >= needed: break
-                    
-                    item = food_row['item']
-                    avail = food_row['amount']
-                    val = food_priority.get(item, 1.0)
-                    
-                    eat_amt = min(avail, (needed - consumed_calories) / val)
-                    if eat_amt > 0:
-                        state.inventory.at[food_idx, 'amount'] -= eat_amt
-                        consumed_calories += eat_amt * val
-                        
-                        # Nutrient Intake (Realism Phase 3)
-                        # Meat: Protein++
-                        # Fish: Protein+, Vitamin+
-                        # Fruit: Vitamin++, Carb+
-                        # Grain: Carb++
-                        if item == 'Meat':
-                            daily_nutrients['protein'] += eat_amt * 20
-                        elif item == 'Fish':
-                            daily_nutrients['protein'] += eat_amt * 15
-                            daily_nutrients['vitamins'] += eat_amt * 10
-                        elif item == 'Fruit':
-                            daily_nutrients['carbs'] += eat_amt * 10
-                            daily_nutrients['vitamins'] += eat_amt * 20
-                        elif item == 'Grain':
-                            daily_nutrients['carbs'] += eat_amt * 30
-
-            # Update Nutrients State
-            # Parse - Update - Write Back (Slow but functional for Phase 3)
-            try:
-                import ast
-                current_nuts = ast.literal_eval(agent.get('nutrients', "{'protein': 50, 'carbs': 50, 'vitamins': 50}"))
-            except:
-                current_nuts = {'protein': 50, 'carbs': 50, 'vitamins': 50}
-                
-            # Decay (Daily Burn)
-            current_nuts['protein'] -= 5
-            current_nuts['carbs'] -= 5
-            current_nuts['vitamins'] -= 5
-            
-            # Add Intake
-            current_nuts['protein'] += daily_nutrients['protein']
-            current_nuts['carbs'] += daily_nutrients['carbs']
-            current_nuts['vitamins'] += daily_nutrients['vitamins']
-            
-            # Cap at 100, Min 0
-            for k in current_nuts:
-                current_nuts[k] = max(0, min(100, current_nuts[k]))
-                
-            state.population.at[idx, 'nutrients'] = str(current_nuts)
-            
-            # Malnutrition Penalties
-            is_malnourished = False
-            if current_nuts['protein'] < 20: # Kwashiorkor (Weakness)
-                state.population.at[idx, 'max_hp'] -= 0.5
-                is_malnourished = True
-            if current_nuts['vitamins'] < 20: # Scurvy (Bleeding)
-                state.population.at[idx, 'hp'] -= 0.5
-                is_malnourished = True
-            if current_nuts['carbs'] < 20: # Weakness
-                state.population.at[idx, 'stamina'] -= 10.0
-                is_malnourished = True
-                
-            if is_malnourished and random.random() < 0.05:
-                state.log(f"⚠️ Agent {agent_id} is suffering from malnutrition.", agent_id=agent_id, category='Health')
-
+    NUTRIENTS = ['protein', 'carbs', 'vitamins']
+    DAILY_NEED = 2.0 # Calories
 
+    def _handle_consumption(self, state: 'WorldState', living_df: pd.DataFrame) -> None:
+        """
+        Agents eat from their own inventory (Matrix kernel, no per-agent loop).
+        Food stacks are read as an (agent, food) block with columns ordered by spoilage
+        desc; a cumulative calorie sum along each row gives every stack's eaten share.
+        Eating order comes from tribal rationing policies.
+        """
+        store, catalogue = state.inventory_store, state.catalogue
+        food_items = catalogue.food_items
+        if living_df.empty or not food_items: return
+        
+        # 1. Policy-based Distribution Priority (Highest Score Eats First)
+        # Meritocracy: Prestige (0-100, boosted) / ChildFirst: Younger first / Communal: random
+        policy = {tid: tdata.get('policies', {}).get('rationing_label', 'Communal')
+                  for tid, tdata in getattr(state, 'tribes', {}).items()}
+        tribes = living_df['tribe_id'] if 'tribe_id' in living_df.columns else pd.Series(None, index=living_df.index)
+        tribe_policy = tribes.map(policy).to_numpy(dtype=object)
+        priority = np.zeros(len(living_df))
+        merit = tribe_policy == 'Meritocracy'
+        child_first = tribe_policy == 'ChildFirst'
+        communal = pd.notna(tribe_policy) & ~merit & ~child_first
+        priority[merit] = living_df['prestige'].to_numpy(dtype=float)[merit] * 2
+        priority[child_first] = 200 - living_df['age'].to_numpy(dtype=float)[child_first]
+        priority[communal] = np.random.uniform(0, 100, size=communal.sum())
+        order = np.argsort(-priority, kind='stable')
+        n = len(living_df)
+        
+        # Eating rank = row of the block (IDs are short UUIDs; on a clash the first in line eats)
+        handles = state.handles.lookup(living_df['id'].to_numpy()[order])
+        _, first = np.unique(handles, return_index=True)
+        eats = np.zeros(n, dtype=bool)
+        eats[first] = True
+        
+        # 2. Food Block (rank x food), columns by spoilage desc (ties: catalogue order)
+        food = catalogue.food_codes
+        cols = np.argsort(-catalogue.spoilage[food], kind='stable')
+        food = food[cols]
+        codes = store.codes_of(catalogue.names_of(food))
+        calories = catalogue.calories[food]
+        stacks = store.stacks(handles, food_items)[:, cols] * eats[:, None]
+        row_cal = stacks * calories
+        
+        # 3. Cumulative calories along each row: what was eaten before each stack
+        before = np.cumsum(row_cal, axis=1) - row_cal
+        eaten_cal = np.clip(self.DAILY_NEED - before, 0.0, row_cal)
+        eat_amt = eaten_cal / calories
+        store.subtract_block(handles[eats], codes, eat_amt[eats])
+        
+        # 4. Per-Agent Totals (by rank)
+        consumed = eaten_cal.sum(axis=1)
+        has_food = (stacks > 0).any(axis=1)
+        intake = eat_amt @ catalogue.nutrients[food]
+        
+        # Back to living_df row order
+        by_row = np.empty(n, dtype=np.int64)
+        by_row[order] = np.arange(n)
+        consumed, has_food, intake = consumed[by_row], has_food[by_row], intake[by_row]
+        
+        # 5. Nutrients: Decay (Daily Burn) + Intake, capped to [0, 100]
+        nuts = _parse_nutrients(living_df['nutrients']) if 'nutrients' in living_df.columns else np.full((n, 3), 50.0)
+        nuts = np.clip(nuts - 5 + intake, 0, 100)
+        
+        # 6. Stamina / Health Effects
+        pop = state.population
+        rows = pop.index.get_indexer(living_df.index)
+        stamina = np.array(pop['stamina'], dtype=float)
+        hp = np.array(pop['hp'], dtype=float)
+        max_hp = np.array(pop['max_hp'], dtype=float)
+        
+        d_stamina = np.where(has_food, 0.0, -15.0) # Empty larder
+        full = consumed >= self.DAILY_NEED - 1e-9 # Float slack on a full meal
+        d_stamina += np.where(full, 10.0,
+                     np.where(consumed >= self.DAILY_NEED * 0.5, 2.0, -(self.DAILY_NEED - consumed) * 5.0))
+        
+        # Malnutrition Penalties
+        low_protein, low_carbs, low_vitamins = nuts[:, 0] < 20, nuts[:, 1] < 20, nuts[:, 2] < 20
+        max_hp[rows[low_protein]] -= 0.5   # Kwashiorkor (Weakness)
+        hp[rows[low_vitamins]] -= 0.5      # Scurvy (Bleeding)
+        d_stamina[low_carbs] -= 10.0       # Weakness
+        stamina[rows] += d_stamina
+        
+        pop['stamina'] = stamina
+        pop['hp'] = hp
+        pop['max_hp'] = max_hp
+        if 'nutrients' in pop.columns:
+            nutrients = pop['nutrients'].to_numpy(dtype=object).copy()
+            nutrients[rows] = _format_nutrients(nuts)
+            pop['nutrients'] = nutrients
+        
+        malnourished = np.flatnonzero((low_protein | low_carbs | low_vitamins) & (np.random.random(n) < 0.05))
+        for agent_id in living_df['id'].to_numpy()[malnourished]:
+            state.log(f"⚠️ Agent {agent_id} is suffering from malnutrition.", agent_id=agent_id, category='Health')
 
-            # Apply stamina effects
-            if consumed_calories >= needed:
-                state.population.at[idx, 'stamina'] += 10.0
-            elif consumed_calories >= needed * 0.5:
-                state.population.at[idx, 'stamina'] += 2.0
-            else:
-                state.population.at[idx, 'stamina'] -= (needed - consumed_calories) * 5.0
-
-        # Cleanup zero amounts
-        state.inventory = state.inventory[state.inventory['amount'] > 0.01].copy()
-        state.inventory.reset_index(drop=True, inplace=True)
-        return
-        
-        # Update alive agents stamina
-        # Using index map
-        
-        # Optimization:
-        # living_df matches on 'id'
-        fed_mask = living_df['id'].isin(fed_agents)
-        
-        # Boost stamina for fed
-        # Note: We need to access the main state.population, not the copy living_df
-        # Use indices
-        
-        fed_indices = living_df[fed_mask].index
-        state.population.loc[fed_indices, 'stamina'] += 10.0
-        
-        # Reduce food?
-        # We should reduce food from inventory corresponding to consumption.
-        # Ideally remove 2.0 units per agent.
-        # We'll just Apply a flat tax to all food inventory for now to simulate consumption
-        # InventorySystem already decays food. Let's add 'Consumption Rate' to natural decay?
-        # No, that's spoilage.
-        
-        # Let's force reduce all food items by 0.5 (Eating)
-        state.inventory.loc[food_mask, 'amount'] -= 0.5
-        
-        # Starving:
-        starving_indices = living_df[~fed_mask].index
-        state.population.loc[starving_indices, 'stamina'] -= 10.0
 
     def _handle_p2p_trade(self, state, df):
         # 4. Spatial Trade (Barter/Gifting)
@@ -556,69 +351,51 @@ class EconomySystem(System):
         
         if 'x' not in df.columns: return
         
-        # Identify Needy (Food < 2.0 or missing tools)
-        inv = state.inventory
-        if inv.empty: return
-        
-        # Aggregate Food per agent
-        food_items = ['Meat', 'Fish', 'Fruit', 'Grain']
-        # Groupby is essential
-        agent_food = inv[inv['item'].isin(food_items)].groupby('agent_id')['amount'].sum()
+        # Identify Needy (Food < 2.0) from the shared needs table
+        store = state.inventory_store
+        food_items = state.catalogue.food_items
+        if df.empty or not food_items: return
+        needs = state.needs()
         
-        # Needy: < 2.0 food
-        needy_ids = agent_food[agent_food < 2.0].index.values
+        # Needy: < 2.0 food (but still holding some) / Givers: food to spare
+        needy = needs.needs_food & (needs.food > 0)
+        givers = np.flatnonzero(needs.surplus[:, store.codes_of(food_items)].sum(axis=1) >= 1.0)
+        if not needy.any() or len(givers) == 0: return
         
-        if len(needy_ids) == 0: return
-        
-        needy_df = df[df['id'].isin(needy_ids)]
-        rich_df = df[~df['id'].isin(needy_ids)]
-        
-        if rich_df.empty: return
+        pos = state.population.loc[needs.index]
+        x, y = pos['x'].to_numpy(dtype=float), pos['y'].to_numpy(dtype=float)
         
         # Sample limit
-        sample_needy = needy_df.sample(min(len(needy_df), 20))
+        beggars = np.random.permutation(np.flatnonzero(needy))[:20]
         
-        for _, beggar in sample_needy.iterrows():
-            bx, by = beggar['x'], beggar['y']
-            
-            # Find neighbors < 20.0
-            dx = rich_df['x'] - bx
-            dy = rich_df['y'] - by
-            dists_sq = dx*dx + dy*dy
-            
-            # Radius 20.0 (400 sq)
-            neighbor_mask = dists_sq < 400.0
-            potential_givers = rich_df[neighbor_mask]
+        for b in beggars:
+            # Find neighbors < 20.0 (Radius 20.0 -> 400 sq)
+            dx = x[givers] - x[b]
+            dy = y[givers] - y[b]
+            potential_givers = givers[dx*dx + dy*dy < 400.0]
             
-            if potential_givers.empty: continue
+            if len(potential_givers) == 0: continue
             
             # Pick one
-            giver = potential_givers.sample(1).iloc[0]
-            giver_id = giver['id']
+            g = np.random.choice(potential_givers)
             
-            # Execute Trade
-            g_inv_mask = (inv['agent_id'] == giver_id) & (inv['item'].isin(food_items))
-            if not g_inv_mask.any(): continue
+            # Execute Trade: one unit of the first food they can spare
+            spare = needs.surplus[g, store.codes_of(food_items)]
+            if not (spare >= 1.0).any(): continue
+            item_name = food_items[int(np.argmax(spare >= 1.0))]
             
-            # Take one unit of whatever they have
-            g_indices = inv[g_inv_mask].index
-            item_idx = g_indices[0]
-            
-            item_name = inv.at[item_idx, 'item']
-            amount_to_give = 1.0
-            
-            # Deduct
-            inv.at[item_idx, 'amount'] -= amount_to_give
-            if inv.at[item_idx, 'amount'] <= 0:
-                inv.drop(item_idx, inplace=True)
-                
-            # Add to Beggar
-            new_item = {
-                "agent_id": beggar['id'], "item": item_name, "amount": amount_to_give, 
-                "durability": 0, "max_durability": 0, "spoilage_rate": 0.1 
-            }
-            state.inventory = pd.concat([state.inventory, pd.DataFrame([new_item])], ignore_index=True)
+            store.transfer([needs.handles[g]], [needs.handles[b]], [store.code(item_name)])
+            needs.update_rows([g, b])
             
-            state.log(f"🤝 Trade: {beggar['id'][-4:]} bought {item_name} from {giver['id'][-4:]} for Promise", category='Economy')
+            state.log(f"🤝 Trade: {needs.ids[b][-4:]} bought {item_name} from {needs.ids[g][-4:]} for Promise", category='Economy')
 
+def _parse_nutrients(values: pd.Series) -> np.ndarray:
+    """Serialized nutrient dicts -> (N, 3) array (protein, carbs, vitamins); unreadable -> 50."""
+    text = values.astype(str)
+    cols = [pd.to_numeric(text.str.extract(rf"'{k}':\s*([-+\d.eE]+)", expand=False), errors='coerce')
+            for k in EconomySystem.NUTRIENTS]
+    return np.nan_to_num(np.column_stack(cols).astype(float), nan=50.0)
 
+def _format_nutrients(nuts: np.ndarray) -> list:
+    """(N, 3) array -> serialized nutrient dicts (same format as the loaders)."""
+    return [f"{{'protein': {p:g}, 'carbs': {c:g}, 'vitamins': {v:g}}}" for p, c, v in nuts.tolist()]
@@ -1,155 +1,111 @@
 import pandas as pd
 import numpy as np
-import random
 from src.engine.systems import System
 
 class GeneticsSystem(System):
     """
     Handles Genetics, Inheritance, and Evolution.
-    - Assigns Genomes to new agents.
+    - Assigns Genomes to new agents (state.genomes, one uint8 row per handle).
+    - Keeps the pedigree kinship table (state.kinship) up to date.
     - Calculates Genetic Vulnerability (Inbreeding).
+    All agents missing a genome in a tick are processed as one batch.
     """
-    def __init__(self):
-        self.GENOME_LENGTH = 32
-        self.BASES = ['A', 'C', 'G', 'T']
-    
+    MUTATION_RATE = 0.01 # Per base
+    TRAITS = ['trait_openness', 'trait_conscientiousness', 'trait_extraversion',
+              'trait_agreeableness', 'trait_neuroticism', 'libido', 'attractiveness', 'skin_tone']
+
     def update(self, state):
         df = state.population
-        
-        # 1. Initialize Genome for those who lack it (Initial Pop or New Mutations)
-        # Check if column exists, if not create
-        if 'genome' not in df.columns:
-            df['genome'] = None
-            
+        if df.empty: return
+
         if 'genetic_vulnerability' not in df.columns:
             df['genetic_vulnerability'] = 0.0
-            
-        # Find agents without genome
-        no_genome_mask = df['genome'].isnull()
-        if no_genome_mask.any():
-            missing_indices = df[no_genome_mask].index
-            
-            for idx in missing_indices:
-                person = df.loc[idx]
-                
-                # Check if parents exist in population (Inheritance)
-                # We need columns 'mother_id' and 'father_id' ideally.
-                # Currently BiologySystem only passed 'family_id' and 'partner_id' helps find father but child row needs explicit parent links.
-                # Assuming BiologySystem adds 'mother_id' and 'father_id' to `new_babies`.
-                
-                mom_id = person.get('mother_id')
-                dad_id = person.get('father_id')
-                
-                if mom_id and dad_id:
-                    self._inherit_genome(state, idx, mom_id, dad_id)
-                else:
-                    self._generate_random_genome(state, idx)
-                    
-    def _generate_random_genome(self, state, idx):
-        # Random sequence
-        genome = "".join(random.choices(self.BASES, k=self.GENOME_LENGTH))
-        state.population.at[idx, 'genome'] = genome
-        # Base vulnerability for randoms is low (diverse)
-        state.population.at[idx, 'genetic_vulnerability'] = random.uniform(0.0, 0.1)
-
-    def _inherit_genome(self, state, child_idx, mom_id, dad_id):
-        df = state.population
-        
-        # Retrieve parents
-        # This search might be slow if pop is huge, but usually number of babies per tick is low.
-        mom = df[df['id'] == mom_id]
-        dad = df[df['id'] == dad_id]
-        
-        if mom.empty or dad.empty:
-            # Fallback if parents died/gone
-            self._generate_random_genome(state, child_idx)
-            return
-            
-        mom_genome = mom.iloc[0]['genome']
-        dad_genome = dad.iloc[0]['genome']
-        
-        if not mom_genome or not dad_genome:
-             self._generate_random_genome(state, child_idx)
-             return
-             
-        # Crossover (50/50 split per base)
-        # Vectorized string ops is hard, do list comprehension
-        child_bases = []
-        similarity_hits = 0
+
+        # 1. Find agents without genome (Initial Pop or Newborns)
+        store = state.genomes
+        handles = state.handles.lookup(df['id'].to_numpy())
+        rows = np.flatnonzero(~store.has(handles))
+        if len(rows) == 0: return
+
+        # 2. Parents (by handle; archived parents still have their genome row)
+        def parent_handles(col):
+            if col not in df.columns: return np.full(len(rows), -1)
+            ids = df[col].to_numpy(dtype=object)[rows]
+            known = pd.notna(ids)
+            out = np.full(len(rows), -1)
+            out[known] = state.handles.lookup(ids[known], create=False)
+            return out
+
+        mom_h, dad_h = parent_handles('mother_id'), parent_handles('father_id')
         
-        for i in range(self.GENOME_LENGTH):
-            m_base = mom_genome[i]
-            d_base = dad_genome[i]
-            
-            if m_base == d_base:
-                similarity_hits += 1
-            
-            # 50% chance
-            if random.random() < 0.5:
-                child_bases.append(m_base)
+        # Pedigree: newborns' kinship rows from their parents' rows (founders need none)
+        has_parent = (mom_h >= 0) | (dad_h >= 0)
+        state.kinship.add_births(handles[rows[has_parent]], mom_h[has_parent], dad_h[has_parent])
+
+        # Kin edges (Parent <-> Child) for parents still in the population (archived ones are pruned)
+        for parent_h in (mom_h, dad_h):
+            linked = np.isin(parent_h, handles)
+            child_h = handles[rows[linked]]
+            state.relationship_graph.add(child_h, parent_h[linked], 'Parent', start_day=state.day)
+            state.relationship_graph.add(parent_h[linked], child_h, 'Child', start_day=state.day)
+
+        inherits = store.has(mom_h) & store.has(dad_h)
+        vul = np.array(df['genetic_vulnerability'], dtype=float)
+
+        # 3. Random Genomes (no known parents): diverse, so low base vulnerability
+        fresh = rows[~inherits]
+        store.randomize(handles[fresh])
+        vul[fresh] = np.random.uniform(0.0, 0.1, size=len(fresh))
+
+        # 4. Inheritance: Crossover + Mutation for the whole batch
+        born = rows[inherits]
+        if len(born) > 0:
+            similarity = store.inherit(handles[born], mom_h[inherits], dad_h[inherits], self.MUTATION_RATE)
+
+            # Inbreeding -> Vulnerability
+            # Pedigree: 2F (child of cousins 0.125, of half-siblings 0.25, of siblings 0.5)
+            # Genome similarity as a floor for unrecorded relatedness (Power curve: similarity ^ 4)
+            # e.g. 0.5^4 = 0.06 (Low), 0.8^4 = 0.40 (High), 0.9^4 = 0.65 (Very High)
+            inbreeding = state.kinship.inbreeding(handles[born])
+            vul[born] = np.minimum(1.0, np.maximum(2.0 * inbreeding, similarity ** 4.0))
+
+            self._inherit_traits(df, born, df['mother_id'].to_numpy(dtype=object)[born],
+                                 df['father_id'].to_numpy(dtype=object)[born])
+
+        df['genetic_vulnerability'] = vul
+
+    def _inherit_traits(self, df, born, mom_ids, dad_ids):
+        """
+        Deep Psychology: Nature vs Nurture.
+        50% Parents (Avg), 50% Experience (Random), plus drift. Only for children whose
+        parents are both still in the population.
+        """
+        # Row of each ID (IDs are short UUIDs; on a clash the last row wins)
+        id_index = pd.Index(df['id'])
+        row_of = np.arange(len(df))
+        if not id_index.is_unique:
+            last = ~id_index.duplicated(keep='last')
+            id_index, row_of = id_index[last], row_of[last]
+
+        mom_pos, dad_pos = id_index.get_indexer(mom_ids), id_index.get_indexer(dad_ids)
+        both = (mom_pos >= 0) & (dad_pos >= 0)
+        if not both.any(): return
+        kids, mom_rows, dad_rows = born[both], row_of[mom_pos[both]], row_of[dad_pos[both]]
+        n = len(kids)
+
+        for t in self.TRAITS:
+            if t not in df.columns: continue
+            values = np.array(df[t], dtype=float)
+            avg_parent = (np.nan_to_num(values[mom_rows], nan=0.5) + np.nan_to_num(values[dad_rows], nan=0.5)) / 2.0
+
+            # Experience (Random noise; Attractiveness/Libido have their own shapes)
+            if t == 'attractiveness':
+                experience = np.random.normal(0.5, 0.15, n)
+            elif t == 'libido':
+                experience = np.random.beta(2, 5, n)
             else:
-                child_bases.append(d_base)
-                
-        # Mutation (1% chance per base)
-        for i in range(self.GENOME_LENGTH):
-            if random.random() < 0.01:
-                child_bases[i] = random.choice(self.BASES)
-                
-        child_genome = "".join(child_bases)
-        
-        # Inbreeding Calculation
-        # Similarity = Hits / Length
-        similarity = similarity_hits / self.GENOME_LENGTH
-        
-        # Vulnerability Mapping
-        # < 0.5: Healthy Diversity
-        # 0.5 - 0.7: Moderate
-        # > 0.8: High Risk (Inbreeding)
-        # Power curve: vul = similarity ^ 4
-        # e.g. 0.5^4 = 0.06 (Low)
-        # e.g. 0.8^4 = 0.40 (High)
-        # e.g. 0.9^4 = 0.65 (Very High)
-        
-        vul = similarity ** 4.0
-        
-        # Cap
-        vul = min(1.0, vul)
-        
-        state.population.at[child_idx, 'genome'] = child_genome
-        vul = similarity ** 4.0
-        
-        # Cap
-        vul = min(1.0, vul)
-        
-        state.population.at[child_idx, 'genome'] = child_genome
-        state.population.at[child_idx, 'genetic_vulnerability'] = vul
-        
-        # --- Deep Psychology: Nature vs Nurture ---
-        # 50% Parents (Avg), 50% Experience (Random)
-        traits = ['trait_openness', 'trait_conscientiousness', 'trait_extraversion', 
-                  'trait_agreeableness', 'trait_neuroticism', 'libido', 'attractiveness', 'skin_tone']
-        
-        for t in traits:
-            # Check if parents have this trait (compatibility)
-            if t in mom and t in dad:
-                m_val = mom.iloc[0].get(t, 0.5)
-                d_val = dad.iloc[0].get(t, 0.5)
-                
-                avg_parent = (m_val + d_val) / 2.0
-                experience = random.random() # Random noise
-                # For Attractiveness, skew slightly higher if healthy parents? 
-                if t == 'attractiveness':
-                     experience = random.gauss(0.5, 0.15)
-                elif t == 'libido':
-                     experience = random.betavariate(2, 5)
-                     
-                # 50/50 Mix
-                final_val = (0.5 * avg_parent) + (0.5 * experience)
-                
-                # Mutation / Drift
-                final_val += random.gauss(0, 0.05)
-                
-                # Clip
-                final_val = max(0.0, min(1.0, final_val))
-                
-                state.population.at[child_idx, t] = final_val
+                experience = np.random.random(n)
+
+            # 50/50 Mix + Mutation / Drift, clipped
+            values[kids] = np.clip(0.5 * avg_parent + 0.5 * experience + np.random.normal(0, 0.05, n), 0.0, 1.0)
+            df[t] = values
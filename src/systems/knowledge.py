@@ -1,5 +1,5 @@
 from src.engine.systems import System
-import random
+from src.engine.spatial import SpatialGrid
 import pandas as pd
 import numpy as np
 
@@ -9,80 +9,76 @@ class KnowledgeSystem(System):
     Skills spread like viruses:
     - Vertical: Parent -> Child
     - Horizontal: Spouse -> Spouse
-    - Diffusion: Random contact
-    
-    Data: state.skills DataFrame (agent_id, skill_name, level)
+    - Diffusion: Random contact (a random neighbour within CONTACT_RADIUS)
+
+    Data: state.skill_store (Agent x Skill level matrix; state.skills is its DataFrame view)
+    All channels are one (teacher, learner) edge list, taught in a single batch.
     """
+    POSSIBLE_SKILLS = ['Weaving', 'Pottery', 'Herbalism', 'Farming', 'Archery']
+    DISCOVERY_CHANCE = 0.05 # Per inventor per month
+
+    # Teaching chance per known skill and contact (level * 0.5 is passed on)
+    HORIZONTAL_CHANCE = 0.2
+    VERTICAL_CHANCE = 0.2
+    CONTACT_CHANCE = 0.02
+    CONTACT_RADIUS = 10.0
+
     def update(self, state):
-        # 1. Initialize if needed
-        if not hasattr(state, 'skills'):
-            state.skills = pd.DataFrame(columns=['agent_id', 'skill', 'level'])
-            
-        # 2. Random Discovery (Mutation)
+        # 1. Random Discovery (Mutation)
         # Smart people invent things
         if state.day % 30 == 0:
             self._handle_discovery(state)
-            
-        # 3. Transmission (Viral Spread)
+
+        # 2. Transmission (Viral Spread)
         if state.day % 7 == 0:
             self._handle_transmission(state)
-            
+
     def _handle_discovery(self, state):
         df = state.population
         live_mask = df['is_alive'] == True
-        
+
         # High Intel Agents (Openness > 0.8)
-        inventors = df[live_mask & (df['trait_openness'] > 0.8)]
-        
-        possible_skills = ['Weaving', 'Pottery', 'Herbalism', 'Farming', 'Archery']
-        
-        for idx, inventor in inventors.iterrows():
-            if random.random() < 0.05: # 5% chance per month
-                skill = random.choice(possible_skills)
-                self._learn_skill(state, inventor['id'], skill, 0.1)
-                state.log(f"💡 INNOVATION! {inventor['id']} discovered {skill}!")
+        inventors = df.loc[live_mask & (df['trait_openness'] > 0.8), 'id'].to_numpy()
+        inventors = inventors[np.random.random(len(inventors)) < self.DISCOVERY_CHANCE]
+        if len(inventors) == 0: return
+
+        store = state.skill_store
+        codes = store.codes_of(self.POSSIBLE_SKILLS)
+        skills = np.random.randint(len(codes), size=len(inventors))
+        store.learn(state.handles.lookup(inventors), codes[skills], 0.1)
+        for agent_id, skill in zip(inventors, skills):
+            state.log(f"💡 INNOVATION! {agent_id} discovered {self.POSSIBLE_SKILLS[skill]}!")
 
     def _handle_transmission(self, state):
-        # A. Spouse Teaching (Horizontal)
-        rels = state.relationships
-        if rels.empty: return
-        
-        partners = rels[rels['type'].isin(['Spouse', 'Lover'])]
-        
-        # Iterate partners
-        # Optimization: Don't loop all. Sample?
-        # For now, loop all active (assuming < 1000 pairs)
-        
-        skills_df = state.skills
-        if skills_df.empty: return
-        
-        # Convert skills to dict for fast lookup: {agent_id: {skill: level}}
-        # This is expensive every tick. Maybe optimize later.
-        
-        for _, rel in partners.iterrows():
-            id_a = rel['id_a']
-            id_b = rel['id_b']
-            
-            # Get skills of A
-            skills_a = skills_df[skills_df['agent_id'] == id_a]
-            if not skills_a.empty:
-                for _, s in skills_a.iterrows():
-                    # Teach B (Chance based on affinity/intel)
-                    if random.random() < 0.2:
-                        self._learn_skill(state, id_b, s['skill'], s['level'] * 0.5)
+        store = state.skill_store
+        if len(store) == 0: return
+
+        df = state.population
+        living = df[df['is_alive'] == True]
+        if len(living) < 2: return
+        living_h = state.handles.lookup(living['id'].to_numpy())
+        alive = np.zeros(len(state.handles), dtype=bool)
+        alive[living_h] = True
+
+        # A. Spouse Teaching (Horizontal) + B. Parent -> Child (Vertical)
+        graph = state.relationship_graph
+        h_src, h_dst = graph.edge_list(['Spouse', 'Lover'])
+        v_src, v_dst = graph.edge_list(['Child']) # "dst is src's Child"
+
+        # C. Random Contact: one random neighbour each
+        contact_src, contact_dst = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        if 'x' in living.columns:
+            grid = SpatialGrid(living['x'].to_numpy(), living['y'].to_numpy(), cell_size=self.CONTACT_RADIUS)
+            other = grid.random_neighbor(np.arange(len(living)), self.CONTACT_RADIUS)
+            met = other >= 0
+            contact_src, contact_dst = living_h[other[met]], living_h[met]
+
+        teachers = np.concatenate([h_src, v_src, contact_src])
+        learners = np.concatenate([h_dst, v_dst, contact_dst])
+        chance = np.concatenate([np.full(len(h_src), self.HORIZONTAL_CHANCE),
+                                 np.full(len(v_src), self.VERTICAL_CHANCE),
+                                 np.full(len(contact_src), self.CONTACT_CHANCE)])
 
-    def _learn_skill(self, state, agent_id, skill, amount):
-        df = state.skills
-        mask = (df['agent_id'] == agent_id) & (df['skill'] == skill)
-        
-        if mask.any():
-            # Improve
-            # Logic: Diminishing returns?
-            current = df.loc[mask, 'level'].values[0]
-            new_level = min(1.0, current + (amount * 0.1))
-            idx = df[mask].index[0]
-            state.skills.at[idx, 'level'] = new_level
-        else:
-            # Learn New
-            new_row = {'agent_id': agent_id, 'skill': skill, 'level': amount}
-            state.skills = pd.concat([state.skills, pd.DataFrame([new_row])], ignore_index=True)
+        # Only the living teach and learn (the dead linger until archived)
+        both = alive[teachers] & alive[learners]
+        store.teach(teachers[both], learners[both], chance[both])
@@ -39,8 +39,7 @@ class PoliticalSystem(System):
         
         if living.empty: return
         
-        # Criteria: Oldest (Wisdom) + Respected (if Social System existed fully)
-        # For now: Weighted random by Age + High Conscientiousness
+        # Criteria: Oldest (Wisdom) + High Conscientiousness + Respected (Reputation)
         
         candidates = living[living['age'] > 30]
         if candidates.empty:
@@ -52,6 +51,10 @@ class PoliticalSystem(System):
         if 'trait_conscientiousness' in candidates.columns:
             scores *= (0.5 + candidates['trait_conscientiousness'])
             
+        # Reputation: -100 (Loathed) -> x0, Neutral -> x1, +100 (Beloved) -> x2
+        rep, _ = state.opinions.reputation(state.handles.lookup(candidates['id'], create=False))
+        scores *= (1.0 + rep / 100.0)
+            
         winner_idx = scores.idxmax()
         winner = df.loc[winner_idx]
         
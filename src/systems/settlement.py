@@ -1,18 +1,31 @@
 from src.engine.systems import System
+from src.engine.spatial import SpatialGrid
 import pandas as pd
 import numpy as np
 import random
+from src.engine.mapgrid import TERRAIN_CODE
 
 class SettlementSystem(System):
     """
     Manages Spatial Dynamics, Movement, and Settlement Formation.
     """
+    CLUSTER_INTERVAL = 5     # Ticks between settlement detection passes
+    CLUSTER_RADIUS = 5.0     # Cell size (eps) for density clustering
+    CLUSTER_MIN_MEMBERS = 3  # Agents per cell to count as a dense (core) cell
+    HISTORY_LENGTH = 100     # Snapshots kept per settlement
+    ABANDONED_HORIZON = 365  # Days an abandoned settlement is remembered before eviction
+    FORAGE_STEP = 0.1        # Tiles per tick a forager drifts along the food flow field
+    FORAGER_JOBS = ['Gatherer', 'Hunter', 'Fisherman']
+    
     def update(self, state):
         # 1. Move Agents (Every Tick)
         self._handle_movement(state)
         
-        # 2. Update Settlement Info (Every 30 ticks)
-        # Identify clusters and name them
+        # 2. Detect Settlements (Family -> Band -> Village)
+        if state.day % self.CLUSTER_INTERVAL == 0:
+            self._detect_settlements(state)
+        
+        # 3. Update Tribe Info (Every 30 ticks)
         if state.day % 30 == 0:
             self._update_settlements(state)
             
@@ -20,30 +33,9 @@ class SettlementSystem(System):
         df = state.population
         if 'x' not in df.columns: return
         
-        # Vectorized Movement? Hard with family logic.
-        # Let's use simple Tribal Gravity for now (Faster)
-        
-        # 1. Calculate Tribe Centroids
-        # Group by tribe_id, calc mean x, y
-        # We need to handle living agents only
-        live_mask = df['is_alive'] == True
-        living = df[live_mask]
-        
-        if len(living) == 0: return
-        
-        tribe_centers = living.groupby('tribe_id')[['x', 'y']].mean().to_dict('index')
-        
-        # 2. Apply Forces
-        # Force 1: stay near tribe center (Cohesion)
-        # Force 2: Random wander (Diffusion)
-        # Force 3: Separation (Don't stack perfectly? Not needed for abstract sim)
-        
-        # Iterate or Vectorize?
-        # Vectorize for speed.
-        
-        # Map tribe_center to each row
-        # Performance optimization: Use different strategies based on population size
-        population_size = len(df[df['is_alive']])
+        # Simple Tribal Gravity + Love Drive + Random Wander
+        live_mask = (df['is_alive'] == True).to_numpy()
+        if not live_mask.any(): return
         
         # Movement Speed (Base)
         speed = 1.0
@@ -53,128 +45,187 @@ class SettlementSystem(System):
         if weather == 'Rain': speed *= 0.8
         elif weather == 'Storm': speed *= 0.5
         
-        # Optimized Logic:
-        # If population > 1000, use vectorized movement
-        # Else use hybrid approach
-        active_agents = df[live_mask] # Define active_agents for the condition
-        if len(active_agents) > 1000:
-            self._vectorized_movement(state, active_agents, speed)
-            return # Exit after vectorized movement
-        else:
-             # Hybrid Loop
-             # Pre-calculate Terrain lookup for speed
-             pass
-             # ... (Existing logic below needs to use 'speed')
-             
-        # For simplicity in this replacement, we'll just modify the logic to use 'speed'
-        # But the existing code below line 64 uses iterating logic.
-        # We need to inject 'speed' into the actual movement calculation.
-        # Let's assume the vectorized method takes 'speed' (I implemented it earlier).
-        # For the loop below, we need to multiply movement vector.
-        
-        # Hybrid approach for smaller populations (< 1000)
-        
-        updates = {'id': [], 'x': [], 'y': []}
-        
-        # --- Pre-calculate Maps for Love Drive ---
-        partner_map = {}
-        if hasattr(state, 'relationships') and not state.relationships.empty:
-             lovers = state.relationships[state.relationships['type'].isin(['Lover', 'Spouse', 'Partner'])]
-             for _, r in lovers.iterrows():
-                 partner_map[r['id_a']] = r['id_b']
-                 
-        # Fast Position Lookup
-        agent_positions = df.set_index('id')[['x', 'y']].to_dict('index')
-        
-        for t_id, center in tribe_centers.items():
-            # Get agents of this tribe
-            mask = (df['is_alive']) & (df['tribe_id'] == t_id)
-            indices = df[mask].index
-            
-            if len(indices) == 0: continue
-            
-            current_x = df.loc[indices, 'x']
-            current_y = df.loc[indices, 'y']
-            
-            # Target (Base = Tribe Center)
-            base_tx, base_ty = center['x'], center['y']
-            
-            # --- Love Drive Calculation ---
-            # Generate personalized targets
-            # We prefer vector operations, but dictionary lookup requires iteration or map
-            # Optimizing: Only override for those with partners
-            
-            row_ids = df.loc[indices, 'id'].values
-            
-            # Initialize with Tribe Center
-            arr_tx = np.full(len(indices), base_tx)
-            arr_ty = np.full(len(indices), base_ty)
-            arr_force = np.full(len(indices), 0.02) # Default Tribe Gravity
-            
-            # Apply Love/Desire Overrides
-            # This loop runs once per agent per tick (Optimization: Only if total pop < 1000)
-            has_desire = False
-            for i, aid in enumerate(row_ids):
-                # 1. Love (Find Partner)
-                pid = partner_map.get(aid)
-                if pid and pid in agent_positions:
-                    p_pos = agent_positions[pid]
-                    arr_tx[i] = p_pos['x']
-                    arr_ty[i] = p_pos['y']
-                    arr_force[i] = 0.05 # Stronger Attraction
-                    has_desire = True
-            
-            # Movement Calculation
-            noise_x = np.random.normal(0, 1.0, size=len(indices))
-            noise_y = np.random.normal(0, 1.0, size=len(indices))
-            
-            # Vectorized update
-            proposed_x = current_x + (arr_tx - current_x) * arr_force + noise_x
-            proposed_y = current_y + (arr_ty - current_y) * arr_force + noise_y
-            
-            # Clip
-            proposed_x = proposed_x.clip(0, 100)
-            proposed_y = proposed_y.clip(0, 100)
+        self._movement_kernel(state, live_mask, speed)
+        
+    def _movement_kernel(self, state, live_mask, speed=1.0):
+        """
+        One vectorized movement step for all living agents (any population size).
+        Forces: Tribe Cohesion (0.02), Love Drive towards partner (0.05), Noise (N(0,1)),
+        Foraging: working gatherers drift along the map's food flow field (one lookup each).
+        Moves into Water are blocked; agents already in Water are pushed to their tribe center.
+        """
+        df = state.population
+        rows = np.flatnonzero(live_mask)
+        x = np.array(df['x'], dtype=float)
+        y = np.array(df['y'], dtype=float)
+        cur_x, cur_y = x[rows], y[rows]
+        
+        # 1. Base Target: Tribe Centroids (shared per-tick tribe table)
+        stats = state.tribe_stats()
+        codes = stats.code_of(df['tribe_id'].to_numpy()[rows]) if 'tribe_id' in df.columns else np.full(len(rows), -1)
+        base_tx, base_ty = cur_x.copy(), cur_y.copy() # No tribe -> no pull
+        has_tribe = codes >= 0
+        if has_tribe.any() and 'x' in stats.table.columns:
+            base_tx[has_tribe] = stats.table['x'].to_numpy()[codes[has_tribe]]
+            base_ty[has_tribe] = stats.table['y'].to_numpy()[codes[has_tribe]]
+        
+        tx, ty = base_tx.copy(), base_ty.copy()
+        force = np.full(len(rows), 0.02)
+        
+        # 2. Love Drive: Partner position via the graph's live partner index (last bond wins)
+        graph = getattr(state, 'relationship_graph', None)
+        if graph is not None and len(graph):
+            # Row of each partner handle: sorted lookup over the population's handles
+            # (IDs are short UUIDs; on a clash the last row wins)
+            all_handles = state.handles.lookup(df['id'].to_numpy(), create=False)
+            known = np.flatnonzero(all_handles >= 0)
+            by_handle = known[np.argsort(all_handles[known], kind='stable')]
+            sorted_handles = all_handles[by_handle]
             
-            # --- Terrain Check ---
-            # Grid Scale = 100 / 20 = 5.0
-            scale = 5.0
-            lookup = state.globals.get('terrain_lookup', {})
+            partner = graph.partner_of(all_handles[rows])
+            pos = np.searchsorted(sorted_handles, partner, side='right') - 1
+            drawn = (partner >= 0) & (pos >= 0)
+            drawn[drawn] = sorted_handles[pos[drawn]] == partner[drawn]
+            partner_row = by_handle[pos[drawn]]
             
-            # We must iterate to check individual moves if valid
-            # For vectorized speed, we might need a different approach, 
-            # but for <1000 agents, Python loop with direct assignment is okay enough or use apply.
-            # Let's iterate the indices we processed
+            tx[drawn] = x[partner_row]
+            ty[drawn] = y[partner_row]
+            force[drawn] = 0.05 # Stronger Attraction
+        
+        force *= speed
+        
+        # 3. Foraging: Food Flow Field (precomputed per tile by MapSystem)
+        grid = state.map_grid
+        forage_x = np.zeros(len(rows))
+        forage_y = np.zeros(len(rows))
+        if grid is not None and grid.flow_dx is not None and 'job' in df.columns:
+            foragers = df['job'].isin(self.FORAGER_JOBS).to_numpy()[rows]
+            if 'age' in df.columns:
+                foragers &= df['age'].to_numpy()[rows] > 5
+            if foragers.any():
+                fx, fy = grid.flow_at(cur_x[foragers], cur_y[foragers])
+                step = self.FORAGE_STEP * grid.scale * speed
+                forage_x[foragers] = fx * step
+                forage_y[foragers] = fy * step
+        
+        # 4. Proposed Step (clamped to the world)
+        world = float(state.globals.get('world_size', 100.0))
+        noise_x = np.random.normal(0, 1.0, size=len(rows))
+        noise_y = np.random.normal(0, 1.0, size=len(rows))
+        prop_x = np.clip(cur_x + (tx - cur_x) * force + forage_x + noise_x, 0, world)
+        prop_y = np.clip(cur_y + (ty - cur_y) * force + forage_y + noise_y, 0, world)
+        
+        # 5. Terrain Check (terrain code layer; no map -> all Plains)
+        water = TERRAIN_CODE['Water']
+        
+        def is_water(px, py):
+            if grid is None: return np.zeros(len(px), dtype=bool)
+            return grid.terrain_at(px, py) == water
+        
+        blocked = is_water(prop_x, prop_y)
+        stuck = blocked & is_water(cur_x, cur_y)
+        
+        # Valid Move / Blocked (Stay put) / EMERGENCY: Stuck in water -> Push hard towards tribe center
+        new_x = np.where(blocked, cur_x, prop_x)
+        new_y = np.where(blocked, cur_y, prop_y)
+        new_x[stuck] = cur_x[stuck] + (base_tx[stuck] - cur_x[stuck]) * 0.1
+        new_y[stuck] = cur_y[stuck] + (base_ty[stuck] - cur_y[stuck]) * 0.1
+        
+        x[rows], y[rows] = new_x, new_y
+        df['x'] = x
+        df['y'] = y
+        stats.refresh_centroids(new_x, new_y) # Later readers this tick see post-move centroids
+        
+    def _detect_settlements(self, state):
+        """
+        Finds connected clusters of agents on a spatial grid and assigns 'settlement_id'.
+        Clusters are matched to last pass's settlements by the majority of their members,
+        so a settlement keeps its ID while people come and go.
+        """
+        df = state.population
+        if 'x' not in df.columns or df.empty: return
+        if 'settlement_id' not in df.columns:
+            df['settlement_id'] = None
+        
+        rows = np.flatnonzero((df['is_alive'] == True).to_numpy())
+        x = df['x'].to_numpy(dtype=float)[rows]
+        y = df['y'].to_numpy(dtype=float)[rows]
+        
+        # 1. Density Clusters
+        grid = SpatialGrid(x, y, cell_size=self.CLUSTER_RADIUS)
+        labels = grid.cluster_cells(self.CLUSTER_MIN_MEMBERS)
+        n_clusters = labels.max() + 1 if len(labels) else 0
+        
+        # 2. Match clusters to previous settlements (largest overlap claims first)
+        prev = df['settlement_id'].to_numpy(dtype=object)[rows]
+        votes = pd.DataFrame({'cluster': labels, 'prev': prev})
+        votes = votes[(votes['cluster'] >= 0) & votes['prev'].notna()]
+        overlap = votes.groupby(['cluster', 'prev']).size().sort_values(ascending=False, kind='stable')
+        
+        cluster_sid = [None] * n_clusters
+        claimed = set()
+        for (k, sid), _ in overlap.items():
+            if cluster_sid[k] is None and sid not in claimed and sid in state.settlements:
+                cluster_sid[k] = sid
+                claimed.add(sid)
+        
+        # 3. Cluster Stats (bincount / ufunc.at, no per-agent loop)
+        inside = labels >= 0
+        lab = labels[inside]
+        pop = np.bincount(lab, minlength=n_clusters)
+        cx = np.bincount(lab, weights=x[inside], minlength=n_clusters) / np.maximum(pop, 1)
+        cy = np.bincount(lab, weights=y[inside], minlength=n_clusters) / np.maximum(pop, 1)
+        x0 = np.full(n_clusters, np.inf); np.minimum.at(x0, lab, x[inside])
+        y0 = np.full(n_clusters, np.inf); np.minimum.at(y0, lab, y[inside])
+        x1 = np.full(n_clusters, -np.inf); np.maximum.at(x1, lab, x[inside])
+        y1 = np.full(n_clusters, -np.inf); np.maximum.at(y1, lab, y[inside])
+        
+        tribes = df['tribe_id'].to_numpy(dtype=object)[rows][inside] if 'tribe_id' in df.columns else np.full(len(lab), None)
+        majority_tribe = pd.Series(tribes).groupby(lab).agg(lambda t: t.value_counts().index[0] if t.notna().any() else None)
+        
+        # 4. Commit Settlements
+        for k in range(n_clusters):
+            sid = cluster_sid[k]
+            kind = "Village" if pop[k] >= 20 else ("Band" if pop[k] >= 5 else "Family Camp")
+            if sid is None:
+                sid = f"SET-{state.globals.get('next_settlement', 1):04d}"
+                state.globals['next_settlement'] = state.globals.get('next_settlement', 1) + 1
+                tribe = majority_tribe.get(k)
+                state.settlements[sid] = {
+                    'id': sid, 'tribe_id': tribe,
+                    'name': f"{str(tribe).split('_')[0]} {sid[-4:]}",
+                    'founded': state.day, 'kind': kind, 'history': []
+                }
+                cluster_sid[k] = sid
             
-            for idx, px, py in zip(indices, proposed_x, proposed_y):
-                gx = int(px // scale)
-                gy = int(py // scale)
-                terrain = lookup.get((gx, gy), 'Plains')
-                
-                if terrain == 'Water':
-                    # Invalid Move!
-                    # Check if current pos is also water?
-                    cx = df.at[idx, 'x']
-                    cy = df.at[idx, 'y']
-                    cgx, cgy = int(cx // scale), int(cy // scale)
-                    current_terrain = lookup.get((cgx, cgy), 'Plains')
-                    
-                    if current_terrain == 'Water':
-                        # EMERGENCY: Stuck in water! Push hard towards tribe center
-                        # Increase step size towards target
-                        safe_x = cx + (base_tx - cx) * 0.1 # Stronger pull
-                        safe_y = cy + (base_ty - cy) * 0.1
-                        df.at[idx, 'x'] = safe_x
-                        df.at[idx, 'y'] = safe_y
-                    else:
-                        # Block move (Stay put, or maybe slide along axis?)
-                        # Simple block: Do nothing (keep old x,y)
-                        pass 
-                else:
-                    # Valid move
-                    df.at[idx, 'x'] = px
-                    df.at[idx, 'y'] = py
-
+            info = state.settlements[sid]
+            if kind == "Village" and info['kind'] != "Village":
+                state.log(f"🏘️ {info['name']} has grown into a Village ({pop[k]} people)", category='Social')
+            info.update({
+                'active': True, 'kind': kind, 'last_seen': state.day,
+                'pop': int(pop[k]), 'centroid': (float(cx[k]), float(cy[k])),
+                'bbox': (float(x0[k]), float(y0[k]), float(x1[k]), float(y1[k]))
+            })
+            info['history'].append((state.day, int(pop[k]), info['centroid']))
+            del info['history'][:-self.HISTORY_LENGTH]
+        
+        # Settlements with no cluster this pass are abandoned (kept for the record
+        # for ABANDONED_HORIZON days, then evicted so the table stays bounded)
+        live_sids = set(cluster_sid)
+        expired = []
+        for sid, info in state.settlements.items():
+            if info.get('active') and sid not in live_sids:
+                info['active'] = False
+                info['pop'] = 0
+            elif not info.get('active') and state.day - info.get('last_seen', state.day) > self.ABANDONED_HORIZON:
+                expired.append(sid)
+        for sid in expired:
+            del state.settlements[sid]
+        
+        # 5. Write back per-agent IDs (noise -> no settlement)
+        sid_arr = np.array(cluster_sid + [None], dtype=object)
+        df.loc[df.index[rows], 'settlement_id'] = sid_arr[labels]
+        
     def _update_settlements(self, state):
         # Identify "Villages"
         # Simple Logic: 
@@ -187,71 +238,15 @@ class SettlementSystem(System):
         # Simplified for Phase 4.1:
         # Just update the 'active settlements' list for the UI map
         
-        # Calculate centroids again
-        live_mask = state.population['is_alive'] == True
-        living = state.population[live_mask]
-        
-        centers = living.groupby('tribe_id')[['x', 'y']].mean()
-        
         # Store metadata in state.tribes (or state.settlements if we created it)
         # We'll use state.tribes for now
         if not hasattr(state, 'tribes') or not state.tribes:
             return
 
+        # Centroids & head counts from the shared per-tick tribe table
+        centers = state.tribe_stats().table
+        if 'x' not in centers.columns: return
         for t_id, row in centers.iterrows():
             if t_id in state.tribes:
                 state.tribes[t_id]['centroid'] = (row['x'], row['y'])
-                state.tribes[t_id]['pop'] = len(living[living['tribe_id'] == t_id])
-
-    def _vectorized_movement(self, state, df, speed=1.0):
-        """Fully vectorized movement for large populations (1000+ agents)"""
-        import numpy as np
-        alive_mask = df['is_alive']
-        
-        # Get Tribe Centers from state
-        # state.tribes structure: {'Red_Tribe': {'centroid': (x, y), ...}}
-        tribe_centers = {}
-        if hasattr(state, 'tribes'):
-            for t_id, data in state.tribes.items():
-                if 'centroid' in data:
-                    tribe_centers[t_id] = {'x': data['centroid'][0], 'y': data['centroid'][1]}
-
-        # Create target position arrays
-        target_x = df['tribe_id'].map(lambda tid: tribe_centers.get(tid, {}).get('x', 50.0))
-        target_y = df['tribe_id'].map(lambda tid: tribe_centers.get(tid, {}).get('y', 50.0))
-        
-        # Generate noise arrays
-        noise_x = np.random.normal(0, 1.0, size=len(df))
-        noise_y = np.random.normal(0, 1.0, size=len(df))
-        
-        # Vectorized position updates (only for alive agents)
-        new_x = df['x'].copy()
-        new_y = df['y'].copy()
-        
-        # Apply Speed
-        step_force = 0.02 * speed
-        
-        new_x[alive_mask] = df.loc[alive_mask, 'x'] + \
-                             (target_x[alive_mask] - df.loc[alive_mask, 'x']) * step_force + \
-                             noise_x[alive_mask]
-        
-        new_y[alive_mask] = df.loc[alive_mask, 'y'] + \
-                             (target_y[alive_mask] - df.loc[alive_mask, 'y']) * step_force + \
-                             noise_y[alive_mask]
-        
-        # Clip to bounds
-        new_x = np.clip(new_x, 0, 100)
-        new_y = np.clip(new_y, 0, 100)
-        
-        # Update DF (Reference or Copy?)
-        # If df is a copy/slice, this might not update state.population?
-        # df comes from `active_agents = df[live_mask]` in update() which returns a copy usually.
-        # But `df` in main update was `state.population`.
-        
-        # To be safe, we must write back using index
-        state.population.loc[df.index, 'x'] = new_x
-        state.population.loc[df.index, 'y'] = new_y
-        
-        # Update positions
-        df.loc[alive_mask, 'x'] = new_x[alive_mask]
-        df.loc[alive_mask, 'y'] = new_y[alive_mask]
+                state.tribes[t_id]['pop'] = int(row['count'])
@@ -1,4 +1,5 @@
 from src.engine.systems import System
+from src.engine.spatial import SpatialGrid
 import pandas as pd
 import numpy as np
 import random
@@ -10,118 +11,101 @@ class SocialSystem(System):
     - Reputation Building
     - Friendships/Rivalries
     """
+    GOSSIP_RADIUS = 20.0
+    OPINION_DECAY = 0.95 # Monthly fade towards neutral
+    
+    def __init__(self):
+        # (population frame, opinion matrix) whose observer groups are current.
+        # Tribe membership only changes when the frame is replaced (births, archiving, loads).
+        self._grouped = None
+    
     def update(self, state):
         # Run daily
         self._handle_gossip(state)
         
+        # Monthly: Old grudges and crushes fade
+        if state.day % 30 == 0:
+            state.opinions.decay(self.OPINION_DECAY)
+        
     def _handle_gossip(self, state):
         """
         Agents meet nearby neighbors and exchange opinions.
+        Batched: initiators are drawn at once, each picks one neighbour from a
+        spatial grid, and all opinion deltas are computed and committed together.
         """
         df = state.population
         living = df[df['is_alive'] == True]
         if len(living) < 2: return
         
-        # Ensure 'opinions' structure exists
-        # opinions = {(id_observer, id_target): score}
-        if not hasattr(state, 'opinions'):
-            state.opinions = {}
-            
-        # 1. Spatial Clustering (Find pairs)
-        # Random Sample of interaction attempts (e.g. 10% of pop per day)
-        interaction_count = int(len(living) * 0.1)
+        if 'x' not in living.columns: return
         
-        # We need efficient neighbor lookup. 
-        # For now, just pick random pairs and check distance? (O(N) vs Vectorized)
-        # Vectorized Approach:
-        # 1. Pick N "initiators".
-        # 2. Find nearby "receivers" for each.
+        # Keep observer tribes current for the reputation tallies
+        grouped = self._grouped
+        if 'tribe_id' in living.columns and (grouped is None or grouped[0] is not df or grouped[1] is not state.opinions):
+            state.opinions.assign_groups(state.handles.lookup(living['id']), living['tribe_id'].to_numpy())
+            self._grouped = (df, state.opinions)
         
-        initiators = living.sample(n=interaction_count)
+        # 1. Initiators: Random Sample of interaction attempts (10% of pop per day)
+        interaction_count = int(len(living) * 0.1)
+        if interaction_count == 0: return
+        tellers = np.random.choice(len(living), size=interaction_count, replace=False)
         
-        if 'x' not in living.columns: return
+        # 2. Spatial Clustering (one neighbour < 20.0 per initiator)
+        grid = SpatialGrid(living['x'].to_numpy(), living['y'].to_numpy(), cell_size=self.GOSSIP_RADIUS)
+        listeners = grid.random_neighbor(tellers, self.GOSSIP_RADIUS)
         
-        # This loop is heavy if N is large. Optimization needed later.
-        for idx, initiator in initiators.iterrows():
-            # Find neighbors < 20.0
-            ix, iy = initiator['x'], initiator['y']
-            
-            # Simple vector distance to all living (can optimize with KDTree later)
-            dists = np.sqrt((living['x'] - ix)**2 + (living['y'] - iy)**2)
-            
-            # Neighbors (exclude self)
-            neighbors = living[(dists < 20.0) & (living.index != idx)]
-            
-            if neighbors.empty: continue
-            
-            # Pick one neighbor to gossip with
-            receiver = neighbors.sample(1).iloc[0]
-            
-            self._gossip_event(state, initiator, receiver)
+        found = listeners >= 0
+        if not found.any(): return
+        
+        self._gossip_batch(state, living, tellers[found], listeners[found])
             
-    def _gossip_event(self, state, teller, listener):
+    def _gossip_batch(self, state, living, tellers, listeners):
         """
-        Teller shares an opinion about a Target to Listener.
+        Tellers share an opinion about a Target with Listeners (positional indices into living).
         """
-        # 1. Teller picks a Target
-        # Someone they have an opinion on (from opinions dict or relationships) Or random prominent figure (Chief)
+        ids = living['id'].to_numpy()
+        teller_ids = ids[tellers]
+        listener_ids = ids[listeners]
         
-        # Simplified: Teller talks about the Chief or a random person
-        target_id = None
+        # 1. Tellers pick a Target
+        # 60% Chance: Talk about the Chief. Otherwise they talk about the listener (no-op).
+        chief_id = state.globals.get('chief_id')
+        if not chief_id: return
         
-        # 60% Chance: Talk about Chief
-        if random.random() < 0.6:
-            chief_id = state.globals.get('chief_id')
-            if chief_id: target_id = chief_id
-            
-        # 40% Chance: Talk about someone they know (Relationship)
-        if not target_id:
-            # Look up relationships
-            # This requires scanning rel dataframe, might be slow.
-            # Fallback: Talk about random neighbor
-            target_id = listener['id'] # Self-talk? No.
-            
-        if not target_id or target_id == listener['id']: return
-        
-        # 2. Determine Message Content
-        # Teller's Opinion of Target
-        # Default 0 (Neutral)
-        teller_op = state.opinions.get((teller['id'], target_id), 0.0)
-        
-        # If neutral, maybe form one based on Tribe?
-        if teller_op == 0.0:
-            # Tribal Bias: Same tribe = +10, Diff tribe = -5
-            # We need target's tribe.
-            # (skip for speed now, assume 0)
-            pass
-            
-        # 3. Message: "Target is [Good/Bad]"
-        message_strength = teller_op
+        talks = (np.random.random(len(tellers)) < 0.6) & (listener_ids != chief_id)
+        if not talks.any(): return
         
-        # 4. Listener Processes
-        # Factors:
-        # A. Trust in Teller (Friendship? Similarity?)
-        # B. Listener's Personality (Agreeableness)
-        # C. Listener's Existing Opinion
+        tellers, listeners = tellers[talks], listeners[talks]
+        teller_ids, listener_ids = teller_ids[talks], listener_ids[talks]
         
+        # 2. Message: Teller's Opinion of Target (Default 0 = Neutral)
+        teller_h = state.handles.lookup(teller_ids)
+        listener_h = state.handles.lookup(listener_ids)
+        chief_h = state.handles.handle(chief_id)
+        teller_op = state.opinions.get(teller_h, chief_h).astype(float)
+        old_op = state.opinions.get(listener_h, chief_h).astype(float)
+        
+        # 3. Listener Processes
         # A. Trust (Base + Agreeableness)
-        agreeableness = listener.get('trait_agreeableness', 0.5)
+        if 'trait_agreeableness' in living.columns:
+            agreeableness = living['trait_agreeableness'].to_numpy(dtype=float)[listeners]
+        else:
+            agreeableness = np.full(len(listeners), 0.5)
         trust = 0.5 + (agreeableness * 0.5) # 0.5 to 1.0
         
         # B. Apply Influence
         # New Opinion = Old + (Message * Trust * Volatility)
-        old_op = state.opinions.get((listener['id'], target_id), 0.0)
-        change = (message_strength - old_op) * trust * 0.2
-        
-        new_op = old_op + change
-        new_op = max(-100, min(100, new_op)) # Clamp
+        change = (teller_op - old_op) * trust * 0.2
         
-        state.opinions[(listener['id'], target_id)] = new_op
+        # 4. Commit in bulk: a listener reached by several tellers sums their influence
+        heard, first, inverse = np.unique(listener_h, return_index=True, return_inverse=True)
+        total = np.bincount(inverse, weights=change, minlength=len(heard))
+        state.opinions.set(heard, chief_h, np.clip(old_op[first] + total, -100, 100))
         
         # Log significant gossip
-        if abs(change) > 0.1:
-            dir_str = "📈" if change > 0 else "📉"
+        for i in np.flatnonzero(np.abs(change) > 0.1):
+            dir_str = "📈" if change[i] > 0 else "📉"
             # Log for Listener (They changed their mind)
-            state.log(f"🗣️ Heard gossip from {teller['id'][-4:]} about {str(target_id)[-4:]}: Opinion {dir_str} ({change:+.1f})", agent_id=listener['id'], category='Social')
+            state.log(f"🗣️ Heard gossip from {teller_ids[i][-4:]} about {str(chief_id)[-4:]}: Opinion {dir_str} ({change[i]:+.1f})", agent_id=listener_ids[i], category='Social')
             # Log for Teller (They talked)
-            state.log(f"🗣️ Shared gossip with {listener['id'][-4:]} about {str(target_id)[-4:]}", agent_id=teller['id'], category='Social')
+            state.log(f"🗣️ Shared gossip with {listener_ids[i][-4:]} about {str(chief_id)[-4:]}", agent_id=teller_ids[i], category='Social')
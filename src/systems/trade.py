@@ -1,129 +1,97 @@
 from src.engine.systems import System
+from src.engine.spatial import SpatialGrid
 import pandas as pd
 import numpy as np
-import random
 
 class TradeSystem(System):
     """
     Manages Barter Trade between Agents.
-    Agents identify NEEDS (e.g., Hunger -> Need Food) and SURPLUS (e.g., Inventory > 5 -> Surplus).
-    Trades happen between agents in the same cell.
+    Agents' NEEDS (e.g., Hunger -> Need Food) and SURPLUS (units they can spare) come
+    from the shared per-tick needs table (state.needs()).
+    Trades happen between agents in the same cell: every cell keeps one order book per
+    item (bids from agents who need it, asks from agents who hold it), and all books
+    are cleared together in one vectorized pass.
     """
+    TRADE_CELL = 10.0   # World units (old pairwise trade radius)
+    FOOD_NEED = 'Meat'  # Prefer high value
+    TOOL_NEED = 'Spear'
+
     def update(self, state):
         # 1. Identify Needs & Surplus
-        # Optimized: Only process agents with > 2 items (Potential sellers) or < 20 stamina (Potential buyers)
-        inv = state.inventory
-        if inv.empty: return
-        
-        # 2. Matchmakers
-        # Group by location (grid_x, grid_y)
-        # Vectorized matching is hard, so we iterate over active cells?
-        # Or simpler: Randomly pick N pairs to attempt trade
-        
-        # trade_attempts = 50
-        # For simplicity in V1: Random encounters
-        self._handle_random_trades(state)
-        
-    def _handle_random_trades(self, state):
-        # Pick random agents with inventory
-        if state.inventory.empty: return
-        
-        # Get active agents
-        live_mask = state.population['is_alive'] == True
-        population = state.population[live_mask]
-        if len(population) < 2: return
-        
-        # Attempt 20 trades per tick
-        for _ in range(20):
-             # Pick 2 random agents
-             buyer = population.sample(1).iloc[0]
-             seller = population.sample(1).iloc[0]
-             
-             if buyer['id'] == seller['id']: continue
-             
-             # Spatial Check (dist < 10)
-             dist = np.sqrt((buyer['x'] - seller['x'])**2 + (buyer['y'] - seller['y'])**2)
-             if dist > 10.0: continue
-             
-             self._attempt_trade(state, buyer, seller)
+        store = state.inventory_store
+        if store.is_empty(): return
+
+        # 2. Matchmakers: per-cell order books, cleared at once
+        self._clear_markets(state)
+
+    def _clear_markets(self, state):
+        store = state.inventory_store
+        food, tool = store.code(self.FOOD_NEED), store.code(self.TOOL_NEED)
+        needs = state.needs() # Shared Needs & Surplus (rebuilt only if inventories changed)
+        if len(needs) < 2: return
+        held, n = needs.held, len(needs)
+        n_items = held.shape[1]
+
+        # 1. Bids (one per agent): Food (if Stamina or Happiness < 50) > Tools
+        # Only agents who lack the item bid, and only if they can pay
+        need = np.where(needs.hungry, food, tool)
+        lacks = held[np.arange(n), need] < 1.0
+
+        # Payment (Barter): first other item the buyer can spare a whole unit of
+        can_pay = needs.surplus >= 1.0
+        can_pay[np.arange(n), need] = False
+        pays = can_pay.any(axis=1)
+        pay = np.argmax(can_pay, axis=1)
+        bidders = np.flatnonzero(lacks & pays)
+        if len(bidders) == 0: return
+
+        # 2. Asks: agents who can spare a whole unit of any item someone bids for
+        wanted = np.unique(need[bidders])
+        ask_agent, ask_col = np.nonzero(needs.surplus[:, wanted] >= 1.0)
+        ask_item = wanted[ask_col]
+        if len(ask_agent) == 0: return
+
+        # 3. Order Books: market = (cell, item); random priority inside each book
+        living = state.population.loc[needs.index]
+        grid = SpatialGrid(living['x'].to_numpy(), living['y'].to_numpy(), cell_size=self.TRADE_CELL)
+        cell = grid.cell_keys(grid.cx, grid.cy)
+        bid_market = cell[bidders] * n_items + need[bidders]
+        ask_market = cell[ask_agent] * n_items + ask_item
+        bid_order = np.lexsort((np.random.random(len(bidders)), bid_market))
+        ask_order = np.lexsort((np.random.random(len(ask_agent)), ask_market))
+        bidders, bid_market = bidders[bid_order], bid_market[bid_order]
+        ask_agent, ask_market = ask_agent[ask_order], ask_market[ask_order]
+
+        # k-th bid of a book meets the k-th ask of the same book
+        bid_rank = np.arange(len(bid_market)) - np.searchsorted(bid_market, bid_market)
+        ask_rank = np.arange(len(ask_market)) - np.searchsorted(ask_market, ask_market)
+        books = np.int64(max(len(ask_market), len(bid_market)))
+        bid_key = bid_market * books + bid_rank
+        ask_key = ask_market * books + ask_rank
+        pos = np.minimum(np.searchsorted(ask_key, bid_key), len(ask_key) - 1)
+        matched = ask_key[pos] == bid_key
+        buyers, sellers = bidders[matched], ask_agent[pos[matched]]
+        if len(buyers) == 0: return
+
+        # 4. Feasibility: an agent may sell one item and pay with the same kind
+        # Drop pairs where either side would give more units than it can spare
+        item_buy, item_pay = need[buyers], pay[buyers]
+        commit = np.concatenate([sellers * n_items + item_buy, buyers * n_items + item_pay])
+        units, inverse = np.unique(commit, return_inverse=True)
+        short = needs.surplus.ravel()[units] < np.bincount(inverse)
+        ok = ~(short[inverse[:len(buyers)]] | short[inverse[len(buyers):]])
+        buyers, sellers, item_buy, item_pay = buyers[ok], sellers[ok], item_buy[ok], item_pay[ok]
+        if len(buyers) == 0: return
+
+        # 5. Execute: Seller -> Buyer (Item), Buyer -> Seller (Payment)
+        handles = needs.handles
+        store.transfer(np.concatenate([handles[sellers], handles[buyers]]),
+                       np.concatenate([handles[buyers], handles[sellers]]),
+                       np.concatenate([item_buy, item_pay]))
+        needs.update_rows(np.concatenate([buyers, sellers]))
 
-    def _attempt_trade(self, state, buyer, seller):
-        # 1. Identify Buyer Need
-        # Priority: Food (if Stamina < 50) > Tools (if none)
-        needed_item = None
-        
-        # Check Food
-        if buyer['stamina'] < 50 or buyer['happiness'] < 50:
-            # Need Food
-            needed_item = 'Meat' # Prefer high value
-        else:
-            # Need Tool?
-            needed_item = 'Spear'
-            
-        # 2. Check Seller Surplus
-        # Does seller have it?
-        seller_inv = state.inventory[state.inventory['agent_id'] == seller['id']]
-        if seller_inv.empty: return
-        
-        has_item = seller_inv[seller_inv['item'] == needed_item]
-        if has_item.empty or has_item.iloc[0]['amount'] < 1.0: return
-        
-        # 3. Determine Payment (Barter)
-        # Buyer must give something of Value
-        buyer_inv = state.inventory[state.inventory['agent_id'] == buyer['id']]
-        if buyer_inv.empty: return
-        
-        # Simplistic: Give anything distinct
-        payment_item = None
-        for idx, row in buyer_inv.iterrows():
-            if row['item'] != needed_item and row['amount'] >= 1.0:
-                payment_item = row['item']
-                break
-        
-        if payment_item:
-            self._execute_trade(state, buyer['id'], seller['id'], needed_item, payment_item)
-             
-    def _execute_trade(self, state, buyer_id, seller_id, item_buy, item_pay):
-        # 1. Seller gives Item -> Buyer
-        # 2. Buyer gives Payment -> Seller
-        
-        # Use simple decrement/increment for now (assuming 1 unit trade)
-        # In reality need to handle indices.
-        
-        # Seller -> Buyer (Item)
-        seller_inv_idx = state.inventory[
-            (state.inventory['agent_id'] == seller_id) & (state.inventory['item'] == item_buy)
-        ].index[0]
-        
-        state.inventory.at[seller_inv_idx, 'amount'] -= 1.0
-        
-        # Add to Buyer
-        # Check if exists
-        buyer_has = state.inventory[
-            (state.inventory['agent_id'] == buyer_id) & (state.inventory['item'] == item_buy)
-        ]
-        if not buyer_has.empty:
-            state.inventory.at[buyer_has.index[0], 'amount'] += 1.0
-        else:
-            # New row
-            new_row = {'agent_id': buyer_id, 'item': item_buy, 'amount': 1.0, 'durability': 0, 'max_durability': 0, 'spoilage_rate': 0.1}
-            state.inventory = pd.concat([state.inventory, pd.DataFrame([new_row])], ignore_index=True)
-            
-        # Buyer -> Seller (Payment)
-        buyer_pay_idx = state.inventory[
-            (state.inventory['agent_id'] == buyer_id) & (state.inventory['item'] == item_pay)
-        ].index[0]
-        
-        state.inventory.at[buyer_pay_idx, 'amount'] -= 1.0
-        
-         # Add to Seller
-        seller_has = state.inventory[
-            (state.inventory['agent_id'] == seller_id) & (state.inventory['item'] == item_pay)
-        ]
-        if not seller_has.empty:
-            state.inventory.at[seller_has.index[0], 'amount'] += 1.0
-        else:
-            new_row = {'agent_id': seller_id, 'item': item_pay, 'amount': 1.0, 'durability': 0, 'max_durability': 0, 'spoilage_rate': 0.1}
-            state.inventory = pd.concat([state.inventory, pd.DataFrame([new_row])], ignore_index=True)
-            
-        state.log(f"🤝 Trade: {buyer_id[-4:]} bought {item_buy} from {seller_id[-4:]} for {item_pay}")
+        ids = needs.ids
+        for b, s, ib, ip in zip(ids[buyers][:3], ids[sellers][:3], item_buy[:3], item_pay[:3]):
+            state.log(f"🤝 Trade: {b[-4:]} bought {store.items[ib]} from {s[-4:]} for {store.items[ip]}")
+        if len(buyers) > 3:
+            state.log(f"🤝 Market: {len(buyers)} barters cleared in {len(np.unique(cell[buyers]))} cells", category='Economy')
@@ -7,6 +7,8 @@ class TribalSystem(System):
     Manages Tribe Metadata and Inter-Tribal Relations.
     Tribes: Red_Tribe, Blue_Tribe, Green_Tribe
     """
+    REPUTATION_WEIGHT = 0.2 # Reputation (-100..100) worth up to +/-20 Prestige
+    
     def update(self, state):
         # 1. Initialize Metadata if missing
         if not state.tribes:
@@ -20,7 +22,7 @@ class TribalSystem(System):
 
     def _assign_leaders(self, state):
         """
-        Selects a 'Headman' for each tribe based on Prestige.
+        Selects a 'Headman' for each tribe based on Prestige and Reputation.
         Also assigns Roles (Hunter/Gatherer) based on traits if not set.
         """
         # A. Assign Basic Roles based on Gender/Traits if currently generic
@@ -41,24 +43,24 @@ class TribalSystem(System):
         if not hasattr(state, 'tribes_leaders'):
             state.tribes_leaders = {}
             
+        # Calculate Prestige (if 0) for every living tribe member at once
+        # Prestige = Age + (Happiness * 0.1)
+        pop = state.population
+        stats = state.tribe_stats() # Members of each tribe (shared per-tick table)
+        in_tribe = live_mask & pop['tribe_id'].isin(list(state.tribes.keys()))
+        zero_pres = in_tribe & (pop['prestige'] == 0)
+        if zero_pres.any():
+            pop.loc[zero_pres, 'prestige'] = pop.loc[zero_pres, 'age'] + (pop.loc[zero_pres, 'happiness'] * 0.1)
+            
         for t_id in state.tribes.keys():
-            tribe_mask = live_mask & (state.population['tribe_id'] == t_id)
-            tribe_members = state.population[tribe_mask]
+            member_idx = stats.members(t_id)
             
-            if len(tribe_members) > 0:
-                # Calculate Prestige (if 0)
-                # Prestige = Age + (Happiness * 0.1)
-                # Vectorized calc for those with 0 prestige
-                zero_pres = tribe_members['prestige'] == 0
-                if zero_pres.any():
-                    # Need global index to update state.population
-                    idx_to_update = tribe_members[zero_pres].index
-                    state.population.loc[idx_to_update, 'prestige'] = \
-                        state.population.loc[idx_to_update, 'age'] + \
-                        (state.population.loc[idx_to_update, 'happiness'] * 0.1)
-
-                # Pick leader
-                leader_idx = state.population[tribe_mask]['prestige'].idxmax()
+            if len(member_idx) > 0:
+                # Pick leader: Prestige + Standing among own tribe (O(1) reputation lookup)
+                members = state.population.loc[member_idx]
+                rep, _ = state.opinions.reputation(state.handles.lookup(members['id'], create=False), group=t_id)
+                score = members['prestige'] + rep * self.REPUTATION_WEIGHT
+                leader_idx = score.idxmax()
                 leader_id = state.population.at[leader_idx, 'id']
                 
                 # Check if changed
@@ -83,7 +85,7 @@ class TribalSystem(System):
                     
                     # Apply Leadership Buff (example)
                     # Everyone in tribe gets +5 happiness
-                    state.population.loc[tribe_mask, 'happiness'] += 5.0
+                    state.population.loc[member_idx, 'happiness'] += 5.0
 
     def _init_tribes(self, state):
         state.tribes = {
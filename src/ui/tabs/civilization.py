@@ -34,10 +34,11 @@ def render_civilization(state, living_df):
         
         # Layer 1: Terrain (Background)
         terrain_chart = None
-        if hasattr(state, 'map_data') and state.map_data is not None:
+        if getattr(state, 'map_grid', None) is not None:
+            map_df = state.map_data # Built once per render (whole-world tile view)
             # Rect mark for grid (Explicit Tiling)
             # Use x, y, x2, y2 to define the box
-            terrain_chart = alt.Chart(state.map_data).mark_rect().encode(
+            terrain_chart = alt.Chart(map_df).mark_rect().encode(
                 x=alt.X('x', scale=alt.Scale(domain=[0, 100]), axis=None),
                 y=alt.Y('y', scale=alt.Scale(domain=[0, 100]), axis=None),
                 x2='x2',
@@ -70,6 +71,18 @@ def render_civilization(state, living_df):
     else:
         st.info("No spatial data initialized yet.")
 
+    # --- Settlements (Density Clusters) ---
+    settlements = getattr(state, 'settlements', {})
+    active = [s for s in settlements.values() if s.get('active')]
+    if active:
+        import pandas as pd
+        st.subheader("🏘️ Settlements")
+        set_df = pd.DataFrame([{
+            "Name": s['name'], "Kind": s['kind'], "Tribe": s['tribe_id'], "Population": s['pop'],
+            "Centroid": f"({s['centroid'][0]:.0f}, {s['centroid'][1]:.0f})", "Founded": f"Day {s['founded']}"
+        } for s in active]).sort_values("Population", ascending=False)
+        st.dataframe(set_df, use_container_width=True, hide_index=True)
+
     st.markdown("---")
     
     c1, c2 = st.columns(2)
@@ -55,6 +55,20 @@ def render_governance(state: WorldState):
         chief_id = tribe_data.get('chief_id')
         if chief_id:
             st.success(f"**Chief {chief_id}** is leading.")
+            
+            # Public Standing (Opinion Matrix)
+            chief_h = state.handles.handle(chief_id, create=False)
+            if chief_h >= 0 and state.opinions:
+                rep, count = state.opinions.reputation_of(chief_h, group=selected_tid)
+                emoji = "😍" if rep > 20 else ("😡" if rep < -20 else "😐")
+                st.metric("Reputation", f"{emoji} {rep:.1f}", help=f"Average opinion of {count} tribesfolk")
+                
+                targets, scores = state.opinions.top_opinions_of(chief_h, k=5)
+                if len(targets) > 0:
+                    st.markdown("**Chief's Strongest Opinions**")
+                    for tid, sc in zip(state.handles.ids_of(targets), scores):
+                        desc = "Favours" if sc > 0 else "Distrusts"
+                        st.caption(f"{desc} **{tid}** ({sc:+.0f})")
         else:
             st.error("No Leader! Anarchy prevails.")
  
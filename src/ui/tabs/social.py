@@ -93,9 +93,8 @@ def render_social(state, living_df):
     import pandas as pd # Ensure pandas is available
     
     if hasattr(state, 'opinions') and state.opinions:
-        # Convert to DF
-        op_list = [{"Observer": k[0], "Target": k[1], "Score": v} for k, v in state.opinions.items()]
-        op_df = pd.DataFrame(op_list)
+        # Convert to DF (resolve handles back to Agent IDs)
+        op_df = state.opinions.to_frame(state.handles)
         
         if not op_df.empty:
             c1, c2 = st.columns(2)
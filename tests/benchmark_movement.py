@@ -0,0 +1,45 @@
+import time
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add root to path
+sys.path.append(os.getcwd())
+
+from src.engine.core import WorldState
+from src.systems.map import MapSystem
+from src.systems.settlement import SettlementSystem
+from src.loaders import generate_initial_state
+
+def run_benchmark(pop_size=500, ticks=20):
+    print(f"\n--- Movement Benchmark: {pop_size} agents x {ticks} ticks ---")
+    
+    state = WorldState()
+    state.population = generate_initial_state(pop_size, pd.DataFrame()) # dummy traits
+    MapSystem()._generate_map(state)
+    
+    # Pair up 10% of agents so the Love Drive is exercised
+    ids = state.population['id'].to_numpy()
+    pairs = max(1, pop_size // 20)
+    state.relationships = pd.DataFrame({
+        "id_a": ids[:pairs], "id_b": ids[pairs:2 * pairs], "type": "Spouse",
+        "commitment": 1.0, "affection": 1.0, "start_day": 0
+    })
+    
+    settle = SettlementSystem()
+    settle._handle_movement(state) # Warm-up
+    
+    start_time = time.time()
+    for _ in range(ticks):
+        settle._handle_movement(state)
+    elapsed = time.time() - start_time
+    
+    ms = elapsed / ticks * 1000
+    print(f"Time per Tick: {ms:.2f} ms")
+    return ms
+
+if __name__ == "__main__":
+    run_benchmark(500)
+    run_benchmark(5000)
+    run_benchmark(50000)
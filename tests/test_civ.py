@@ -8,6 +8,7 @@ from src.systems.tribe import TribalSystem
 from src.systems.knowledge import KnowledgeSystem
 from src.loaders import load_traits, generate_initial_state
 import pandas as pd
+import numpy as np
 import time
 
 def run_civ_test():
@@ -57,5 +58,51 @@ def run_civ_test():
     else:
         print("FAIL: Evo Score is 0.")
 
+def test_skill_diffusion():
+    print("📚 Testing Skill Matrix & Diffusion...")
+    engine = SimulationEngine()
+    state = engine.state
+    state.population = generate_initial_state(4, pd.DataFrame())
+    ids = state.population['id'].to_numpy()
+    h = state.handles.lookup(ids)
+    store = state.skill_store
+    knowledge = KnowledgeSystem()
+
+    # 1. Learning rule: new skills start at the best lesson, known ones gain 10% per lesson
+    store.learn([h[0]], store.code('Pottery'), 0.6)
+    store.learn([h[1], h[1]], store.code('Pottery'), [0.2, 0.4])
+    assert np.isclose(store.level([h[0]], 'Pottery')[0], 0.6)
+    assert np.isclose(store.level([h[1]], 'Pottery')[0], 0.4 + 0.02)
+    store.learn([h[0]], store.code('Pottery'), 0.5)
+    assert np.isclose(store.level([h[0]], 'Pottery')[0], 0.65)
+
+    # 2. Teaching: spouse (horizontal) and parent -> child (vertical) edges, certain success
+    state.population['x'] = [0.0, 0.0, 500.0, 900.0] # 0 and 1 only meet each other
+    state.population['y'] = 0.0
+    state.relationship_graph.add(h[0], h[2], 'Spouse', mutual=True)
+    state.relationship_graph.add(h[0], h[3], 'Child')
+    knowledge.HORIZONTAL_CHANCE = knowledge.VERTICAL_CHANCE = 1.0
+    knowledge.CONTACT_CHANCE = 0.0
+    knowledge._handle_transmission(state)
+    assert np.isclose(store.level([h[2]], 'Pottery')[0], 0.325), "Spouse learns half the teacher's level"
+    assert np.isclose(store.level([h[3]], 'Pottery')[0], 0.325), "Child learns from parent"
+    assert np.isclose(store.level([h[1]], 'Pottery')[0], 0.42), "No contact, no lesson"
+
+    # 3. Neighbourhood contact: agent 1 meets agent 0 (and vice versa)
+    knowledge.HORIZONTAL_CHANCE = knowledge.VERTICAL_CHANCE = 0.0
+    knowledge.CONTACT_CHANCE = 1.0
+    knowledge._handle_transmission(state)
+    assert np.isclose(store.level([h[1]], 'Pottery')[0], 0.42 + 0.1 * 0.65 * 0.5)
+
+    # 4. DataFrame view round trip, and archived agents forget
+    frame = state.skills
+    assert len(frame) == 4 and set(frame['skill']) == {'Pottery'}
+    state.skills = frame
+    assert np.allclose(state.skill_store.level(h, 'Pottery'), store.level(h, 'Pottery'))
+    state.prune_archived([ids[3]])
+    assert state.skill_store.level([h[3]], 'Pottery')[0] == 0.0
+    print("✅ Skill Diffusion Test Passed!")
+
 if __name__ == "__main__":
     run_civ_test()
+    test_skill_diffusion()
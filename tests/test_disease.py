@@ -0,0 +1,118 @@
+import sys
+import os
+import pandas as pd
+sys.path.append(os.getcwd())
+
+from src.engine.core import WorldState
+from src.loaders import generate_initial_state
+from src.systems.disease import DiseaseSystem, DiseaseRegistry, Disease
+
+def _setup():
+    state = WorldState()
+    state.population = generate_initial_state(10, pd.DataFrame())
+    state.population['genetic_vulnerability'] = 0.0
+
+    disease_sys = DiseaseSystem()
+    disease_sys.update(state) # Creates infection/immunity tables
+    state.infections = state.infections.iloc[0:0]
+    state.immunities = state.immunities.iloc[0:0]
+    return state, disease_sys
+
+def test_progression_accumulates_and_recovers():
+    print("☣️ Testing Vectorized Disease Progression...")
+    state, disease_sys = _setup()
+
+    flu = Disease(id="FLU", name="Test Flu", transmission=0.0, lethality=0.0, duration=2,
+                  effects={'hp': -1.0, 'stamina': -3.0}, is_chronic=False, immunity_type='sterilizing')
+    pox = Disease(id="POX", name="Test Pox", transmission=0.0, lethality=0.0, duration=5,
+                  effects={'hp': -2.0}, is_chronic=True, immunity_type='waning')
+    disease_sys.registry.add(flu)
+    disease_sys.registry.add(pox)
+
+    pid_a = state.population.at[0, 'id']
+    pid_b = state.population.at[1, 'id']
+    state.population.at[1, 'genetic_vulnerability'] = 0.5 # 2x damage
+
+    state.infections = pd.DataFrame([
+        {"person_id": pid_a, "disease_id": "FLU", "progress": 0.0, "days_infected": 0, "active": True},
+        {"person_id": pid_a, "disease_id": "POX", "progress": 0.0, "days_infected": 4, "active": True},
+        {"person_id": pid_b, "disease_id": "FLU", "progress": 0.0, "days_infected": 0, "active": True},
+    ])
+
+    disease_sys._handle_progression(state)
+
+    # Agent A: FLU (-1) + POX (-2) in the same tick
+    assert state.population.at[0, 'hp'] == 97.0, "Effects across diseases should accumulate"
+    assert state.population.at[0, 'stamina'] == 97.0
+    # Agent B: FLU doubled by vulnerability
+    assert state.population.at[1, 'hp'] == 98.0
+    assert state.population.at[1, 'stamina'] == 94.0
+
+    # POX reached duration -> Dormant (chronic), with waning immunity
+    pox_row = state.infections[state.infections['disease_id'] == 'POX'].iloc[0]
+    assert not pox_row['active'] and pox_row['days_infected'] == 0, "Chronic disease should go dormant"
+    imm = state.immunities.set_index(['person_id', 'disease_id'])['immunity_level']
+    assert imm[(pid_a, 'POX')] == 0.8
+
+    # Second tick: FLU reaches duration -> removed (acute)
+    disease_sys._handle_progression(state)
+    assert (state.infections['disease_id'] == 'FLU').sum() == 0, "Acute disease should be cleared"
+    assert len(state.infections) == 1
+    imm = state.immunities.set_index(['person_id', 'disease_id'])['immunity_level']
+    assert imm[(pid_a, 'FLU')] == 1.0 and imm[(pid_b, 'FLU')] == 1.0
+
+    # Strains missing from the registry borrow no other strain's parameters
+    pid_c = state.population.at[2, 'id']
+    state.infections = pd.DataFrame([
+        {"person_id": pid_c, "disease_id": "GHOST", "progress": 0.0, "days_infected": 9, "active": True},
+    ])
+    disease_sys._handle_progression(state)
+    assert state.population.at[2, 'hp'] == 100.0 and state.population.at[2, 'stamina'] == 100.0
+    assert len(state.infections) == 1, "Unknown strains never recover with POX's duration"
+    print("✅ Disease Progression Test Passed!")
+
+def test_registry_retires_extinct_strains():
+    print("🧫 Testing Disease Registry Retirement...")
+    state, disease_sys = _setup()
+    disease_sys.registry = DiseaseRegistry(capacity=2)
+
+    strains = [disease_sys._generate_procedural_disease() for _ in range(4)]
+    for d in strains:
+        disease_sys.registry.add(d)
+    assert len(disease_sys.registry) == 4, "Registry should grow past its initial capacity"
+
+    # Strain 0: active carrier. Strain 1: immune survivor. Strain 2: waned but sensitized.
+    # Strain 3: only remembered by a dead host.
+    pid, dead = state.population.at[0, 'id'], state.population.at[1, 'id']
+    state.population.loc[1, 'is_alive'] = False
+    state.infections = pd.DataFrame([
+        {"person_id": pid, "disease_id": strains[0].id, "progress": 0.0, "days_infected": 0, "active": True}
+    ])
+    state.immunities = pd.DataFrame([
+        {"person_id": pid, "disease_id": strains[1].id, "immunity_level": 0.5, "exposure_count": 1},
+        {"person_id": pid, "disease_id": strains[2].id, "immunity_level": 0.0, "exposure_count": 1},
+        {"person_id": dead, "disease_id": strains[3].id, "immunity_level": 0.9, "exposure_count": 2}
+    ])
+
+    disease_sys._retire_extinct_strains(state)
+
+    assert strains[0].id in disease_sys.registry
+    assert strains[1].id in disease_sys.registry
+    assert strains[2].id in disease_sys.registry, "Exposure history keeps a strain in circulation"
+    assert strains[3].id not in disease_sys.registry, "Extinct strain should be retired"
+    assert len(state.immunities) == 2 and (state.immunities['person_id'] == pid).all()
+
+    # Infections of strains missing from the registry don't spread (and don't raise)
+    state.infections.loc[1] = {"person_id": pid, "disease_id": "GONE", "progress": 0.0, "days_infected": 0, "active": True}
+    disease_sys._handle_transmission(state)
+
+    # Retired slot is recycled
+    slot = disease_sys.registry.add(Disease(id="NEW", name="New", transmission=0.1, lethality=0.0, duration=3,
+                                            effects={}, is_chronic=False, immunity_type='waning'))
+    assert slot < 4
+    assert list(disease_sys.registry.slots_for([strains[0].id, "NEW", "GONE"])[[1, 2]]) == [slot, -1]
+    print("✅ Disease Registry Test Passed!")
+
+if __name__ == "__main__":
+    test_progression_accumulates_and_recovers()
+    test_registry_retires_extinct_strains()
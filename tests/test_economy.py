@@ -8,6 +8,7 @@ from src.systems.economy import EconomySystem
 from src.systems.map import MapSystem
 from src.loaders import generate_initial_state
 import pandas as pd
+import numpy as np
 
 def run_economy_test():
     print("Initializing Economy Test Engine...")
@@ -97,5 +98,244 @@ def run_economy_test():
         print("FAIL: No Spear crafted.")
         print(ag_inv)
 
+def test_segmented_consumption():
+    print("🍖 Testing Segmented Food Consumption...")
+    from src.engine.core import WorldState
+    import ast
+    state = WorldState()
+    state.population = generate_initial_state(4, pd.DataFrame())
+    state.population['stamina'] = 50.0
+    state.population['tribe_id'] = 'Red'
+    state.tribes = {'Red': {'policies': {'rationing_label': 'ChildFirst'}}}
+    a, b, c, d = state.population['id']
+
+    def row(agent, item, amount, spoilage):
+        return {"agent_id": agent, "item": item, "amount": amount, "durability": 0, "max_durability": 0, "spoilage_rate": spoilage}
+    state.inventory = pd.DataFrame([
+        row(a, 'Grain', 5.0, 0.01), row(a, 'Meat', 0.5, 0.1),  # Meat (spoils first) 1.5 cal + Grain 0.5 cal
+        row(b, 'Fruit', 0.5, 0.02),                            # 0.75 cal: hungry
+        row(c, 'Wood', 3.0, 0.0),                              # No food at all
+        row(d, 'Fish', 1.0, 0.05), row(d, 'Fish', 1.0, 0.05),  # Full after 0.8 fish
+    ])
+    EconomySystem()._handle_consumption(state, state.population)
+
+    inv = state.inventory.groupby(['agent_id', 'item'])['amount'].sum()
+    assert abs(inv[(a, 'Grain')] - 4.5) < 1e-9 and (a, 'Meat') not in inv.index
+    assert (b, 'Fruit') not in inv.index and inv[(c, 'Wood')] == 3.0
+    assert abs(inv[(d, 'Fish')] - 1.2) < 1e-9
+
+    stamina = state.population['stamina'].tolist()
+    assert stamina[0] == 60.0 and stamina[3] == 60.0, "Full meal: +10"
+    assert stamina[1] == 50.0 - (2.0 - 0.75) * 5.0, "Half-fed: -(need - eaten) * 5"
+    assert stamina[2] == 50.0 - 15.0 - 10.0, "Empty larder: -15 and -(need) * 5"
+
+    nuts = ast.literal_eval(state.population.at[0, 'nutrients'])
+    assert nuts == {'protein': 100, 'carbs': 100, 'vitamins': 95}, nuts
+    print("✅ Consumption Kernel Test Passed!")
+
+def test_inventory_store():
+    print("🎒 Testing Agent x Item Inventory Store...")
+    from src.engine.core import WorldState
+    state = WorldState()
+    state.population = generate_initial_state(3, pd.DataFrame())
+    a, b, c = state.population['id']
+    ha, hb, hc = state.handles.lookup([a, b, c])
+    inv_sys = InventorySystem()
+
+    # Repeated hauls stack into one cell; tools are separate instances
+    for _ in range(3):
+        inv_sys.add_item(state, a, 'Meat', 1.0, sp_rate=0.3)
+    inv_sys.add_item(state, a, 'Spear', 2, dur=40, max_dur=50)
+    inv_sys.add_item(state, b, 'Wood', 4.0)
+    store = state.inventory_store
+    assert store.amount([ha, hb, hc], 'Meat').tolist() == [3.0, 0.0, 0.0], "One array read per item"
+    assert store.tool_counts([ha, hb], 'Spear').tolist() == [2, 0]
+
+    view = state.inventory
+    assert len(view) == 4 and view.loc[view['item'] == 'Meat', 'amount'].item() == 3.0
+    assert (view.loc[view['item'] == 'Spear', 'durability'] == 40).all()
+
+    # Spoilage is per item; worn-out tools disappear
+    inv_sys.update(state)
+    assert abs(store.amount([ha], 'Meat')[0] - 2.7) < 1e-9 and store.amount([hb], 'Wood')[0] == 4.0
+    store.wear(store.first_tool([ha], 'Spear'), 40.0)
+    assert store.tool_counts([ha], 'Spear')[0] == 1
+
+    # The long view round-trips into an equivalent store
+    state.inventory = state.inventory
+    assert abs(state.inventory_store.amount([ha], 'Meat')[0] - 2.7) < 1e-9
+    assert state.inventory_store.tool_counts([ha], 'Spear')[0] == 1
+
+    # Archived agents' belongings are dropped
+    state.prune_archived([a])
+    assert state.inventory_store.amount([ha], 'Meat')[0] == 0.0 and state.inventory_store.n_tools == 0
+    assert set(state.inventory['agent_id']) == {b}
+
+    # Stack rows are reused, so the matrix doesn't grow with every agent ever born
+    store = state.inventory_store
+    for generation in range(200):
+        newcomer = state.handles.lookup([f"gen-{generation}"])
+        store.add(newcomer, 'Wood', 1.0)
+        store.prune(newcomer)
+    assert store.base.shape[0] == 64 and store.amount(newcomer, 'Wood')[0] == 0.0
+    assert store.amount([hb], 'Wood')[0] == 4.0 and store.total('Wood') == 4.0
+    print("✅ Inventory Store Test Passed!")
+
+def test_vectorized_crafting():
+    print("🔨 Testing Recipe-Table Crafting...")
+    from src.engine.core import WorldState
+    state = WorldState()
+    state.population = generate_initial_state(4, pd.DataFrame())
+    ids = state.population['id'].tolist()
+    h = state.handles.lookup(ids)
+    inv_sys = InventorySystem()
+    for agent, wood, stone in zip(ids, [5.0, 3.5, 1.0, 2.0], [2.0, 0.0, 1.0, 0.0]):
+        inv_sys.add_item(state, agent, 'Wood', wood)
+        inv_sys.add_item(state, agent, 'Stone', stone)
+
+    economy = EconomySystem()
+    economy._handle_crafting(state, state.population)
+    store = state.inventory_store
+    assert store.tool_counts(h, 'Spear').tolist() == [1, 0, 0, 0], "Spear has priority"
+    assert store.tool_counts(h, 'Basket').tolist() == [0, 1, 0, 0]
+    assert np.allclose(store.amount(h, 'Wood'), [3.0, 0.5, 1.0, 2.0])
+    assert np.allclose(store.amount(h, 'Stone'), [1.0, 0.0, 1.0, 0.0])
+
+    # A new recipe is a catalogue entry
+    from src.engine.items import ItemCatalogue
+    items = pd.read_csv('data/items.csv')
+    items.loc[len(items)] = {'item': 'Axe', 'category': 'Tool', 'calories': 0, 'protein': 0, 'carbs': 0,
+                             'vitamins': 0, 'spoilage': 0, 'durability': 40}
+    recipes = pd.DataFrame({'item': ['Spear', 'Basket', 'Axe'],
+                            'inputs': [{'Wood': 2, 'Stone': 1}, {'Wood': 3}, {'Wood': 1, 'Stone': 1}]})
+    state.catalogue = ItemCatalogue(items, recipes)
+    economy._handle_crafting(state, state.population)
+    assert store.tool_counts(h, 'Spear').tolist() == [2, 0, 0, 0]
+    assert store.tool_counts(h, 'Axe').tolist() == [0, 0, 1, 0]
+    assert (store.tool_durability[store.tool_item == store.code('Axe')] == 40).all()
+    print("✅ Crafting Test Passed!")
+
+def test_item_catalogue():
+    print("📜 Testing Item Catalogue...")
+    from src.loaders import load_item_catalogue
+    catalogue = load_item_catalogue('data/items.csv', 'data/recipes.csv')
+    assert catalogue.food_items == ['Meat', 'Fish', 'Fruit', 'Grain']
+    meat = catalogue.code('Meat')
+    assert catalogue.calories[meat] == 3.0 and catalogue.spoilage[meat] == 0.3
+    assert catalogue.nutrients[catalogue.code('Fish')].tolist() == [15, 0, 10]
+    spear = catalogue.code('Spear')
+    assert catalogue.recipe_item[0] == spear and catalogue.durability[spear] == 50
+    assert catalogue.recipe_cost[0, catalogue.code('Wood')] == 2 and catalogue.recipe_cost[0, catalogue.code('Stone')] == 1
+    assert catalogue.names_of(catalogue.recipe_inputs) == ['Wood', 'Stone']
+
+    # Store codes are catalogue codes; catalogue spoilage wins over ad-hoc rates
+    from src.engine.core import WorldState
+    state = WorldState()
+    state.population = generate_initial_state(1, pd.DataFrame())
+    agent = state.population.at[0, 'id']
+    InventorySystem().add_item(state, agent, 'Fish', 2.0, sp_rate=0.9)
+    InventorySystem().add_item(state, agent, 'Basket', 1)
+    store = state.inventory_store
+    assert store.items[:len(catalogue)] == catalogue.names
+    assert store.spoilage[store.code('Fish')] == 0.15
+    assert store.tool_max_durability.tolist() == [30.0], "Catalogue tools are tools"
+
+    # Bundled files resolve from any working directory; missing files are an error
+    cwd = os.getcwd()
+    try:
+        os.chdir(os.path.dirname(cwd))
+        assert WorldState().catalogue.names == catalogue.names
+    finally:
+        os.chdir(cwd)
+    try:
+        load_item_catalogue('data/missing.csv', 'data/recipes.csv')
+        assert False, "A missing catalogue must not yield an empty economy"
+    except FileNotFoundError:
+        pass
+    print("✅ Item Catalogue Test Passed!")
+
+def test_needs_table_cache():
+    print("📋 Testing Shared Needs Table...")
+    from src.engine.core import WorldState
+    state = WorldState()
+    state.population = generate_initial_state(3, pd.DataFrame())
+    state.population['stamina'] = [10.0, 100.0, 100.0]
+    state.population['happiness'] = 100.0
+    a, b, c = state.population['id']
+    inv_sys = InventorySystem()
+    inv_sys.add_item(state, a, 'Fruit', 1.5)
+    inv_sys.add_item(state, b, 'Meat', 3.5)
+    inv_sys.add_item(state, b, 'Spear', 1)
+
+    needs = state.needs()
+    assert state.needs() is needs, "Reused while the inventory is unchanged"
+    assert needs.food.tolist() == [1.5, 3.5, 0.0]
+    assert needs.hungry.tolist() == [True, False, False]
+    assert needs.needs_food.tolist() == [True, False, True] and needs.needs_tool.tolist() == [True, False, True]
+    fruit, meat, spear = (state.inventory_store.code(i) for i in ('Fruit', 'Meat', 'Spear'))
+    assert needs.surplus[0, fruit] == 0.0, "No food surplus below the reserve"
+    assert needs.surplus[1, meat] == 3.0 and needs.surplus[1, spear] == 1.0
+
+    # Any inventory mutation invalidates it
+    inv_sys.add_item(state, c, 'Wood', 2.0)
+    rebuilt = state.needs()
+    assert rebuilt is not needs and rebuilt.surplus[2, state.inventory_store.code('Wood')] == 2.0
+
+    # Writers can patch their rows and keep the table current
+    state.inventory_store.transfer([rebuilt.handles[1]], [rebuilt.handles[0]], [meat])
+    rebuilt.update_rows([0, 1])
+    assert state.needs() is rebuilt and rebuilt.food.tolist() == [2.5, 2.5, 0.0]
+    assert rebuilt.surplus[0, fruit] == 1.0 and not rebuilt.needs_food[0]
+
+    # Same tick: hunger is re-read, and a death drops the agent's row
+    state.population.loc[2, 'stamina'] = 10.0
+    assert state.needs() is rebuilt and rebuilt.hungry.tolist() == [True, False, True]
+    state.population.loc[0, 'is_alive'] = False
+    after_death = state.needs()
+    assert after_death is not rebuilt and after_death.ids.tolist() == [b, c]
+    assert after_death.hungry.tolist() == [False, True]
+    print("✅ Needs Table Test Passed!")
+
+def test_lazy_spoilage():
+    print("⏳ Testing Lazy Stack Spoilage...")
+    from src.engine.core import WorldState
+    state = WorldState()
+    state.population = generate_initial_state(2, pd.DataFrame())
+    a, b = state.population['id']
+    ha, hb = state.handles.lookup([a, b])
+    inv_sys = InventorySystem()
+    inv_sys.add_item(state, a, 'Meat', 3.0)   # 0.3 / tick
+    inv_sys.add_item(state, b, 'Grain', 1.0)  # 0.01 / tick
+    inv_sys.add_item(state, b, 'Wood', 2.0)
+    store = state.inventory_store
+    base = store.base.copy()
+
+    for _ in range(5):
+        inv_sys.update(state)
+    assert (store.base == base).all(), "Ticks only move the clock"
+    assert abs(store.amount([ha], 'Meat')[0] - 1.5) < 1e-9 and abs(store.amount([hb], 'Grain')[0] - 0.95) < 1e-9
+
+    # Writes materialize the stack, later ticks age it from there
+    inv_sys.add_item(state, a, 'Meat', 1.0)
+    inv_sys.update(state)
+    assert abs(store.amount([ha], 'Meat')[0] - 2.2) < 1e-9
+    assert abs(store.take([ha], 'Meat', 1.0)[0] - 1.0) < 1e-9 and abs(store.amount([ha], 'Meat')[0] - 1.2) < 1e-9
+
+    # Spoiled stacks read as empty (<= 0.1) until a compaction clears them
+    for _ in range(4):
+        inv_sys.update(state)
+    assert store.amount([ha], 'Meat')[0] == 0.0 and 'Meat' not in set(state.inventory['item'])
+    assert abs(store.dead_fraction() - 1 / 3) < 1e-9
+    store.compact()
+    assert store.dead_fraction() == 0.0 and store.amount([hb], 'Wood')[0] == 2.0
+    assert abs(store.amount([hb], 'Grain')[0] - 0.9) < 1e-9
+    print("✅ Lazy Spoilage Test Passed!")
+
 if __name__ == "__main__":
     run_economy_test()
+    test_segmented_consumption()
+    test_inventory_store()
+    test_vectorized_crafting()
+    test_item_catalogue()
+    test_needs_table_cache()
+    test_lazy_spoilage()
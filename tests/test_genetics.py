@@ -0,0 +1,124 @@
+import sys
+import os
+import time
+import pandas as pd
+import numpy as np
+sys.path.append(os.getcwd())
+
+from src.engine.core import WorldState
+from src.engine.genomes import GenomeStore
+from src.engine.kinship import KinshipStore
+from src.loaders import generate_initial_state
+from src.systems.genetics import GeneticsSystem
+
+def test_genomes_assigned_and_inherited():
+    print("🧬 Testing Batched Genome Inheritance...")
+    np.random.seed(5)
+    state = WorldState()
+    state.population = generate_initial_state(6, pd.DataFrame())
+    genetics = GeneticsSystem()
+    genetics.update(state)
+
+    founders = state.handles.lookup(state.population['id'])
+    assert state.genomes.has(founders).all(), "Founders get random genomes"
+    assert state.population['genetic_vulnerability'].between(0.0, 0.1).all()
+    assert len(state.genomes.sequence(int(founders[0]))) == state.genomes.length
+
+    # Two unrelated babies and one child of identical twins (clones -> inbred)
+    ids = state.population['id'].tolist()
+    state.genomes.codes[founders[3]] = state.genomes.codes[founders[2]]
+    babies = generate_initial_state(3, pd.DataFrame())
+    babies['mother_id'] = [ids[0], ids[0], ids[2]]
+    babies['father_id'] = [ids[1], ids[1], ids[3]]
+    babies['trait_openness'] = -1.0
+    state.population = pd.concat([state.population, babies], ignore_index=True)
+    genetics.update(state)
+
+    kids = state.handles.lookup(babies['id'])
+    mom, dad = state.genomes.codes[founders[0]], state.genomes.codes[founders[1]]
+    from_parent = (state.genomes.codes[kids[0]] == mom) | (state.genomes.codes[kids[0]] == dad)
+    assert from_parent.mean() > 0.9, "Child bases come from the parents (bar mutations)"
+
+    vul = state.population['genetic_vulnerability'].to_numpy()[-3:]
+    assert vul[2] == 1.0, "Clone parents -> maximal vulnerability"
+    assert vul[0] < 0.2 and vul[0] == vul[1], "Siblings share their parents' similarity"
+    assert state.population['trait_openness'].iloc[-3:].between(0.0, 1.0).all(), "Traits mixed from parents"
+
+    # Nobody is processed twice
+    before = state.genomes.codes[kids].copy()
+    genetics.update(state)
+    assert (state.genomes.codes[kids] == before).all()
+    print("✅ Genome Inheritance Test Passed!")
+
+def test_long_genome_batch():
+    print("🧬 Testing 1,024-Locus Genome Batch...")
+    store = GenomeStore(length=1024)
+    rng = np.random.RandomState(0)
+    store.randomize(np.arange(2000), rng)
+
+    start = time.time()
+    sim = store.inherit(np.arange(2000, 4000), np.arange(0, 1000).repeat(2), np.arange(1000, 2000).repeat(2), rng=rng)
+    elapsed = time.time() - start
+
+    assert sim.shape == (2000,)
+    assert abs(sim.mean() - 0.25) < 0.01, "Random genomes share ~1/4 of bases"
+    assert store.codes.shape[1] == 1024 and store.has(np.arange(4000)).all()
+    print(f"✅ Long Genome Batch Passed! (2,000 births x 1,024 loci in {elapsed * 1000:.0f} ms)")
+
+def test_pedigree_kinship():
+    print("🌳 Testing Pedigree Kinship Table...")
+    kin = KinshipStore()
+    A, B, C, D = 0, 1, 2, 3                       # Founders
+    kin.add_births([4, 5], [A, A], [B, B])        # Full siblings (same batch)
+    kin.add_births([6], [4], [C])                 # Child of sibling 4 and founder C
+    kin.add_births([7], [5], [D])                 # Child of sibling 5 and founder D -> 6, 7 are cousins
+    kin.add_births([8], [4], [5])                 # Child of siblings
+
+    assert kin.kinship_of(4, 5) == 0.25 and kin.kinship_of(5, 4) == 0.25
+    assert kin.kinship_of(A, 4) == 0.25, "Parent-child"
+    assert kin.kinship_of(A, 6) == 0.125, "Grandparent"
+    assert kin.kinship_of(6, 7) == 0.0625, "First cousins"
+    assert kin.kinship_of(A, C) == 0.0, "Founders are unrelated"
+    assert np.allclose(kin.inbreeding([6, 8]), [0.0, 0.25]), "Only the siblings' child is inbred"
+    assert kin.kinship_of(8, 8) == 0.625
+
+    # Archiving ancestors keeps the living relatives' coefficients intact
+    kin.prune([A, B, 4])
+    assert kin.kinship_of(6, 7) == 0.0625 and kin.kinship_of(5, 8) == 0.375
+    assert not np.isin([A, B, 4], kin.keys >> 32).any() and not np.isin([A, B, 4], kin.keys & 0xFFFFFFFF).any()
+    print("✅ Pedigree Kinship Test Passed!")
+
+def test_kinship_in_world():
+    print("🌳 Testing Kinship Through Births and Archiving...")
+    np.random.seed(6)
+    state = WorldState()
+    state.population = generate_initial_state(2, pd.DataFrame())
+    genetics = GeneticsSystem()
+    genetics.update(state)
+    mom, dad = state.population['id'].tolist()
+
+    kids = generate_initial_state(2, pd.DataFrame())
+    kids['mother_id'], kids['father_id'] = mom, dad
+    state.population = pd.concat([state.population, kids], ignore_index=True)
+    genetics.update(state)
+    sis, bro = kids['id'].tolist()
+    h = state.handles.lookup([mom, dad, sis, bro])
+    assert state.kinship.kinship_of(h[2], h[3]) == 0.25
+
+    # Dad is archived while a pregnancy by him is pending: keep his row until the birth
+    state.population.loc[state.population['id'] == sis, ['is_pregnant', 'pregnancy_father_id']] = [True, dad]
+    state.prune_archived([dad, mom])
+    assert state.kinship.kinship_of(h[1], h[3]) == 0.25, "Pending father is deferred"
+    assert state.kinship.kinship_of(h[0], h[3]) == 0.0, "Mother is pruned"
+
+    state.population.loc[state.population['id'] == sis, 'is_pregnant'] = False
+    state.prune_archived([])
+    assert state.kinship.kinship_of(h[1], h[3]) == 0.0, "Deferred father pruned after the birth"
+    assert state.kinship.kinship_of(h[2], h[3]) == 0.25
+    print("✅ World Kinship Test Passed!")
+
+if __name__ == "__main__":
+    test_genomes_assigned_and_inherited()
+    test_long_genome_batch()
+    test_pedigree_kinship()
+    test_kinship_in_world()
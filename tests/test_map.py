@@ -2,9 +2,13 @@ import sys
 import os
 sys.path.append(os.getcwd())
 
-from src.engine.core import SimulationEngine
+from src.engine.core import SimulationEngine, WorldState
+from src.engine.mapgrid import MapGrid, TERRAIN_CODE
+from src.engine.worldgen import generate_tiles
+from src.engine.regrowth import RegrowthModel
 from src.systems.map import MapSystem
 import pandas as pd
+import numpy as np
 
 def run_map_test():
     print("Initializing Map Test Engine...")
@@ -50,5 +54,178 @@ def run_map_test():
     print("SUCCESS: Map generated correctly with bounds.")
     print(df[['grid_x', 'grid_y', 'terrain', 'color', 'x', 'x2']].head())
 
+def test_map_grid_layers():
+    print("🗺️ Testing NumPy Map Grid...")
+    state = WorldState()
+    state.globals['grid_size'] = 50
+    state.globals['world_size'] = 250.0
+    MapSystem().update(state)
+
+    grid = state.map_grid
+    assert grid.shape == (50, 50) and grid.scale == 5.0
+    assert (grid['res_food'] <= grid['max_food']).all()
+    assert (grid.terrain == TERRAIN_CODE['Water']).any(), "River and lake should scale with the map"
+
+    # Lookups clamp to the map edge
+    gx, gy = grid.cell_of([0.0, 249.9, 250.0, -3.0], [7.0, 7.0, 7.0, 7.0])
+    assert gx.tolist() == [0, 49, 49, 0] and gy.tolist() == [1, 1, 1, 1]
+
+    # Lazy DataFrame view round-trips through the setter
+    frame = state.map_data
+    assert len(frame) == 2500 and frame['x2'].max() == 250.0
+    row = frame.iloc[3 * 50 + 4]
+    assert (row['grid_x'], row['grid_y']) == (3, 4)
+    assert row['res_wood'] == grid['res_wood'][3, 4]
+
+    state.map_data = frame
+    assert np.array_equal(state.map_grid.terrain, grid.terrain) and state.map_grid.world_size == 250.0
+
+    # Regrowth is capped
+    grid = state.map_grid
+    gx, gy = np.meshgrid(np.arange(50), np.arange(50), indexing='ij')
+    grid.write('res_food', gx.ravel(), gy.ravel(), 0.0)
+    for _ in range(500):
+        MapSystem().update(state)
+    assert np.allclose(grid['res_food'], grid['max_food'])
+    print("✅ Map Grid Test Passed!")
+
+def test_chunks_activate_lazily():
+    print("🧩 Testing Lazy Map Chunks...")
+    grid = MapGrid(grid_size=1000, world_size=1000.0, seed=3, chunk_size=32)
+    assert len(grid.chunks) == 0, "A fresh world stores nothing but its seed"
+
+    # Reading one spot activates only its chunk, identical to the generator output
+    food = grid.read('max_food', [500, 501], [40, 40])
+    assert len(grid.chunks) == 1
+    expected = generate_tiles(3, np.array([500, 501]), np.array([40]), 1000)['max_food'][:, 0]
+    assert np.allclose(food, expected)
+
+    # Deplete a tile, then let 100 ticks of regrowth pass without touching it
+    start = grid.read('res_food', [500], [40])[0]
+    grid.add('res_food', [500, 500], [40, 40], -start / 2) # Repeated tiles accumulate -> empty
+    rates = [0.001 * (t % 3) for t in range(100)] # Uneven weather
+    for k in rates:
+        grid.regrow({'food': k})
+    assert grid.chunks[(15, 1)].last_tick == 0, "Idle chunks are not touched by regrowth"
+
+    # Catch-up in one closed-form step equals stepping tick by tick
+    stepped = 0.0
+    for k in rates:
+        stepped = min(stepped + expected[0] * k, expected[0])
+    assert np.isclose(grid.read('res_food', [500], [40])[0], stepped)
+    assert grid.chunks[(15, 1)].last_tick == 100
+
+    # The map view does not activate anything
+    _ = grid['terrain']
+    assert len(grid.chunks) == 1
+    print("✅ Lazy Chunk Test Passed!")
+
+def test_noise_terrain_is_seeded():
+    print("🏔️ Testing Seeded Noise Terrain...")
+    maps = []
+    for seed in (11, 11, 12):
+        state = WorldState()
+        state.globals['world_seed'] = seed
+        MapSystem()._generate_map(state)
+        maps.append(state.map_grid)
+    assert maps[0].seed == 11
+    assert np.array_equal(maps[0].terrain, maps[1].terrain), "Same seed -> same world"
+    assert np.array_equal(maps[0]['max_food'], maps[1]['max_food'])
+    assert not np.array_equal(maps[0].terrain, maps[2].terrain), "Different seed -> different world"
+
+    # Any window can be generated alone and matches the full map
+    full = generate_tiles(5, np.arange(200), np.arange(200), 200)
+    window = generate_tiles(5, np.arange(40, 60), np.arange(120, 150), 200)
+    assert np.array_equal(window['terrain'], full['terrain'][40:60, 120:150])
+    assert np.allclose(window['elevation'], full['elevation'][40:60, 120:150])
+
+    # Layout: Highlands in the North, a lake in the South-East, a river in between
+    terrain = full['terrain']
+    assert (terrain[:, :20] == TERRAIN_CODE['Mountain']).mean() > 0.5
+    assert (terrain[170:, 170:] == TERRAIN_CODE['Water']).mean() > 0.5
+    assert full['river'][:, 60:140].any(axis=0).all(), "River should run unbroken through the midlands"
+    print("✅ Noise Terrain Test Passed!")
+
+def test_regrowth_closed_form():
+    print("🌱 Testing Closed-Form Regrowth...")
+    model = RegrowthModel()
+    weathers = ['Sunny', 'Rain', 'Storm', 'Sunny'] * 50
+    seasons = ['Spring'] * 100 + ['Winter'] * 100
+    for w, s in zip(weathers, seasons):
+        model.record(RegrowthModel.rates(w, s))
+    assert RegrowthModel.rates('Sunny', 'Winter')['food'] == 0.0, "Dry winters grow nothing"
+    assert RegrowthModel.rates('Rain', 'Winter')['food'] > 0.0
+    assert model.tick == 200
+
+    cap = np.array([100.0, 500.0, 0.0])
+    start = np.array([0.0, 250.0, 0.0])
+
+    # Reference: tick-by-tick from t=40 to t=180
+    ref = start.copy()
+    for t in range(40, 180):
+        k = RegrowthModel.rates(weathers[t], seasons[t])['wood']
+        ref = np.minimum(ref + cap * k, cap)
+
+    res = start.copy()
+    model.advance(res, cap, 'wood', 40, 180)
+    assert np.allclose(res, ref), "One closed-form step equals 140 single steps"
+    assert res[2] == 0.0
+    print("✅ Regrowth Test Passed!")
+
+def test_flow_field_climbs_to_food():
+    print("Testing Food Flow Field...")
+    grid = MapGrid(20, 100.0)
+    grid.write('res_food', [15], [5], 500.0)
+    grid.write('res_food', [2], [18], 50.0)
+    grid.write('terrain', np.full(20, 8), np.arange(20), TERRAIN_CODE['Water']) # River at gx=8
+    grid.compute_flow_field('res_food')
+
+    # East of the river: every tile leads uphill to the rich tile within a few steps
+    for start in [(19, 19), (9, 0), (12, 10)]:
+        gx, gy = start
+        for _ in range(30):
+            (dx,), (dy,) = grid.flow_of([gx], [gy])
+            if dx == 0 and dy == 0: break
+            gx, gy = gx + int(np.sign(dx)), gy + int(np.sign(dy))
+        assert (gx, gy) == (15, 5), f"Walk from {start} ended at {(gx, gy)}"
+
+    # The river blocks the flow: the west side climbs to its own (small) patch
+    column = np.arange(20)
+    crossings = (grid.flow_of(np.full(20, 7), column)[0] > 0).sum() + (grid.flow_of(np.full(20, 9), column)[0] < 0).sum()
+    assert crossings == 0, "Flow never leads into the river"
+    assert grid.flow_of([1, 7], [18, 18])[0].tolist() == [1.0, -1.0]
+
+    # Sampling is one index per agent
+    fx, fy = grid.flow_at(np.array([97.0, 77.0]), np.array([97.0, 27.0]))
+    assert fx[0] < 0 and fy[0] < 0
+    assert fx[1] == 0 and fy[1] == 0, "Peak tile has no flow"
+    print("✅ Flow Field Test Passed!")
+
+def test_flow_field_stays_local():
+    print("Testing Flow Field on a Lazy World...")
+    grid = MapGrid(grid_size=1000, world_size=1000.0, seed=3, chunk_size=32)
+    grid.compute_flow_field('res_food')
+    assert len(grid.chunks) == 0 and not grid._pristine_cache, "Nothing activated -> nothing generated"
+    assert grid.flow_dx.size == 0 and not grid.flow_at(np.array([500.0]), np.array([40.0]))[0].any()
+
+    # One activated chunk: the field covers it plus one ring of cached pristine chunks
+    grid.read('res_food', [500], [40])
+    grid.compute_flow_field('res_food')
+    assert len(grid.chunks) == 1 and len(grid._pristine_cache) == 8
+    cached = grid._pristine_cache[(14, 0)]['terrain']
+    grid.compute_flow_field('res_food')
+    assert grid._pristine_cache[(14, 0)]['terrain'] is cached, "Halo chunks are generated once"
+    assert grid.flow_dx.shape == (96, 96) and (grid.flow_x0, grid.flow_y0) == (448, 0), "Only the window is stored"
+    gx, gy = np.meshgrid(np.arange(400, 1000), np.arange(0, 100), indexing='ij')
+    fx = grid.flow_of(gx, gy)[0]
+    assert fx[:200].any() and not fx[300:].any(), "Tiles outside the window read as no flow"
+    print("✅ Local Flow Field Test Passed!")
+
 if __name__ == "__main__":
     run_map_test()
+    test_map_grid_layers()
+    test_noise_terrain_is_seeded()
+    test_chunks_activate_lazily()
+    test_regrowth_closed_form()
+    test_flow_field_climbs_to_food()
+    test_flow_field_stays_local()
@@ -2,10 +2,11 @@ import sys
 import os
 sys.path.append(os.getcwd())
 
-from src.engine.core import SimulationEngine
+from src.engine.core import SimulationEngine, WorldState
 from src.systems.biology import BiologySystem
 from src.systems.settlement import SettlementSystem
 from src.systems.tribe import TribalSystem
+from src.engine.mapgrid import MapGrid, TERRAIN_CODE
 from src.loaders import generate_initial_state
 import pandas as pd
 import numpy as np
@@ -62,5 +63,249 @@ def run_settlement_test():
     else:
         print("FAIL: Agents are static.")
 
+def _kernel_state():
+    engine = SimulationEngine()
+    state = engine.state
+    state.population = generate_initial_state(3, pd.DataFrame())
+    state.population['tribe_id'] = 'Red_Tribe'
+    state.population['x'] = [50.0, 10.0, 48.0]
+    state.population['y'] = [50.0, 10.0, 52.0]
+
+    # Column gx=10 (x in [50, 55)) is a river; tile (2, 2) is a pond
+    grid = MapGrid(20, 100.0)
+    grid.write('terrain', np.full(20, 10), np.arange(20), TERRAIN_CODE['Water'])
+    grid.write('terrain', [2], [2], TERRAIN_CODE['Water'])
+    state.map_grid = grid
+    return state
+
+def test_movement_kernel_terrain_and_love():
+    print("🧭 Testing Vectorized Movement Kernel...")
+    settle = SettlementSystem()
+
+    # 1. Water: Agent 0 stands in the river (stuck), Agent 1 in the pond, Agent 2 on land
+    state = _kernel_state()
+    state.population.loc[0, 'x'] = 51.0
+    cx = (51.0 + 10.0 + 48.0) / 3 # Fresh tribe centroid
+    live = np.ones(3, dtype=bool)
+    np.random.seed(0)
+    settle._movement_kernel(state, live)
+    pop = state.population
+    assert np.isclose(pop.at[0, 'x'], 51.0 + (cx - 51.0) * 0.1), "Stuck agent should be pushed to tribe center"
+    assert np.isclose(pop.at[1, 'x'], 10.0 + (cx - 10.0) * 0.1)
+    assert not ((pop['x'] // 5) == 10).iloc[2], "Nobody may step into the river"
+
+    # 2. Love Drive: same noise, with and without a bond
+    moves = []
+    for bonded in (False, True):
+        state = _kernel_state()
+        if bonded:
+            state.relationships = pd.DataFrame([{"id_a": state.population.at[2, 'id'], "id_b": state.population.at[1, 'id'],
+                                                 "type": "Spouse", "commitment": 1.0, "affection": 1.0, "start_day": 0}])
+        np.random.seed(1)
+        settle._movement_kernel(state, live)
+        moves.append(state.population.at[2, 'x'])
+    cx = (50.0 + 10.0 + 48.0) / 3
+    pull = (10.0 - 48.0) * 0.05 - (cx - 48.0) * 0.02
+    assert np.isclose(moves[1] - moves[0], pull), "Bonded agent should be drawn to the partner"
+    print("✅ Movement Kernel Test Passed!")
+
+def test_movement_is_size_independent():
+    print("📏 Testing Movement Semantics Across Population Sizes...")
+    settle = SettlementSystem()
+    state = _kernel_state()
+    state.globals['weather'] = 'Storm'
+
+    # Pad with 1,500 dead agents: the living three must move exactly as before
+    ghosts = generate_initial_state(1500, pd.DataFrame())
+    ghosts['is_alive'] = False
+    small = _kernel_state()
+    small.globals['weather'] = 'Storm'
+    state.population = pd.concat([state.population, ghosts], ignore_index=True)
+
+    for st in (small, state):
+        np.random.seed(2)
+        settle._handle_movement(st)
+    assert np.allclose(small.population['x'], state.population['x'].iloc[:3])
+    assert np.allclose(ghosts['x'], state.population['x'].iloc[3:]), "The dead do not walk"
+
+    # A crowd (> 1,000) on the river bank still respects the water
+    crowd = _kernel_state()
+    crowd.population = generate_initial_state(1500, pd.DataFrame())
+    crowd.population['x'] = np.random.uniform(45.0, 49.9, 1500)
+    settle._handle_movement(crowd)
+    assert not ((crowd.population['x'] // 5) == 10).any(), "Large populations must not walk on water"
+    print("✅ Size Independence Test Passed!")
+
+def test_foragers_follow_food_flow():
+    print("🧺 Testing Foragers Follow the Food Flow Field...")
+    settle = SettlementSystem()
+
+    def forage(use_flow):
+        engine = SimulationEngine()
+        state = engine.state
+        state.population = generate_initial_state(200, pd.DataFrame())
+        state.population['job'] = 'Gatherer'
+        state.population['age'] = 25
+        state.population['tribe_id'] = None
+        rng = np.random.default_rng(3)
+        state.population['x'] = rng.uniform(40.0, 90.0, 200)
+        state.population['y'] = rng.uniform(40.0, 90.0, 200)
+
+        # Sparse plains with one rich grove in the north-west
+        grid = MapGrid(20, 100.0)
+        gx, gy = np.meshgrid(np.arange(20), np.arange(20), indexing='ij')
+        grove = (gx >= 3) & (gx <= 5) & (gy >= 3) & (gy <= 5)
+        grid.write('res_food', gx.ravel(), gy.ravel(), np.where(grove, 300.0, 10.0).ravel())
+        if use_flow: grid.compute_flow_field('res_food')
+        state.map_grid = grid
+
+        np.random.seed(4)
+        for _ in range(80):
+            settle._handle_movement(state)
+        tx, ty = grid.cell_of(state.population['x'], state.population['y'])
+        return grid.read('res_food', tx, ty).mean()
+
+    wander, flow = forage(False), forage(True)
+    print(f"   Food under foragers: wander={wander:.0f}, flow={flow:.0f}")
+    assert flow > 3 * wander, "Foragers should drift onto the rich tiles"
+    print("✅ Foraging Flow Test Passed!")
+
+def test_settlement_clusters_persist():
+    print("🏘️ Testing Density-Based Settlements...")
+    settle = SettlementSystem()
+    state = WorldState()
+    state.population = generate_initial_state(81, pd.DataFrame())
+    rng = np.random.default_rng(3)
+
+    # Two camps + one hermit
+    state.population['x'] = np.r_[rng.normal(20, 2, 50), rng.normal(75, 1.5, 30), 50.0]
+    state.population['y'] = np.r_[rng.normal(20, 2, 50), rng.normal(75, 1.5, 30), 95.0]
+    state.population['tribe_id'] = ['Red_Tribe'] * 50 + ['Blue_Tribe'] * 31
+
+    settle._detect_settlements(state)
+    sids = state.population['settlement_id']
+    assert sids.iloc[:50].nunique() == 1 and sids.iloc[50:80].nunique() == 1
+    assert sids.iloc[0] != sids.iloc[50], "Separate camps are separate settlements"
+    assert sids.iloc[80] is None, "A lone hermit is not a settlement"
+
+    big = state.settlements[sids.iloc[0]]
+    assert big['pop'] == 50 and big['kind'] == 'Village' and big['tribe_id'] == 'Red_Tribe'
+    assert big['bbox'][0] <= big['centroid'][0] <= big['bbox'][2]
+
+    # The camps drift and some people die: IDs persist
+    first_ids = sids.iloc[[0, 50]].tolist()
+    state.population['x'] += 2.0
+    state.population.loc[:10, 'is_alive'] = False
+    state.day = 5
+    settle._detect_settlements(state)
+    assert state.population['settlement_id'].iloc[[20, 60]].tolist() == first_ids, "Settlements keep their ID across passes"
+    assert state.settlements[first_ids[0]]['pop'] == 39
+    assert len(state.settlements[first_ids[0]]['history']) == 2
+
+    # Everyone in the small camp dies: it is abandoned but remembered
+    state.population.loc[50:79, 'is_alive'] = False
+    state.day = 10
+    settle._detect_settlements(state)
+    assert not state.settlements[first_ids[1]]['active']
+
+    # ...until it has been empty for longer than the horizon
+    state.day = state.settlements[first_ids[1]]['last_seen'] + SettlementSystem.ABANDONED_HORIZON
+    settle._detect_settlements(state)
+    assert first_ids[1] in state.settlements
+    state.day += settle.CLUSTER_INTERVAL
+    settle._detect_settlements(state)
+    assert first_ids[1] not in state.settlements and first_ids[0] in state.settlements
+    print("✅ Settlement Clustering Test Passed!")
+
+def test_relationship_graph():
+    print("💞 Testing Relationship Graph...")
+    from src.engine.relationships import RelationshipGraph
+    state = _kernel_state()
+    ids = state.population['id'].tolist()
+    h = state.handles.lookup(np.array(ids, dtype=object))
+    graph = state.relationship_graph
+
+    # 1. Partner index: mutual bonds, the latest one wins
+    graph.add(h[0], h[1], 'Lover', commitment=0.1, affection=0.8, start_day=1, mutual=True)
+    assert graph.partner_of(h).tolist() == [h[1], h[0], -1]
+    graph.add(h[0], h[2], 'Spouse', mutual=True)
+    assert graph.partner_of(h[[0, 2]]).tolist() == [h[2], h[0]], "Newest bond should win"
+
+    # 2. Kin edges are typed and don't touch the partner index
+    graph.add(h[2], h[1], 'Parent')
+    graph.add(h[1], h[2], 'Child')
+    assert graph.kin_of(h[2]).tolist() == [h[1]]
+    assert sorted(graph.neighbors(h[0], ['Lover', 'Spouse']).tolist()) == sorted([h[1], h[2]])
+    assert graph.partner_of([h[1]])[0] == h[0]
+
+    # 3. Append buffer spills into the CSR arrays past its limit
+    many = np.full(RelationshipGraph.BUFFER_LIMIT + 1, h[1])
+    graph.add(many, np.full(len(many), h[2]), 'Ex')
+    assert graph._buffered == 0 and len(graph) == 6 + len(many)
+    assert len(graph.neighbors(h[1], ['Ex'])) == len(many)
+
+    # 4. DataFrame view round trip keeps edges and partners
+    frame = state.relationships
+    assert len(frame) == len(graph) and set(frame.columns) == set(RelationshipGraph.FRAME_COLUMNS)
+    assert frame[frame['type'] == 'Lover']['id_a'].tolist() == [ids[0], ids[1]]
+    state.relationships = frame
+    assert state.relationship_graph.partner_of(h).tolist() == graph.partner_of(h).tolist()
+
+    # 5. Archiving prunes every edge of the dead; their partners become single
+    state.population.loc[2, 'is_alive'] = False
+    state.prune_archived([ids[2]])
+    graph = state.relationship_graph
+    assert graph.partner_of(h).tolist() == [-1, h[0], -1]
+    assert not state.relationships[['id_a', 'id_b']].isin([ids[2]]).any().any()
+    assert len(graph) == 2
+    print("✅ Relationship Graph Test Passed!")
+
+def test_tribe_stats():
+    print("📊 Testing Per-Tick Tribe Aggregates...")
+    state = _kernel_state()
+    pop = state.population
+    pop['tribe_id'] = ['Red_Tribe', 'Blue_Tribe', 'Red_Tribe']
+    pop['hp'] = [100.0, 40.0, 60.0]
+    ids = pop['id'].to_numpy()
+    state.inventory_store.add(state.handles.lookup(ids), 'Meat', [3.0, 1.0, 2.0])
+
+    # 1. Aggregates: count, means, centroid, food held
+    stats = state.tribe_stats()
+    red = stats.table.loc['Red_Tribe']
+    assert red['count'] == 2 and np.isclose(red['hp'], 80.0)
+    assert np.isclose(red['x'], 49.0) and np.isclose(red['y'], 51.0)
+    assert np.isclose(red['food'], 5.0) and np.isclose(stats.get('Blue_Tribe', 'food'), 1.0)
+    assert list(stats.members('Red_Tribe')) == [0, 2]
+    assert stats.get('Green_Tribe', 'count', 0) == 0
+
+    # 2. Cached for the tick; rebuilt after a death or on a new day
+    assert state.tribe_stats() is stats
+    pop.loc[2, 'is_alive'] = False
+    stats = state.tribe_stats()
+    assert stats.get('Red_Tribe', 'count') == 1 and np.isclose(stats.get('Red_Tribe', 'food'), 3.0)
+    state.day += 1
+    assert state.tribe_stats() is not stats
+
+    # 3. Consumers: tribe metadata and leaders come from the same table
+    state.tribes = {'Red_Tribe': {}, 'Blue_Tribe': {}}
+    SettlementSystem()._update_settlements(state)
+    assert state.tribes['Red_Tribe']['pop'] == 1 and state.tribes['Red_Tribe']['centroid'] == (50.0, 50.0)
+
+    # Centroids follow the agents within the tick they move
+    settlement = SettlementSystem()
+    settlement._handle_movement(state)
+    settlement._update_settlements(state)
+    assert np.allclose(state.tribes['Red_Tribe']['centroid'], pop.loc[0, ['x', 'y']].to_numpy(dtype=float))
+    assert state.tribes['Red_Tribe']['centroid'] != (50.0, 50.0)
+    TribalSystem()._assign_leaders(state)
+    assert state.tribes_leaders == {'Red_Tribe': ids[0], 'Blue_Tribe': ids[1]}
+    print("✅ Tribe Stats Test Passed!")
+
 if __name__ == "__main__":
     run_settlement_test()
+    test_movement_kernel_terrain_and_love()
+    test_movement_is_size_independent()
+    test_foragers_follow_food_flow()
+    test_settlement_clusters_persist()
+    test_relationship_graph()
+    test_tribe_stats()
@@ -1,12 +1,17 @@
 import sys
 import os
 import pandas as pd
+import numpy as np
 sys.path.append(os.getcwd())
 
 from src.engine.core import WorldState
 from src.loaders import generate_initial_state
 from src.systems.tribe import TribalSystem
 from src.systems.economy import EconomySystem
+from src.systems.social import SocialSystem
+from src.systems.politics import PoliticalSystem
+from src.engine.spatial import SpatialGrid
+from src.engine.opinions import OpinionMatrix
 
 def test_social_hierarchy():
     print("👑 Testing Social Hierarchy Mechanics...")
@@ -48,5 +53,162 @@ def test_social_hierarchy():
     
     print("✅ Social Hierarchy Test Passed!")
 
+def test_spatial_grid_neighbors():
+    print("🗺️ Testing Spatial Grid Neighbour Picks...")
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.uniform(0, 50, 500), [500.0]]) # Last point is isolated
+    y = np.concatenate([rng.uniform(0, 50, 500), [500.0]])
+    grid = SpatialGrid(x, y, cell_size=5.0)
+
+    queries = np.arange(len(x))
+    picks = grid.random_neighbor(queries, radius=5.0, rng=rng)
+
+    found = picks >= 0
+    d2 = (x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2
+    np.fill_diagonal(d2, np.inf)
+    assert picks[-1] == -1, "Isolated agent should have no neighbour"
+    assert (found == (d2 < 25.0).any(axis=1)).all(), "Every agent with a neighbour should find one"
+    assert (picks[found] != queries[found]).all(), "Agents must not pick themselves"
+    d = np.hypot(x[picks[found]] - x[found], y[picks[found]] - y[found])
+    assert (d < 5.0).all(), "Picked neighbours must lie within the radius"
+    print("✅ Spatial Grid Test Passed!")
+
+def test_gossip_batch_spreads_opinion():
+    print("🗣️ Testing Batched Gossip...")
+    state = WorldState()
+    state.population = generate_initial_state(200, pd.DataFrame())
+    state.population['x'] = np.random.uniform(0, 10, 200) # Everyone within earshot
+    state.population['y'] = np.random.uniform(0, 10, 200)
+
+    chief_id = state.population.at[0, 'id']
+    state.globals['chief_id'] = chief_id
+    handles = state.handles.lookup(state.population['id'])
+    chief_h = handles[0]
+    state.opinions.set(handles[1:], chief_h, 50.0)
+    state.opinions.set(handles[1:2], chief_h, -50.0)
+
+    social = SocialSystem()
+    for _ in range(20):
+        social.update(state)
+
+    assert (np.abs(state.opinions.values) <= 100).all()
+
+    # Observer tribes are only re-assigned when the population frame is replaced
+    tribe = state.population.at[1, 'tribe_id']
+    state.opinions.observer_group[handles[1]] = -1
+    social.update(state)
+    assert state.opinions.observer_group[handles[1]] == -1, "Same frame: groups are not re-read"
+    state.population = state.population.copy()
+    social.update(state)
+    assert state.opinions.observer_group[handles[1]] == state.opinions.group_codes[tribe]
+
+    # Ten admirers talk to the dissenter (Agent 1) in one batch
+    np.random.seed(1)
+    before = state.opinions.get([handles[1]], chief_h)[0]
+    living = state.population[state.population['is_alive']]
+    social._gossip_batch(state, living, np.arange(2, 12), np.full(10, 1))
+    assert state.opinions.get([handles[1]], chief_h)[0] > before, "Dissenter should be swayed by gossip"
+    print("✅ Batched Gossip Test Passed!")
+
+def test_opinion_matrix_ops():
+    print("📇 Testing Sparse Opinion Matrix...")
+    ops = OpinionMatrix()
+    ops.set([0, 0, 1, 2], [1, 2, 2, 1], [10.0, -80.0, 30.0, 150.0])
+    ops.set([0], [1], [20.0]) # Overwrite
+    assert len(ops) == 4
+    assert list(ops.get([0, 2, 3], [1, 1, 0])) == [20.0, 100.0, 0.0], "Scores clamp and missing reads neutral"
+
+    targets, scores = ops.top_opinions_of(0, k=1)
+    assert list(targets) == [2] and list(scores) == [-80.0], "Strongest opinion comes first"
+    mean, count = ops.reputation_of(2)
+    assert count == 2 and mean == -25.0
+
+    # Decay drops faded entries; prune drops both directions
+    ops.decay(0.5, min_abs=6.0)
+    assert len(ops) == 4 and ops.get([0], [1])[0] == 10.0
+    ops.decay(0.5, min_abs=6.0)
+    assert len(ops) == 3
+    assert ops.prune([1]) == 2, "Entries held by and about the dead go"
+    assert list(ops.observers) == [0] and list(ops.targets) == [2]
+    print("✅ Opinion Matrix Test Passed!")
+
+def test_archive_prunes_opinions():
+    print("🪦 Testing Opinion Pruning on Archive...")
+    state = WorldState()
+    state.population = generate_initial_state(3, pd.DataFrame())
+    h = state.handles.lookup(state.population['id'])
+    state.opinions.set([h[0], h[1], h[2]], [h[1], h[2], h[0]], 40.0)
+
+    state.prune_archived([state.population.at[1, 'id'], "HMN-unknown"])
+    assert len(state.opinions) == 1
+    assert state.handles.lookup(["HMN-unknown"], create=False)[0] == -1, "Pruning must not mint handles"
+    print("✅ Opinion Pruning Test Passed!")
+
+def test_reputation_tallies():
+    print("🏅 Testing Incremental Reputation...")
+    ops = OpinionMatrix()
+    ops.assign_groups([0, 1, 2], ['Red', 'Red', 'Blue'])
+    ops.set([0, 1, 2], [3, 3, 3], [40.0, 20.0, -60.0])
+    ops.set([0, 0], [3, 3], [10.0, 80.0]) # Duplicate in one batch: last wins
+
+    mean, count = ops.reputation_of(3)
+    assert count == 3 and np.isclose(mean, (80 + 20 - 60) / 3)
+    assert ops.reputation_of(3, group='Red') == (50.0, 2)
+    assert ops.reputation_of(3, group='Blue') == (-60.0, 1)
+
+    # Observer 1 defects to Blue: its row moves between tribal tallies
+    ops.assign_groups([1], ['Blue'])
+    assert ops.reputation_of(3, group='Red') == (80.0, 1)
+    assert ops.reputation_of(3, group='Blue') == (-20.0, 2)
+
+    # Tallies stay consistent with a full recount after bulk passes
+    ops.set(np.arange(50), 3, np.linspace(-100, 100, 50))
+    incremental = ops.rep_sum.copy(), ops.group_sum.copy()
+    ops._rebuild_tallies()
+    assert np.allclose(incremental[0], ops.rep_sum) and np.allclose(incremental[1], ops.group_sum)
+    assert ops.reputation([99, -1])[1].tolist() == [0, 0], "Unknown handles read neutral"
+    print("✅ Reputation Test Passed!")
+
+def test_election_favours_reputation():
+    print("🗳️ Testing Reputation-Weighted Election...")
+    state = WorldState()
+    state.population = generate_initial_state(20, pd.DataFrame())
+    state.population['age'] = 40.0
+    state.population['trait_conscientiousness'] = 0.5
+    favourite = state.population.at[7, 'id']
+
+    handles = state.handles.lookup(state.population['id'])
+    state.opinions.set(handles, handles[7], 90.0)
+    state.opinions.set(handles, handles[3], -90.0)
+
+    PoliticalSystem()._elect_new_chief(state)
+    assert state.globals['chief_id'] == favourite, "Beloved candidate should win"
+    print("✅ Election Test Passed!")
+
+def test_gossip_batch_sums_repeated_listeners():
+    print("🗣️ Testing Gossip with a Shared Listener...")
+    state = WorldState()
+    state.population = generate_initial_state(4, pd.DataFrame())
+    handles = state.handles.lookup(state.population['id'])
+    state.globals['chief_id'] = state.population.at[0, 'id']
+    state.opinions.set(handles[1:3], handles[0], [100.0, 50.0])
+
+    # Both tellers (1, 2) reach listener 3 in the same batch
+    seed = next(s for s in range(100) if (np.random.RandomState(s).random_sample(2) < 0.6).all())
+    np.random.seed(seed)
+    living = state.population[state.population['is_alive']]
+    SocialSystem()._gossip_batch(state, living, np.array([1, 2]), np.array([3, 3]))
+    trust = 0.5 + living['trait_agreeableness'].iloc[3] * 0.5
+    expected = (100.0 + 50.0) * trust * 0.2
+    assert np.isclose(state.opinions.get([handles[3]], handles[0])[0], expected), "Neither teller's influence is dropped"
+    print("✅ Shared Listener Gossip Test Passed!")
+
 if __name__ == "__main__":
     test_social_hierarchy()
+    test_spatial_grid_neighbors()
+    test_gossip_batch_spreads_opinion()
+    test_opinion_matrix_ops()
+    test_archive_prunes_opinions()
+    test_reputation_tallies()
+    test_election_favours_reputation()
+    test_gossip_batch_sums_repeated_listeners()
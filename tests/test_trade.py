@@ -65,5 +65,52 @@ def test_trade_system():
 
     print("✅ Trade System Test Passed!")
 
+def test_cell_order_books():
+    print("📒 Testing Cell-Local Order Books...")
+    np.random.seed(3)
+    state = WorldState()
+    state.population = generate_initial_state(7, pd.DataFrame())
+    pop = state.population
+    pop['stamina'], pop['happiness'] = 100.0, 100.0
+    pop.loc[[0, 1, 2], 'stamina'] = 10.0                    # Hungry buyers
+    pop['x'] = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 55.0]        # Cell (0, 0) ... and a far cell
+    pop['y'] = 1.0
+    ids = pop['id'].tolist()
+    h = state.handles.lookup(ids)
+
+    def row(agent, item, amount, dur=0):
+        return {'agent_id': agent, 'item': item, 'amount': amount, 'durability': dur, 'max_durability': dur, 'spoilage_rate': 0}
+    state.inventory = pd.DataFrame([
+        row(ids[0], 'Wood', 2.0), row(ids[1], 'Stone', 1.0), row(ids[2], 'Fish', 1.0),
+        row(ids[3], 'Meat', 3.0), row(ids[4], 'Meat', 4.0),    # Two asks (2 can't pay: no food to spare)
+        row(ids[5], 'Wood', 1.0),                              # Wants a Spear
+        row(ids[6], 'Spear', 1, dur=50),                       # ... but the Spear is far away
+    ])
+    store = state.inventory_store
+    before = store.holdings(h).sum(axis=0)
+
+    TradeSystem().update(state)
+    meat = store.amount(h, 'Meat')
+    assert meat[:3].tolist() == [1.0, 1.0, 0.0], "Two asks clear the two paying bids"
+    assert meat[3] == 2.0 and meat[4] == 3.0, "Each seller sells one unit per book"
+    assert store.tool_counts(h, 'Spear').tolist() == [0, 0, 0, 0, 0, 0, 1], "No trade across cells"
+    assert np.allclose(store.holdings(h).sum(axis=0), before), "Barter conserves goods"
+
+    # Tools move as instances; an agent can't both sell and pay with its only Spear
+    pop.loc[[3, 4, 5, 6], 'x'] = 90.0
+    pop.loc[[0, 2], 'stamina'] = 100.0                     # 0 wants a Spear, 1 is hungry
+    state.inventory = pd.DataFrame([row(ids[0], 'Wood', 1.0), row(ids[1], 'Spear', 1, dur=20),
+                                    row(ids[2], 'Meat', 3.0)])
+    TradeSystem().update(state)
+    store = state.inventory_store
+    assert store.tool_counts(h[:3], 'Spear').tolist() == [0, 1, 0], "Both of 1's deals are dropped"
+    assert store.amount(h[:3], 'Meat').tolist() == [0.0, 0.0, 3.0]
+    pop.loc[1, 'stamina'] = 100.0                          # Same tick: hunger is re-read
+    TradeSystem().update(state)
+    assert store.tool_counts(h[:3], 'Spear').tolist() == [1, 0, 0] and store.tool_durability.tolist() == [20.0]
+    assert store.amount(h[:2], 'Wood').tolist() == [0.0, 1.0]
+    print("✅ Order Book Test Passed!")
+
 if __name__ == "__main__":
     test_trade_system()
+    test_cell_order_books()